@@ -14,23 +14,34 @@ except ModuleNotFoundError:
     bpy = None
 
 if bpy is not None:
-    from .common import _ensure_recordings_dir
-    from .state import ensure_props, clear_props
+    from .common import _ensure_recordings_dir, _refresh_audio_devices_async
+    from .state import (
+        ensure_props,
+        clear_props,
+        register_keymaps,
+        unregister_keymaps,
+    )
     from .preferences import SUZANNEVA_Preferences
     from .operators import (
         SUZANNEVA_OT_microphone_press,
         SUZANNEVA_OT_test_api_key,
         SUZANNEVA_OT_send_message,
+        SUZANNEVA_OT_cancel_request,
         SUZANNEVA_OT_refresh_models,
         SUZANNEVA_OT_refresh_devices,
         SUZANNEVA_OT_clear_saved_api_key,
         SUZANNEVA_OT_copy_last_error,
         SUZANNEVA_OT_open_recordings_folder,
+        SUZANNEVA_OT_open_output_text,
         SUZANNEVA_OT_test_microphone,
         SUZANNEVA_OT_test_transcription,
         SUZANNEVA_OT_new_conversation,
         SUZANNEVA_OT_rename_conversation,
         SUZANNEVA_OT_delete_conversation,
+        SUZANNEVA_OT_undo_conversation_change,
+        SUZANNEVA_OT_search_conversations,
+        SUZANNEVA_OT_open_search_hit,
+        SUZANNEVA_OT_transcript_page,
     )
     from .panel import SUZANNEVA_PT_sidebar
 
@@ -39,16 +50,22 @@ if bpy is not None:
         SUZANNEVA_OT_microphone_press,
         SUZANNEVA_OT_test_api_key,
         SUZANNEVA_OT_send_message,
+        SUZANNEVA_OT_cancel_request,
         SUZANNEVA_OT_refresh_models,
         SUZANNEVA_OT_refresh_devices,
         SUZANNEVA_OT_clear_saved_api_key,
         SUZANNEVA_OT_copy_last_error,
         SUZANNEVA_OT_open_recordings_folder,
+        SUZANNEVA_OT_open_output_text,
         SUZANNEVA_OT_test_microphone,
         SUZANNEVA_OT_test_transcription,
         SUZANNEVA_OT_new_conversation,
         SUZANNEVA_OT_rename_conversation,
         SUZANNEVA_OT_delete_conversation,
+        SUZANNEVA_OT_undo_conversation_change,
+        SUZANNEVA_OT_search_conversations,
+        SUZANNEVA_OT_open_search_hit,
+        SUZANNEVA_OT_transcript_page,
         SUZANNEVA_PT_sidebar,
     )
 else:
@@ -61,12 +78,15 @@ def register():
     for cls in classes:
         bpy.utils.register_class(cls)
     ensure_props()
+    register_keymaps()
     _ensure_recordings_dir()
+    _refresh_audio_devices_async(force=True)
 
 
 def unregister():
     if bpy is None:
         return
+    unregister_keymaps()
     clear_props()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
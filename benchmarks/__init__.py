@@ -0,0 +1 @@
+# Offline benchmarks for Suzanne helpers; run with `python -m benchmarks.<module>`.
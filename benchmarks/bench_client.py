@@ -0,0 +1,128 @@
+"""
+End-to-end client latency and soak test against the local mock OpenAI server.
+
+Drives the add-on's real HTTP helpers (_get_json on /v1/models, _transcribe_audio,
+_call_chatgpt) concurrently and prints a JSON report per endpoint.
+
+Run from the repository root:
+    python -m benchmarks.bench_client [--requests 200] [--concurrency 8] [--latency-ms 150] [--error-rate 0.02]
+"""
+import argparse
+import collections
+import json
+import pathlib
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+
+from benchmarks.bench_support import percentile
+from benchmarks.mock_openai_server import MockOpenAIServer
+from tests.test_support import load_suzanne_modules
+
+
+_ENDPOINTS = ("models", "transcriptions", "responses")
+
+
+def _summary(samples, outcomes, elapsed_s):
+    ok = sorted(samples)
+    return {
+        "requests": sum(outcomes.values()),
+        "ok": len(ok),
+        "outcomes": dict(outcomes),
+        "throughput_rps": round(sum(outcomes.values()) / elapsed_s, 2) if elapsed_s else 0.0,
+        "mean_ms": round(sum(ok) / len(ok) * 1e3, 3) if ok else None,
+        "p50_ms": round(percentile(ok, 0.50) * 1e3, 3) if ok else None,
+        "p95_ms": round(percentile(ok, 0.95) * 1e3, 3) if ok else None,
+        "p99_ms": round(percentile(ok, 0.99) * 1e3, 3) if ok else None,
+    }
+
+
+def run(requests=200, concurrency=8, **server_config):
+    common = load_suzanne_modules().common
+    api_key = "sk-mock"
+
+    with MockOpenAIServer(**server_config) as server, tempfile.TemporaryDirectory() as temp_dir:
+        base_url = server.base_url
+        audio_path = str(pathlib.Path(temp_dir) / "silence.wav")
+        common._write_silence_wav(audio_path)
+        calls = {
+            "models": lambda: common._get_json(common._api_url("models", base_url=base_url), api_key),
+            "transcriptions": lambda: common._transcribe_audio(
+                api_key, "gpt-4o-mini-transcribe", audio_path, base_url=base_url
+            ),
+            "responses": lambda: common._call_chatgpt(
+                api_key,
+                "gpt-4o-mini",
+                "How do I add a bevel modifier?",
+                instructions=common._system_instructions(),
+                base_url=base_url,
+            ),
+        }
+
+        def one(index):
+            endpoint = _ENDPOINTS[index % len(_ENDPOINTS)]
+            started = time.perf_counter()
+            try:
+                calls[endpoint]()
+                outcome = "ok"
+            except HTTPError as exc:
+                outcome = f"http_{exc.code}"
+            except (URLError, OSError, ValueError) as exc:
+                outcome = type(exc).__name__
+            return endpoint, outcome, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as pool:
+            results = list(pool.map(one, range(max(1, int(requests)))))
+        elapsed_s = time.perf_counter() - started
+        server_stats = dict(server.stats)
+
+    report = {}
+    for endpoint in _ENDPOINTS:
+        samples = [duration for name, outcome, duration in results if name == endpoint and outcome == "ok"]
+        outcomes = collections.Counter(outcome for name, outcome, _ in results if name == endpoint)
+        report[endpoint] = _summary(samples, outcomes, elapsed_s)
+
+    return {
+        "benchmark": "client",
+        "requests": len(results),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed_s, 3),
+        "server_config": server_config,
+        "server_stats": server_stats,
+        "results": report,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rpm", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(
+        run(
+            args.requests,
+            args.concurrency,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            tokens_per_second=args.tokens_per_second,
+            error_rate=args.error_rate,
+            rate_limit_rpm=args.rate_limit_rpm,
+        ),
+        indent=2,
+    )
+    if args.output:
+        pathlib.Path(args.output).write_text(report + "\n", encoding="utf-8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
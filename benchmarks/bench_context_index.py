@@ -0,0 +1,58 @@
+"""
+Index update and query latency for the BM25 context index.
+
+Run from the repository root:
+    python -m benchmarks.bench_context_index [--messages 100000]
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.bench_support import percentile, sentence
+from tests.test_support import load_suzanne_modules
+
+
+def run(message_count=100000, query_count=200, seed=7):
+    common = load_suzanne_modules().common
+    rng = random.Random(seed)
+    exchanges = message_count // 2
+
+    common._context_index_reset()
+    common._CONTEXT_INDEX["loaded"] = True
+    update_samples = []
+    for index in range(exchanges):
+        user_text = f"How do I {sentence(rng, 8)}?"
+        assistant_text = sentence(rng, 60)
+        started = time.perf_counter()
+        common._context_index_add(f"conv-{index // 200}", user_text, assistant_text)
+        update_samples.append(time.perf_counter() - started)
+
+    query_samples = []
+    for _ in range(query_count):
+        query = sentence(rng, 6)
+        started = time.perf_counter()
+        common._context_index_search(query, 8)
+        query_samples.append(time.perf_counter() - started)
+
+    common._context_index_reset()
+    return {
+        "benchmark": "context_index",
+        "messages": exchanges * 2,
+        "update_total_s": round(sum(update_samples), 4),
+        "update_mean_us": round(sum(update_samples) / len(update_samples) * 1e6, 2),
+        "query_mean_ms": round(sum(query_samples) / len(query_samples) * 1e3, 3),
+        "query_p95_ms": round(percentile(query_samples, 0.95) * 1e3, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.queries), indent=2))
+
+
+if __name__ == "__main__":
+    main()
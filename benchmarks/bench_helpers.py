@@ -0,0 +1,128 @@
+"""
+Latency of the hot conversation, prompt and text helpers on a synthetic store.
+
+Run from the repository root:
+    python -m benchmarks.bench_helpers [--conversations 200] [--messages 80] [--output result.json]
+"""
+import argparse
+import json
+import pathlib
+import platform
+import random
+import subprocess
+import tempfile
+from types import SimpleNamespace
+
+from benchmarks.bench_support import (
+    make_conversation_store,
+    make_info_history,
+    markdown_answer,
+    sentence,
+    time_call,
+)
+from tests.test_support import load_suzanne_modules, make_preferences, make_scene
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(conversations=200, messages=80, info_lines=100, repeat=5, seed=7):
+    common = load_suzanne_modules().common
+    rng = random.Random(seed)
+    store = make_conversation_store(conversations, messages, seed=seed)
+    info_history = make_info_history(info_lines, seed=seed)
+    answer = markdown_answer(rng, steps=40)
+    active_id = store["conversations"][-1]["id"]
+
+    # No background summaries or index updates: they would time threads, not helpers.
+    prefs = make_preferences(summarize_conversations=False)
+    common.bpy.context.preferences.addons = {common.ADDON_MODULE: SimpleNamespace(preferences=prefs)}
+    scene = make_scene(suzanne_va_active_conversation=active_id, suzanne_va_context_turns=8)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store_path = pathlib.Path(temp_dir) / common._CONVERSATION_FILE_NAME
+        common._conversation_store_path = lambda: store_path
+        common._save_conversation_store(store)
+        store_bytes = store_path.stat().st_size
+
+        def reset_store():
+            common._save_conversation_store(store)
+
+        results = {
+            "load_conversation_store": time_call(common._load_conversation_store, repeat),
+            "save_conversation_store": time_call(lambda: common._save_conversation_store(store), repeat),
+            "append_conversation_exchange": time_call(
+                lambda: common._append_conversation_exchange(
+                    scene,
+                    f"How do I {sentence(rng, 10)}?",
+                    answer,
+                    source="text",
+                ),
+                repeat,
+                setup=reset_store,
+            ),
+            "conversation_enum_items": time_call(lambda: common._conversation_enum_items(None, None), repeat),
+            "conversation_context_block": time_call(
+                lambda: common._conversation_context_block(scene, max_tokens=3000),
+                repeat,
+            ),
+        }
+
+    conversation_context = common._format_conversation_context([f"You: {sentence(rng, 12)}"] * 16)
+    results["clean_markdown"] = time_call(lambda: common._clean_markdown(answer), repeat)
+    results["wrap_ui_text"] = time_call(
+        lambda: common._wrap_ui_text(common._clean_markdown(answer), width=60),
+        repeat,
+        setup=common._invalidate_rendered_lines,
+    )
+    results["build_markdown_input"] = time_call(
+        lambda: common._build_markdown_input(
+            "How do I add a bevel modifier?",
+            info_history,
+            is_voice=False,
+            conversation_context_text=conversation_context,
+        ),
+        repeat,
+    )
+
+    return {
+        "benchmark": "helpers",
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "conversations": len(store["conversations"]),
+        "messages_per_conversation": len(store["conversations"][0]["messages"]),
+        "store_bytes": store_bytes,
+        "info_lines": info_lines,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=200, help="1 to 10000")
+    parser.add_argument("--messages", type=int, default=80, help="per conversation, up to 400")
+    parser.add_argument("--info-lines", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(
+        run(args.conversations, args.messages, args.info_lines, args.repeat),
+        indent=2,
+    )
+    if args.output:
+        pathlib.Path(args.output).write_text(report + "\n", encoding="utf-8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
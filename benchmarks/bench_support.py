@@ -0,0 +1,111 @@
+"""
+Shared helpers for the offline benchmarks: synthetic data and timing.
+"""
+import datetime
+import random
+import time
+import uuid
+
+
+MAX_CONVERSATIONS = 10000
+MAX_MESSAGES_PER_CONVERSATION = 400
+
+VOCABULARY = (
+    "bevel edge vertex face loop cut extrude inset modifier subdivision mirror array "
+    "boolean solidify weld shade smooth flat normal uv unwrap seam texture material node "
+    "shader principled emission glass light sun area spot camera focal lens render cycles "
+    "eevee samples denoise keyframe timeline graph driver armature bone weight paint rig "
+    "sculpt brush remesh decimate origin pivot snap grid scale rotate move apply transform"
+).split()
+
+_INFO_OPERATORS = (
+    "bpy.ops.mesh.bevel(offset=0.1, segments=3)",
+    "bpy.ops.transform.translate(value=(0, 0, 1))",
+    "bpy.ops.object.modifier_add(type='SUBSURF')",
+    "bpy.ops.mesh.loopcut_slide()",
+    "bpy.ops.object.shade_smooth()",
+    "bpy.context.object.data.use_auto_smooth = True",
+    "bpy.ops.render.render()",
+)
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def markdown_answer(rng, steps=6):
+    lines = [f"## {sentence(rng, 3).title()}", ""]
+    for index in range(1, steps + 1):
+        lines.append(f"{index}. **{sentence(rng, 2)}**: {sentence(rng, 18)} `{rng.choice(VOCABULARY)}`")
+    lines.extend(["", f"- {sentence(rng, 12)}", f"- {sentence(rng, 12)}"])
+    return "\n".join(lines)
+
+
+def make_conversation_store(conversations=100, messages_per_conversation=40, seed=7):
+    """
+    Synthetic store in the on-disk format of suzanne_conversations.json.
+    Sizes are clamped to 1..10k conversations and 0..400 messages each.
+    """
+    rng = random.Random(seed)
+    conversations = max(1, min(MAX_CONVERSATIONS, int(conversations)))
+    messages_per_conversation = max(0, min(MAX_MESSAGES_PER_CONVERSATION, int(messages_per_conversation)))
+    start = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+    store = {"version": 1, "conversations": []}
+    for conv_index in range(conversations):
+        created = start + datetime.timedelta(hours=conv_index)
+        messages = []
+        for msg_index in range(messages_per_conversation):
+            timestamp = (created + datetime.timedelta(minutes=msg_index)).isoformat()
+            if msg_index % 2 == 0:
+                messages.append({
+                    "role": "user",
+                    "text": f"How do I {sentence(rng, 10)}?",
+                    "source": rng.choice(("text", "voice")),
+                    "timestamp": timestamp,
+                })
+            else:
+                messages.append({
+                    "role": "assistant",
+                    "text": markdown_answer(rng)[:500],
+                    "source": "assistant",
+                    "timestamp": timestamp,
+                })
+        store["conversations"].append({
+            "id": uuid.UUID(int=rng.getrandbits(128)).hex,
+            "title": sentence(rng, 4).capitalize(),
+            "created_at": created.isoformat(),
+            "updated_at": messages[-1]["timestamp"] if messages else created.isoformat(),
+            "messages": messages,
+        })
+    return store
+
+
+def make_info_history(lines=100, seed=7):
+    rng = random.Random(seed)
+    return "\n".join(
+        rng.choice(_INFO_OPERATORS) if index % 4 else f"Info: {sentence(rng, 6)}"
+        for index in range(max(0, int(lines)))
+    )
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_call(function, repeat=5, setup=None):
+    """Run function `repeat` times; returns mean/min/p95 wall time in ms."""
+    samples = []
+    for _ in range(max(1, int(repeat))):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return {
+        "repeat": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1e3, 3),
+        "min_ms": round(min(samples) * 1e3, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1e3, 3),
+    }
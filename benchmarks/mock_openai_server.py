@@ -0,0 +1,427 @@
+"""
+Local stand-in for the OpenAI endpoints Suzanne calls, for offline
+end-to-end latency, load and soak testing.
+
+Implements GET /v1/models, POST /v1/audio/transcriptions and POST /v1/responses
+(JSON or SSE with "stream": true), plus GET /mock/stats. Latency, streaming
+throughput, error and rate-limit injection are configurable.
+
+Run from the repository root, then set the add-on's API Base URL preference
+(or $SUZANNE_VA_API_BASE_URL) to the printed URL:
+    python -m benchmarks.mock_openai_server [--port 8765] [--latency-ms 300] [--rate-limit-rpm 60]
+"""
+import argparse
+import collections
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_CONFIG = {
+    "latency_ms": 0.0,  # time to first byte, every endpoint
+    "jitter_ms": 0.0,  # uniform extra latency in [0, jitter_ms]
+    "tokens_per_second": 0.0,  # output pacing for /v1/responses; 0 = instant
+    "error_rate": 0.0,  # fraction of requests answered with error_status
+    "error_status": 500,
+    "rate_limit_rpm": 0,  # requests per minute; 0 = unlimited
+    "rate_limit_tpm": 0,  # estimated tokens per minute; 0 = unlimited
+    "require_auth": True,
+    "models": ["gpt-4o-mini", "gpt-4o", "gpt-4o-mini-transcribe", "whisper-1"],
+    "transcript": "Add a bevel modifier to the selected object.",
+    "response_text": (
+        "## Add a Bevel\n\n"
+        "1. Select the object and open the **Modifier Properties** tab.\n"
+        "2. Choose **Add Modifier > Generate > Bevel**.\n"
+        "3. Increase `Amount` and `Segments` until the edges look right."
+    ),
+    "seed": 7,
+}
+
+_CHARS_PER_TOKEN = 4
+
+
+def _estimate_tokens(text):
+    return max(1, -(-len(text) // _CHARS_PER_TOKEN)) if text else 0
+
+
+def _format_reset(seconds):
+    # Same shape as the API's x-ratelimit-reset-* headers, e.g. "1.5s" or "20ms".
+    if seconds < 1:
+        return f"{max(1, int(seconds * 1000))}ms"
+    return f"{seconds:.3g}s"
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def take(self, amount, now):
+        """Returns 0.0 when granted, else seconds until `amount` is available."""
+        self._refill(now)
+        amount = min(float(amount), self.capacity)
+        if self.level >= amount:
+            self.level -= amount
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def reset_seconds(self):
+        return (self.capacity - self.level) * 60.0 / self.capacity
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """
+    In-process server; use as a context manager or call start()/stop().
+    Config keys are listed in DEFAULT_CONFIG and may be changed while running.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, **config):
+        unknown = set(config) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown mock server options: {', '.join(sorted(unknown))}")
+        super().__init__((host, port), _MockHandler)
+        self.config = dict(DEFAULT_CONFIG, **config)
+        self.lock = threading.Lock()
+        self.rng = random.Random(self.config["seed"])
+        self.stats = collections.Counter()
+        self.response_ids = set()
+        self.request_bucket = _Bucket(self.config["rate_limit_rpm"]) if self.config["rate_limit_rpm"] else None
+        self.token_bucket = _Bucket(self.config["rate_limit_tpm"]) if self.config["rate_limit_tpm"] else None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def injected_delay(self):
+        with self.lock:
+            jitter = self.rng.uniform(0.0, self.config["jitter_ms"]) if self.config["jitter_ms"] else 0.0
+        return (self.config["latency_ms"] + jitter) / 1000.0
+
+    def should_fail(self):
+        with self.lock:
+            return self.config["error_rate"] > 0 and self.rng.random() < self.config["error_rate"]
+
+    def admit(self, tokens):
+        """
+        Charge the rate-limit buckets.
+        Returns (retry_after_seconds, headers); retry_after is 0.0 when admitted.
+        """
+        headers = {}
+        retry_after = 0.0
+        now = time.monotonic()
+        with self.lock:
+            for bucket, kind, amount in (
+                (self.request_bucket, "requests", 1),
+                (self.token_bucket, "tokens", tokens),
+            ):
+                if bucket is None:
+                    continue
+                retry_after = max(retry_after, bucket.take(amount, now))
+                headers[f"x-ratelimit-limit-{kind}"] = str(int(bucket.capacity))
+                headers[f"x-ratelimit-remaining-{kind}"] = str(int(bucket.level))
+                headers[f"x-ratelimit-reset-{kind}"] = _format_reset(bucket.reset_seconds())
+        if retry_after:
+            headers["retry-after"] = str(max(1, math.ceil(retry_after)))
+            headers["retry-after-ms"] = str(int(retry_after * 1000))
+        return retry_after, headers
+
+    def remember_response(self, response_id):
+        with self.lock:
+            self.response_ids.add(response_id)
+
+    def knows_response(self, response_id):
+        with self.lock:
+            return response_id in self.response_ids
+
+
+def _error_payload(message, error_type, code=None, param=None):
+    return {"error": {"message": message, "type": error_type, "param": param, "code": code}}
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server_version = "SuzanneMockOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    # ------------------------------------------------------------- plumbing
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(f"{self.path} {status}")
+
+    def _gate(self, body_tokens=0):
+        """
+        Injected latency, auth, rate limits and injected errors, in that order.
+        Returns the rate-limit headers when the request may proceed, else None.
+        """
+        server = self.server
+        time.sleep(server.injected_delay())
+        if server.config["require_auth"]:
+            auth = self.headers.get("Authorization", "")
+            if not auth.startswith("Bearer ") or not auth[7:].strip():
+                self._send_json(401, _error_payload("Missing bearer token.", "invalid_request_error", "invalid_api_key"))
+                return None
+        retry_after, headers = server.admit(body_tokens)
+        if retry_after:
+            self._send_json(
+                429,
+                _error_payload("Rate limit reached (mock).", "requests", "rate_limit_exceeded"),
+                headers,
+            )
+            return None
+        if server.should_fail():
+            status = int(server.config["error_status"])
+            self._send_json(status, _error_payload("Injected failure (mock).", "server_error"), headers)
+            return None
+        return headers
+
+    # -------------------------------------------------------------- routing
+
+    def do_GET(self):
+        if self.path == "/mock/stats":
+            self._send_json(200, dict(self.server.stats))
+            return
+        if self.path.rstrip("/") == "/v1/models":
+            headers = self._gate()
+            if headers is None:
+                return
+            data = [
+                {"id": model_id, "object": "model", "created": 0, "owned_by": "suzanne-mock"}
+                for model_id in self.server.config["models"]
+            ]
+            self._send_json(200, {"object": "list", "data": data}, headers)
+            return
+        self._send_json(404, _error_payload(f"Unknown path {self.path}", "invalid_request_error"))
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path.rstrip("/") == "/v1/audio/transcriptions":
+            headers = self._gate()
+            if headers is None:
+                return
+            if b'name="file"' not in body:
+                self._send_json(400, _error_payload("Missing file.", "invalid_request_error", param="file"), headers)
+                return
+            if b'name="stream"\r\n\r\ntrue' in body:
+                self._stream_transcript(self.server.config["transcript"], headers)
+                return
+            self._send_json(200, {"text": self.server.config["transcript"]}, headers)
+            return
+        if self.path.rstrip("/") == "/v1/responses":
+            self._responses(body)
+            return
+        self._send_json(404, _error_payload(f"Unknown path {self.path}", "invalid_request_error"))
+
+    # ----------------------------------------------------------- /responses
+
+    def _responses(self, body):
+        try:
+            payload = json.loads(body.decode("utf-8") or "{}")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self._send_json(400, _error_payload("Invalid JSON body.", "invalid_request_error"))
+            return
+        input_text = payload.get("input")
+        input_text = input_text if isinstance(input_text, str) else json.dumps(input_text or "")
+        instructions = str(payload.get("instructions") or "")
+        input_tokens = _estimate_tokens(instructions) + _estimate_tokens(input_text)
+
+        headers = self._gate(input_tokens)
+        if headers is None:
+            return
+        if not payload.get("model"):
+            self._send_json(400, _error_payload("Missing model.", "invalid_request_error", param="model"), headers)
+            return
+        previous_id = payload.get("previous_response_id")
+        if previous_id and not self.server.knows_response(previous_id):
+            self._send_json(
+                404,
+                _error_payload(
+                    f"Previous response with id '{previous_id}' not found.",
+                    "invalid_request_error",
+                    "previous_response_not_found",
+                    "previous_response_id",
+                ),
+                headers,
+            )
+            return
+
+        text = self.server.config["response_text"]
+        response = {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": payload["model"],
+            "previous_response_id": previous_id,
+            "output": [{
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": _estimate_tokens(text),
+                "total_tokens": input_tokens + _estimate_tokens(text),
+            },
+        }
+        self.server.remember_response(response["id"])
+
+        if payload.get("stream"):
+            self._stream_response(response, text, headers)
+            return
+        tokens_per_second = self.server.config["tokens_per_second"]
+        if tokens_per_second:
+            time.sleep(_estimate_tokens(text) / tokens_per_second)
+        self._send_json(200, response, headers)
+
+    def _event_stream(self, headers, sequence_numbers=True):
+        """Send SSE headers; returns emit(event_type, **data) for the events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+        sequence = 0
+
+        def emit(event_type, **data):
+            nonlocal sequence
+            data = {"type": event_type, **data}
+            if sequence_numbers:
+                data["sequence_number"] = sequence
+            sequence += 1
+            self.wfile.write(f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        return emit
+
+    def _stream_transcript(self, text, headers):
+        # Shape of /v1/audio/transcriptions with stream=true (gpt-4o-*-transcribe models).
+        emit = self._event_stream(headers, sequence_numbers=False)
+        tokens_per_second = self.server.config["tokens_per_second"]
+        try:
+            for index, chunk in enumerate(text.split(" ")):
+                delta = f" {chunk}" if index else chunk
+                if tokens_per_second:
+                    time.sleep(_estimate_tokens(delta) / tokens_per_second)
+                emit("transcript.text.delta", delta=delta)
+            emit("transcript.text.done", text=text)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count(f"{self.path} client_disconnected")
+            return
+        self.server.count(f"{self.path} 200 stream")
+
+    def _stream_response(self, response, text, headers):
+        emit = self._event_stream(headers)
+        item = response["output"][0]
+        in_progress = dict(response, status="in_progress", output=[], usage=None)
+        tokens_per_second = self.server.config["tokens_per_second"]
+        try:
+            emit("response.created", response=in_progress)
+            emit("response.output_item.added", output_index=0, item=dict(item, status="in_progress", content=[]))
+            # One delta per word keeps chunk sizes close to real token deltas.
+            for index, chunk in enumerate(text.split(" ")):
+                delta = f" {chunk}" if index else chunk
+                if tokens_per_second:
+                    time.sleep(_estimate_tokens(delta) / tokens_per_second)
+                emit("response.output_text.delta", item_id=item["id"], output_index=0, content_index=0, delta=delta)
+            emit("response.output_text.done", item_id=item["id"], output_index=0, content_index=0, text=text)
+            emit("response.output_item.done", output_index=0, item=item)
+            emit("response.completed", response=response)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.count(f"{self.path} client_disconnected")
+            return
+        self.server.count(f"{self.path} 200 stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_CONFIG["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_CONFIG["jitter_ms"])
+    parser.add_argument("--tokens-per-second", type=float, default=DEFAULT_CONFIG["tokens_per_second"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_CONFIG["error_rate"])
+    parser.add_argument("--error-status", type=int, default=DEFAULT_CONFIG["error_status"])
+    parser.add_argument("--rate-limit-rpm", type=int, default=DEFAULT_CONFIG["rate_limit_rpm"])
+    parser.add_argument("--rate-limit-tpm", type=int, default=DEFAULT_CONFIG["rate_limit_tpm"])
+    parser.add_argument("--no-auth", action="store_true", help="accept requests without a bearer token")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        args.host,
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        rate_limit_rpm=args.rate_limit_rpm,
+        rate_limit_tpm=args.rate_limit_tpm,
+        require_auth=not args.no_auth,
+    )
+    print(f"Mock OpenAI server listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,347 @@
 import bpy
 from bpy.types import Operator, Panel, AddonPreferences
 from bpy.props import BoolProperty, StringProperty, EnumProperty, IntProperty
+import collections
+import contextlib
 import datetime
+import email.utils
+import heapq
 import json
+import math
 import mimetypes
 import os
 import tempfile
 import time
 import pathlib
 import platform
+import queue
+import random
 import shlex
 import shutil
+import socket
+import threading
 import uuid
 from subprocess import Popen, PIPE, DEVNULL, TimeoutExpired
-from urllib.request import Request, urlopen
+from urllib.parse import urlsplit
+from urllib.request import HTTPHandler, HTTPSHandler, Request, build_opener, urlopen
 from urllib.error import HTTPError, URLError
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
 import textwrap
 import re
 import subprocess
 import wave
 
 _SYNCING_API_KEY = False
-_MODELS_CACHE = {"ts": 0.0, "ids": []}
+_OPENAI_API_BASE_URL = "https://api.openai.com/v1"
+_LOCAL_API_BASE_URL = "http://127.0.0.1:8000/v1"
+# Overrides the default OpenAI base URL when the preference is empty (offline soak tests).
+_API_BASE_URL_ENV = "SUZANNE_VA_API_BASE_URL"
+_BACKEND_OPENAI = "OPENAI"
+_BACKEND_LOCAL = "LOCAL"
+# Chat and transcription each pick one of these in preferences. Every backend
+# speaks the OpenAI HTTP API; they differ in base URL, credentials and model list.
+_BACKENDS = {
+    _BACKEND_OPENAI: {
+        "label": "OpenAI",
+        "description": "OpenAI API (api.openai.com, or the API Base URL override)",
+        "base_url_pref": "api_base_url",
+        "base_url_env": _API_BASE_URL_ENV,
+        "default_base_url": _OPENAI_API_BASE_URL,
+        "api_key_pref": "api_key",
+        "requires_key": True,
+        "models_cache_file": "suzanne_models.json",
+    },
+    _BACKEND_LOCAL: {
+        "label": "OpenAI-compatible Server",
+        "description": "Self-hosted inference server with an OpenAI-compatible API, e.g. on the local network",
+        "base_url_pref": "local_base_url",
+        "base_url_env": "",
+        "default_base_url": _LOCAL_API_BASE_URL,
+        "api_key_pref": "local_api_key",
+        "requires_key": False,
+        "models_cache_file": "suzanne_models_local.json",
+    },
+}
+_BACKEND_ENUM_ITEMS = [
+    (backend_id, backend["label"], backend["description"]) for backend_id, backend in _BACKENDS.items()
+]
+# One model list per backend; the worker threads share the results queue.
+_MODELS_CACHE = {
+    "backends": {
+        backend_id: {
+            "ts": 0.0,
+            "ids": [],
+            "transcribe_ids": [],
+            "loaded": False,
+            "refreshing": False,
+            "last_attempt": 0.0,
+            "failures": 0,
+        }
+        for backend_id in _BACKENDS
+    },
+    "results": queue.Queue(),
+}
+_MODELS_CACHE_TTL_S = 24 * 60 * 60
+_MODELS_POLL_INTERVAL_S = 0.5
+# A failed refresh is not retried automatically before this, doubling per failure up to the TTL.
+_MODELS_REFRESH_BACKOFF_S = 60.0
+_DEFAULT_RESPONSE_MODELS = ("gpt-4o-mini",)
+_DEFAULT_TRANSCRIBE_MODELS = ("gpt-4o-mini-transcribe", "whisper-1")
 _MODEL_ENUM_ITEMS_CACHE = []
 _TRANSCRIBE_ENUM_ITEMS_CACHE = []
-_AUDIO_DEVICES_CACHE = {"ts": 0.0, "items": []}
+# "items" backs the device enum; "devices" holds the last background enumeration.
+_AUDIO_DEVICES_CACHE = {"ts": 0.0, "items": [], "devices": [], "devices_ts": 0.0, "refreshing": False}
+_AUDIO_DEVICES_TTL_S = 5 * 60
 _CONVERSATION_ENUM_ITEMS_CACHE = []
 _INFO_HISTORY_LINE_LIMIT = 100
 _SYSTEM_AUDIO_DEVICE_ID = "system_default"
 _TRANSCRIPT_PREVIEW_LINES = 8
 _RESPONSE_PREVIEW_LINES = 12
+_OUTPUT_TEXT_NAME = "Suzanne Output"
 _NO_CONVERSATION_ID = "__none__"
+# Large transient text and the transcript view live here, keyed by scene,
+# instead of in Scene properties: never written to .blend files or undo steps.
+_RUNTIME_STATE = {}
+# (keymap, keymap_item) pairs added on register, removed on unregister.
+_ADDON_KEYMAPS = []
+_RUNTIME_TEXT_FIELDS = ("last_response", "last_transcript", "last_info_history")
+_RENDERED_LINES_CACHE = collections.OrderedDict()
+_RENDERED_LINES_CACHE_SIZE = 32
+_UI_CHAR_WIDTH_PX = 7.0
+_PANEL_CATEGORY = "Suzanne"
+_REDRAW_COALESCE_S = 1.0 / 60.0
+_REDRAW_PENDING = {"panel": False, "preferences": False}
+_UI_WRAP_PADDING_PX = 48
+_UI_WRAP_BUCKET_CHARS = 4
+_UI_WRAP_MIN_CHARS = 20
 _CONVERSATION_FILE_NAME = "suzanne_conversations.json"
 _CONVERSATION_MESSAGE_CHAR_LIMIT = 500
+_PROMPT_TOKEN_BUDGET_DEFAULT = 6000
+_PROMPT_CHARS_PER_TOKEN = 4
+_PROMPT_CONVERSATION_SHARE = 0.6
+_RESPONSE_CHAIN_MAX_AGE_DAYS = 30
+_SUMMARY_TRIGGER_MESSAGES = 12
+_SUMMARY_CHAR_LIMIT = 1500
+_SUMMARY_POLL_INTERVAL_S = 0.5
+_SUMMARY_JOBS = {"active": set(), "results": queue.Queue()}
+_CONTEXT_INDEX = {
+    "loaded": False,
+    "docs": {},
+    "lengths": {},
+    "postings": {},
+    "titles": {},
+    "total_length": 0,
+    "next_id": 0,
+}
+_SEARCH_RESULTS = {"query": "", "hits": [], "elapsed_ms": 0.0}
+_SEARCH_RESULT_LIMIT = 8
+# Assistant-side undo for conversation edits; these never push scene undo steps.
+_CONVERSATION_HISTORY = []
+_CONVERSATION_HISTORY_LIMIT = 20
+_STORE_REVISION = {"session": uuid.uuid4().hex[:8], "value": 0}
+_TRANSCRIPT_PAGE_SIZE = 20
+_TRANSCRIPT_PREFETCH_PAGES = 1
+_TRANSCRIPT_ROW_CHAR_LIMIT = 160
+_TRANSCRIPT_CACHE = {"key": "", "messages": [], "pages": {}}
+_CONTEXT_INDEX_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or so "
+    "that the this to was what when where which why with you your".split()
+)
+_BM25_K1 = 1.2
+_BM25_B = 0.75
 _FFMPEG_ENV_VAR = "SUZANNE_FFMPEG_PATH"
+_TRACE_LIMIT = 20
+_TRACES = collections.deque(maxlen=_TRACE_LIMIT)
+_ACTIVE_TRACE = {"trace": None}
+# Per-thread trace of the request a worker (or the main thread, while
+# handling that request's results) is working on; see _trace_bind.
+_BOUND_TRACE = threading.local()
+_TRACE_FILE_NAME = "suzanne_traces.jsonl"
+# Transient 429/5xx and dropped connections are retried inside the HTTP helpers.
+_HTTP_RETRY_ATTEMPTS = 4
+_HTTP_RETRY_BASE_S = 0.5
+_HTTP_RETRY_MAX_S = 20.0
+# Longer server hints than this fall back to the capped backoff.
+_HTTP_RETRY_HINT_MAX_S = 60.0
+_RETRYABLE_HTTP_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Client-side token buckets per API origin, refilled from x-ratelimit-* headers
+# so bursts from one add-on queue briefly instead of collecting 429s.
+# "in_flight" holds what paced requests still awaiting a reply have reserved;
+# the server's remaining counts do not include them yet.
+_RATE_LIMITS = {"lock": threading.Lock(), "buckets": {}, "in_flight": {}}
+_RATE_LIMIT_MAX_WAIT_S = 30.0
+# Assistant turns not yet finished, in submission order. At most
+# _REQUEST_MAX_CONCURRENCY run at once; the rest wait as "queued". Workers only
+# do HTTP and post (job, event, payload) to "results";
+# operators._apply_request_results applies them on the main thread.
+_REQUEST_JOBS = {"jobs": [], "results": queue.Queue()}
+_REQUEST_MAX_CONCURRENCY = 2
+_REQUEST_QUEUE_LIMIT = 8
+_REQUEST_POLL_INTERVAL_S = 0.1
+_REQUEST_QUEUE_FULL_MESSAGE = "Too many requests are waiting; cancel or wait for one to finish."
+# Speculative voice replies start, at most once per turn, from a partial
+# transcript with at least this many words in finished sentences once it has
+# stopped growing for _SPECULATION_SETTLE_S, and are kept only when the final
+# transcript has the same words, ignoring these trailing fillers.
+_SPECULATION_MIN_WORDS = 4
+_SPECULATION_SETTLE_S = 0.6
+_SPECULATION_FILLER_WORDS = frozenset("please thanks thank you um uh okay ok so".split())
 ADDON_MODULE = (__package__.split(".")[0] if __package__ else __name__.split(".")[0])
 
 # ---------------------------- utils ----------------------------
 
-def _tag_redraw_all():
+def _trace_begin(kind):
+    """Start timing one assistant turn; stages report into it via _trace_span."""
+    trace = {
+        "kind": kind,
+        "started_at": _now_iso_timestamp(),
+        "status": "",
+        "total_ms": 0.0,
+        "spans": [],
+        "_t0": time.perf_counter(),
+    }
+    _ACTIVE_TRACE["trace"] = trace
+    return trace
+
+def _current_trace():
+    # Worker threads only see a trace bound with _trace_bind: an unbound one
+    # (summaries, model refreshes) must not write into the main thread's turn.
+    trace = getattr(_BOUND_TRACE, "trace", None)
+    if trace is not None or threading.current_thread() is not threading.main_thread():
+        return trace
+    return _ACTIVE_TRACE["trace"]
+
+def _trace_detach():
+    """Hand the active trace over to a request job; it is ended via _trace_end(trace=...)."""
+    trace = _ACTIVE_TRACE["trace"]
+    _ACTIVE_TRACE["trace"] = None
+    return trace
+
+@contextlib.contextmanager
+def _trace_bind(trace):
+    # Spans in this thread report into `trace` until the block exits.
+    previous = getattr(_BOUND_TRACE, "trace", None)
+    _BOUND_TRACE.trace = trace
+    try:
+        yield trace
+    finally:
+        _BOUND_TRACE.trace = previous
+
+@contextlib.contextmanager
+def _trace_span(name):
+    # Also usable as a decorator; a no-op when no turn is being traced.
+    trace = _current_trace()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace["spans"].append([name, round((time.perf_counter() - started) * 1000.0, 2)])
+
+def _trace_end(status, prefs=None, trace=None):
+    if trace is None:
+        trace = _ACTIVE_TRACE["trace"]
+    if trace is _ACTIVE_TRACE["trace"]:
+        _ACTIVE_TRACE["trace"] = None
+    if trace is None or "_t0" not in trace:
+        return None
+
+    trace["status"] = status
+    trace["total_ms"] = round((time.perf_counter() - trace.pop("_t0")) * 1000.0, 2)
+    _TRACES.append(trace)
+    _log(
+        f"Trace {trace['kind']} ({status}) {trace['total_ms']:.0f} ms: "
+        + ", ".join(f"{name} {ms:.0f} ms" for name, ms in trace["spans"])
+    )
+    if prefs is not None and getattr(prefs, "write_latency_traces", False):
+        _append_trace_file(trace)
+    _request_redraw(preferences=True)
+    return trace
+
+def _traces_path():
+    return _conversation_storage_dir() / _TRACE_FILE_NAME
+
+def _append_trace_file(trace):
+    try:
+        with _traces_path().open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(trace, ensure_ascii=False) + "\n")
+        return True
+    except OSError as exc:
+        _log(f"Could not write latency trace: {exc}")
+        return False
+
+def _tag_redraw_targets(preferences=False):
+    """Tag only the regions that can show Suzanne UI.
+
+    That is the sidebar of each 3D Viewport with the Suzanne tab open and,
+    when ``preferences`` is set, the Preferences editor (diagnostics).
+    """
     wm = bpy.context.window_manager
     for win in wm.windows:
         scr = win.screen
         if not scr:
             continue
         for area in scr.areas:
-            area.tag_redraw()
+            if area.type == 'VIEW_3D':
+                for region in area.regions:
+                    if region.type != 'UI' or region.width <= 1:
+                        continue
+                    # Older Blender builds cannot report the open sidebar tab.
+                    category = getattr(region, "active_panel_category", "") or ""
+                    if category in (_PANEL_CATEGORY, "", "UNSUPPORTED"):
+                        region.tag_redraw()
+            elif preferences and area.type == 'PREFERENCES':
+                area.tag_redraw()
+
+def _flush_redraws():
+    preferences = _REDRAW_PENDING["preferences"]
+    _REDRAW_PENDING["panel"] = False
+    _REDRAW_PENDING["preferences"] = False
+    _tag_redraw_targets(preferences=preferences)
+    return None
+
+def _request_redraw(preferences=False):
+    # Requests made within one coalescing window share a single redraw pass.
+    _REDRAW_PENDING["panel"] = True
+    _REDRAW_PENDING["preferences"] = _REDRAW_PENDING["preferences"] or preferences
+    if not bpy.app.timers.is_registered(_flush_redraws):
+        bpy.app.timers.register(_flush_redraws, first_interval=_REDRAW_COALESCE_S)
+
+def _ui_wrap_width(context=None, fallback=70):
+    """Characters per label row for the region being drawn, in width buckets.
+
+    Falls back to ``fallback`` when there is no region (background mode, tests).
+    Widths are rounded down to a bucket so dragging the sidebar edge only
+    re-wraps text when the bucket changes.
+    """
+    context = context or bpy.context
+    region_width = getattr(getattr(context, "region", None), "width", 0) or 0
+    if region_width <= 0:
+        return fallback
+
+    system = getattr(getattr(context, "preferences", None), "system", None)
+    ui_scale = float(getattr(system, "ui_scale", 0.0) or 1.0)
+    chars = int((region_width - _UI_WRAP_PADDING_PX * ui_scale) / (_UI_CHAR_WIDTH_PX * ui_scale))
+    chars -= chars % _UI_WRAP_BUCKET_CHARS
+    return max(_UI_WRAP_MIN_CHARS, chars)
 
 def _wrap_ui_text(text, width=70):
     if not text:
         return [""]
+    text = str(text)
+    key = ("wrap", hash(text), len(text), width)
+    cached = _RENDERED_LINES_CACHE.get(key)
+    if cached is not None:
+        _RENDERED_LINES_CACHE.move_to_end(key)
+        return list(cached)
+
     lines = []
-    for raw_line in str(text).splitlines():
+    for raw_line in text.splitlines():
         if not raw_line.strip():
             lines.append("")
             continue
         lines.extend(textwrap.wrap(raw_line, width=width, replace_whitespace=False))
+    _remember_rendered_lines(key, tuple(lines))
     return lines
 
 def _clean_markdown(text):
@@ -74,12 +360,46 @@ def _clean_markdown(text):
 def _response_lines(text, width=80):
     return _wrap_ui_text(_clean_markdown(text), width=width)
 
+def _remember_rendered_lines(key, value):
+    _RENDERED_LINES_CACHE[key] = value
+    while len(_RENDERED_LINES_CACHE) > _RENDERED_LINES_CACHE_SIZE:
+        _RENDERED_LINES_CACHE.popitem(last=False)
+
+def _invalidate_rendered_lines():
+    _RENDERED_LINES_CACHE.clear()
+
+def _runtime_state_key(scene):
+    # The full name survives undo steps and file reloads; session_uid and id() do not.
+    return getattr(scene, "name_full", "") or getattr(scene, "name", "") or id(scene)
+
+def _runtime_text(scene, name):
+    return _RUNTIME_STATE.get(_runtime_state_key(scene), {}).get(name, "")
+
+def _set_runtime_text(scene, name, value):
+    if name not in _RUNTIME_TEXT_FIELDS:
+        raise KeyError(name)
+    state = _RUNTIME_STATE.setdefault(_runtime_state_key(scene), {})
+    value = str(value or "")
+    if state.get(name, "") == value:
+        return
+    state[name] = value
+    if name != "last_info_history":
+        _invalidate_rendered_lines()
+
 def _preview_response_lines(text, width=80, max_lines=10, expanded=False):
+    text = str(text or "")
+    key = ("preview", hash(text), len(text), width, max_lines, bool(expanded))
+    cached = _RENDERED_LINES_CACHE.get(key)
+    if cached is not None:
+        _RENDERED_LINES_CACHE.move_to_end(key)
+        return list(cached[0]), cached[1]
+
     full_lines = _response_lines(text, width=width)
     needs_toggle = len(full_lines) > max_lines
-    if expanded or not needs_toggle:
-        return full_lines, needs_toggle
-    return full_lines[:max_lines], needs_toggle
+    lines = full_lines if expanded or not needs_toggle else full_lines[:max_lines]
+
+    _remember_rendered_lines(key, (tuple(lines), needs_toggle))
+    return lines, needs_toggle
 
 def _bundled_ffmpeg_candidates():
     bin_dir = _addon_dir() / "bin"
@@ -156,11 +476,10 @@ def _draw_expand_toggle(layout, scene, prop_name):
         emboss=False,
     )
 
-def _blender_only_prefix(text):
+def _blender_only_guidance():
     return (
         "Answer only about Blender. If the question is unrelated to Blender, "
-        "say you can only help with Blender and ask them to rephrase for Blender.\n\n"
-        f"User question: {text}"
+        "say you can only help with Blender and ask them to rephrase for Blender."
     )
 
 def _tail_lines(text, limit):
@@ -206,6 +525,11 @@ def _history_guidance_block():
         "- If details are missing, say what is uncertain and ask one focused follow-up."
     )
 
+def _system_instructions():
+    # Sent as the Responses API `instructions` field. Keep it byte-identical
+    # across requests so the provider can serve it from its prompt cache.
+    return f"{_blender_only_guidance()}\n\n{_history_guidance_block()}"
+
 def _find_area_context(area_type):
     wm = bpy.context.window_manager
     for window in wm.windows:
@@ -332,6 +656,7 @@ def _operator_snapshot_lines(limit):
 
     return _tail_lines("\n".join(lines), limit)
 
+@_trace_span("info_history")
 def _get_info_history_lines(limit=_INFO_HISTORY_LINE_LIMIT):
     """
     Best-effort copy of the Info editor report history.
@@ -362,16 +687,14 @@ def _build_markdown_input(
     is_voice=False,
     conversation_context_text="",
 ):
+    # Fixed section order, least volatile first; the user turn always goes last.
     user_header = "Voice Transcript" if is_voice else "User Prompt"
     sections = []
 
     if conversation_context_text:
         sections.append(conversation_context_text)
 
-    sections.append(f"## {user_header}\n{(user_text or '').strip()}")
-
     if context_text:
-        sections.insert(0, _history_guidance_block())
         sections.append(
             "## Blender Session History (last 100 lines)\n"
             "```text\n"
@@ -379,13 +702,144 @@ def _build_markdown_input(
             "```"
         )
 
+    sections.append(f"## {user_header}\n{(user_text or '').strip()}")
+
     return "\n\n".join(sections).strip()
 
-def _get_models_from_api(api_key):
-    if not api_key:
+def _estimate_tokens(text):
+    """
+    Fast local token estimate, no tokenizer dependency.
+    Takes the larger of the ~4 chars/token and ~0.75 words/token heuristics.
+    """
+    if not text:
+        return 0
+    value = str(text)
+    by_chars = -(-len(value) // _PROMPT_CHARS_PER_TOKEN)
+    by_words = len(value.split()) * 4 // 3
+    return max(1, by_chars, by_words)
+
+def _clip_to_tokens(text, max_tokens):
+    value = str(text or "").strip()
+    if max_tokens <= 0:
+        return ""
+    if _estimate_tokens(value) <= max_tokens:
+        return value
+    return _clip_text(value, max_tokens * _PROMPT_CHARS_PER_TOKEN)
+
+def _newest_lines_within_tokens(lines, max_tokens):
+    # Walk newest-first so the oldest lines are the first to be dropped.
+    kept = []
+    used = 0
+    for line in reversed(list(lines)):
+        cost = _estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    kept.reverse()
+    return kept
+
+def _prompt_token_budget(scene):
+    try:
+        budget = int(getattr(scene, "suzanne_va_prompt_token_budget", _PROMPT_TOKEN_BUDGET_DEFAULT))
+    except (TypeError, ValueError):
+        budget = _PROMPT_TOKEN_BUDGET_DEFAULT
+    return max(256, budget)
+
+@_trace_span("prompt_assembly")
+def _assemble_prompt(scene, user_text, info_context, is_voice=False, include_conversation=True, conversation=None):
+    """
+    Build the final prompt inside the scene's token budget.
+    Priority: user text, then conversation turns, then Info history.
+    Conversation turns and history lines are trimmed oldest-first.
+    Pass include_conversation=False when the provider already holds the turns,
+    and `conversation` when the active conversation is already loaded.
+    The estimate includes the static instructions sent alongside the input.
+    Returns (input_text, estimated_tokens).
+    """
+    budget = _prompt_token_budget(scene)
+    instructions_tokens = _estimate_tokens(_system_instructions())
+    remaining = budget - instructions_tokens - _estimate_tokens(_build_markdown_input("", "", is_voice=is_voice))
+
+    user_clean = _clip_to_tokens(user_text, remaining)
+    remaining -= _estimate_tokens(user_clean)
+
+    history_lines = [line for line in str(info_context or "").splitlines() if line.strip()]
+    if history_lines:
+        history_overhead = _estimate_tokens("## Blender Session History (last 100 lines)\n```text\n```")
+        conversation_budget = int(max(0, remaining - history_overhead) * _PROMPT_CONVERSATION_SHARE)
+    else:
+        history_overhead = 0
+        conversation_budget = remaining
+
+    conversation_context = ""
+    if include_conversation:
+        conversation_context = _conversation_context_block(
+            scene,
+            max_tokens=conversation_budget,
+            query=user_clean,
+            conversation=conversation,
+        )
+    remaining -= _estimate_tokens(conversation_context)
+
+    history_text = ""
+    if history_lines:
+        history_text = "\n".join(_newest_lines_within_tokens(history_lines, remaining - history_overhead))
+
+    prompt_text = _build_markdown_input(
+        user_clean,
+        history_text,
+        is_voice=is_voice,
+        conversation_context_text=conversation_context,
+    )
+    return prompt_text, instructions_tokens + _estimate_tokens(prompt_text)
+
+def _response_output_text(response):
+    if not isinstance(response, dict):
+        return ""
+    response_text = response.get("output_text")
+    if response_text:
+        return response_text
+    response_text = ""
+    for item in response.get("output", []):
+        if item.get("type") == "message":
+            for content in item.get("content", []):
+                if content.get("type") == "output_text":
+                    response_text += content.get("text", "")
+    return response_text
+
+def _response_usage(response):
+    """
+    Token counts from a Responses API usage block.
+    Returns (input_tokens, cached_tokens, output_tokens); zeros when absent.
+    """
+    usage = response.get("usage") if isinstance(response, dict) else None
+    if not isinstance(usage, dict):
+        return 0, 0, 0
+    details = usage.get("input_tokens_details")
+    if not isinstance(details, dict):
+        details = {}
+    try:
+        return (
+            int(usage.get("input_tokens") or 0),
+            int(details.get("cached_tokens") or 0),
+            int(usage.get("output_tokens") or 0),
+        )
+    except (TypeError, ValueError):
+        return 0, 0, 0
+
+def _record_response_usage(scene, response):
+    input_tokens, cached_tokens, output_tokens = _response_usage(response)
+    scene.suzanne_va_last_input_tokens = input_tokens
+    scene.suzanne_va_last_cached_tokens = cached_tokens
+    if input_tokens:
+        _log(f"Usage: {input_tokens} input ({cached_tokens} cached), {output_tokens} output tokens")
+
+def _get_models_from_api(api_key, base_url="", require_key=True):
+    if require_key and not api_key:
         return []
     try:
-        response_text = _get_json("https://api.openai.com/v1/models", api_key)
+        response_text = _get_json(_api_url("models", base_url=base_url), api_key)
         data = json.loads(response_text).get("data", [])
         ids = [m.get("id") for m in data if m.get("id")]
         ids = sorted(set(ids))
@@ -393,17 +847,147 @@ def _get_models_from_api(api_key):
     except Exception:
         return []
 
-def _get_models_cached(api_key, force=False):
-    if force:
-        _MODELS_CACHE["ids"] = _get_models_from_api(api_key)
-        _MODELS_CACHE["ts"] = time.time()
-    return list(_MODELS_CACHE["ids"])
+def _models_cache(backend=_BACKEND_OPENAI):
+    return _MODELS_CACHE["backends"][backend]
+
+def _models_cache_path(backend=_BACKEND_OPENAI):
+    return _conversation_storage_dir() / _BACKENDS[backend]["models_cache_file"]
+
+def _transcribe_model_ids(ids, backend=_BACKEND_OPENAI):
+    if backend == _BACKEND_OPENAI:
+        return [m for m in ids if "transcribe" in m or m == "whisper-1"]
+    # Self-hosted servers name their speech models freely; offer every model
+    # when none of them looks like one.
+    matches = [m for m in ids if "transcribe" in m.lower() or "whisper" in m.lower()]
+    return matches or list(ids)
+
+def _set_models_cache(ids, ts, backend=_BACKEND_OPENAI):
+    cache = _models_cache(backend)
+    cache["ids"] = list(ids)
+    cache["transcribe_ids"] = _transcribe_model_ids(ids, backend)
+    cache["ts"] = float(ts)
+
+def _load_models_cache(backend=_BACKEND_OPENAI):
+    _models_cache(backend)["loaded"] = True
+    try:
+        payload = json.loads(_models_cache_path(backend).read_text(encoding="utf-8"))
+        ids = [str(m) for m in payload.get("ids", []) if m]
+        ts = float(payload.get("ts") or 0.0)
+    except (OSError, ValueError, TypeError, AttributeError):
+        return False
+    if not ids:
+        return False
+    _set_models_cache(ids, ts, backend)
+    return True
+
+def _save_models_cache(backend=_BACKEND_OPENAI):
+    cache = _models_cache(backend)
+    path = _models_cache_path(backend)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp_path.write_text(
+            json.dumps({"ts": cache["ts"], "ids": cache["ids"]}, indent=2),
+            encoding="utf-8",
+        )
+        tmp_path.replace(path)
+        return True
+    except OSError as exc:
+        _log(f"Could not save model list cache: {exc}")
+        return False
+
+def _models_cache_is_stale(backend=_BACKEND_OPENAI):
+    cache = _models_cache(backend)
+    return not cache["ids"] or time.time() - cache["ts"] > _MODELS_CACHE_TTL_S
+
+def _models_refresh_backed_off(backend=_BACKEND_OPENAI):
+    cache = _models_cache(backend)
+    if not cache["failures"]:
+        return False
+    delay = min(_MODELS_CACHE_TTL_S, _MODELS_REFRESH_BACKOFF_S * 2 ** (cache["failures"] - 1))
+    return time.time() - cache["last_attempt"] < delay
+
+def _refresh_models_async(endpoint, force=False):
+    """
+    Start a background /v1/models fetch for the endpoint's backend when its
+    list is stale. After a failure only `force` (the Refresh button) retries
+    before the backoff has passed, so panel redraws cannot loop on a dead server.
+    """
+    backend = endpoint["backend"]
+    cache = _models_cache(backend)
+    if _endpoint_key_error(endpoint) or cache["refreshing"]:
+        return False
+    if not force and (not _models_cache_is_stale(backend) or _models_refresh_backed_off(backend)):
+        return False
+
+    cache["refreshing"] = True
+    cache["last_attempt"] = time.time()
+    worker = threading.Thread(target=_run_models_refresh, args=(dict(endpoint), force), daemon=True)
+    worker.start()
+    if not bpy.app.timers.is_registered(_apply_models_refresh):
+        bpy.app.timers.register(_apply_models_refresh, first_interval=_MODELS_POLL_INTERVAL_S)
+    return True
+
+def _run_models_refresh(endpoint, force=False):
+    # Worker thread: network only, no bpy access.
+    ids = _get_models_from_api(
+        endpoint["api_key"],
+        base_url=endpoint["base_url"],
+        require_key=endpoint["requires_key"],
+    )
+    _MODELS_CACHE["results"].put((endpoint["backend"], ids, force))
+
+def _apply_models_refresh():
+    prefs = _get_addon_preferences()
+    while True:
+        try:
+            backend, ids, forced = _MODELS_CACHE["results"].get_nowait()
+        except queue.Empty:
+            break
+        cache = _models_cache(backend)
+        cache["refreshing"] = False
+        label = _BACKENDS[backend]["label"]
+        if ids:
+            cache["failures"] = 0
+            _set_models_cache(ids, time.time(), backend)
+            _save_models_cache(backend)
+            message = f"{label} model list refreshed ({len(ids)} models)."
+        else:
+            cache["failures"] += 1
+            message = f"Could not refresh the {label} model list."
+        # Only the Refresh button reports to Diagnostics; background refreshes
+        # must not replace an error the user may be about to copy.
+        if not forced:
+            _log(message)
+        elif ids:
+            _set_diagnostics_message(prefs, message=message)
+        else:
+            _set_diagnostics_message(prefs, error=message)
+
+    if any(cache["refreshing"] for cache in _MODELS_CACHE["backends"].values()):
+        return _MODELS_POLL_INTERVAL_S
+    return None
+
+def _get_models_cached(endpoint, force=False):
+    """
+    Cached model ids of the endpoint's backend; never blocks on the network.
+    The on-disk list is loaded once per session, and a background refresh is
+    started when it is older than the TTL (or when forced).
+    """
+    cache = _models_cache(endpoint["backend"])
+    if not cache["loaded"]:
+        _load_models_cache(endpoint["backend"])
+    _refresh_models_async(endpoint, force=force)
+    return list(cache["ids"])
+
+def _get_transcribe_models_cached(endpoint):
+    _get_models_cached(endpoint)
+    return list(_models_cache(endpoint["backend"])["transcribe_ids"])
 
 def _model_enum_items(self, context):
     prefs = _get_addon_preferences(context)
-    ids = _get_models_cached(_get_effective_api_key(prefs))
+    ids = _get_models_cached(_backend_endpoint(prefs, "chat"))
     if not ids:
-        ids = ["gpt-4o-mini"]
+        ids = list(_DEFAULT_RESPONSE_MODELS)
     return _set_enum_items_cache(
         _MODEL_ENUM_ITEMS_CACHE,
         [(m, m, "") for m in ids],
@@ -411,18 +995,22 @@ def _model_enum_items(self, context):
 
 def _transcribe_model_enum_items(self, context):
     prefs = _get_addon_preferences(context)
-    ids = _get_models_cached(_get_effective_api_key(prefs))
-    transcribe_ids = [
-        m for m in ids
-        if "transcribe" in m or m == "whisper-1"
-    ]
+    transcribe_ids = _get_transcribe_models_cached(_backend_endpoint(prefs, "transcription"))
     if not transcribe_ids:
-        transcribe_ids = ["gpt-4o-mini-transcribe", "whisper-1"]
+        transcribe_ids = list(_DEFAULT_TRANSCRIBE_MODELS)
     return _set_enum_items_cache(
         _TRANSCRIBE_ENUM_ITEMS_CACHE,
         [(m, m, "") for m in transcribe_ids],
     )
 
+def _on_backend_changed(self, context):
+    # Start loading the newly selected backend's model list right away.
+    for role in ("chat", "transcription"):
+        endpoint = _backend_endpoint(self, role)
+        if not _models_cache(endpoint["backend"])["loaded"]:
+            _load_models_cache(endpoint["backend"])
+        _refresh_models_async(endpoint)
+
 def _get_audio_devices_linux():
     arecord = shutil.which("arecord")
     if not arecord:
@@ -501,6 +1089,44 @@ def _get_audio_devices_macos():
         items = [("default", "default", "default")]
     return items
 
+def _enumerate_audio_devices():
+    os_platform = platform.system()
+    if os_platform == "Darwin":
+        return _get_audio_devices_macos()
+    if os_platform == "Windows":
+        return _get_audio_devices_windows()
+    if os_platform == "Linux":
+        return _get_audio_devices_linux()
+    return [("default", "default", "default")]
+
+def _refresh_audio_devices_async(force=False):
+    """Enumerate input devices on a worker thread when the cached list is stale."""
+    if _AUDIO_DEVICES_CACHE["refreshing"]:
+        return False
+    age = time.time() - _AUDIO_DEVICES_CACHE["devices_ts"]
+    if not force and _AUDIO_DEVICES_CACHE["devices_ts"] and age < _AUDIO_DEVICES_TTL_S:
+        return False
+
+    _AUDIO_DEVICES_CACHE["refreshing"] = True
+    threading.Thread(target=_run_audio_devices_refresh, daemon=True).start()
+    return True
+
+def _run_audio_devices_refresh():
+    # Worker thread: subprocess only, no bpy access.
+    try:
+        devices = _enumerate_audio_devices()
+    except Exception as exc:
+        _log(f"Audio device enumeration failed: {exc}")
+        devices = []
+    _AUDIO_DEVICES_CACHE["devices"] = list(devices)
+    _AUDIO_DEVICES_CACHE["devices_ts"] = time.time()
+    _AUDIO_DEVICES_CACHE["refreshing"] = False
+
+def _cached_audio_devices():
+    """Last enumerated devices without blocking; may be empty until the first scan ends."""
+    _refresh_audio_devices_async()
+    return list(_AUDIO_DEVICES_CACHE["devices"])
+
 def _first_non_default_audio_device(items):
     for dev_id, _label, _desc in items:
         device = str(dev_id or "").strip()
@@ -539,6 +1165,7 @@ def _set_diagnostics_message(prefs, message="", error=""):
         return
     prefs.diagnostics_last_message = _clip_text(message, 240) if message else ""
     prefs.diagnostics_last_error = _clip_text(error, 260) if error else ""
+    _request_redraw(preferences=True)
 
 def _show_file_in_os(path):
     try:
@@ -567,7 +1194,7 @@ def _microphone_probe_candidates(ffmpeg_path, output_path):
             [ffmpeg_path, "-nostdin", "-f", "wasapi", "-i", "default"] + common_tail,
             [ffmpeg_path, "-nostdin", "-f", "dshow", "-i", "audio=default"] + common_tail,
         ]
-        fallback_device = _first_non_default_audio_device(_get_audio_devices_windows())
+        fallback_device = _first_non_default_audio_device(_cached_audio_devices())
         if fallback_device:
             candidates.append(
                 [ffmpeg_path, "-nostdin", "-f", "dshow", "-i", f"audio={fallback_device}"] + common_tail
@@ -731,20 +1358,33 @@ def _normalize_conversation(raw):
         text = str(msg.get("text") or "").strip()
         if not text:
             continue
-        messages.append({
+        message = {
             "role": role,
             "text": text,
             "source": str(msg.get("source") or ""),
             "timestamp": str(msg.get("timestamp") or ""),
-        })
+        }
+        response_id = str(msg.get("response_id") or "").strip()
+        if role == "assistant" and response_id:
+            message["response_id"] = response_id
+        messages.append(message)
 
-    return {
+    normalized = {
         "id": conversation_id,
         "title": title,
         "created_at": created_at,
         "updated_at": updated_at,
         "messages": messages,
     }
+    summary = str(raw.get("summary") or "").strip()
+    if summary:
+        try:
+            summarized_messages = int(raw.get("summarized_messages") or 0)
+        except (TypeError, ValueError):
+            summarized_messages = 0
+        normalized["summary"] = summary
+        normalized["summarized_messages"] = max(0, min(len(messages), summarized_messages))
+    return normalized
 
 def _load_conversation_store():
     path = _conversation_store_path()
@@ -771,6 +1411,7 @@ def _load_conversation_store():
         "conversations": normalized,
     }
 
+@_trace_span("save_conversation")
 def _save_conversation_store(store):
     path = _conversation_store_path()
     tmp_path = path.with_suffix(path.suffix + ".tmp")
@@ -785,6 +1426,7 @@ def _save_conversation_store(store):
             encoding="utf-8",
         )
         tmp_path.replace(path)
+        _STORE_REVISION["value"] += 1
         return True
     except Exception as exc:
         _log(f"Could not save conversations file: {exc}")
@@ -878,17 +1520,36 @@ def _conversation_enum_items(self, context):
 
     return _set_enum_items_cache(_CONVERSATION_ENUM_ITEMS_CACHE, items)
 
-def _conversation_context_block(scene):
+def _format_conversation_context(lines):
+    if not lines:
+        return ""
+    joined_lines = "\n".join(lines)
+
+    return (
+        "## Previous Conversation Context\n"
+        "```text\n"
+        f"{joined_lines}\n"
+        "```"
+    )
+
+def _conversation_context_block(scene, max_tokens=None, query="", conversation=None):
     if not getattr(scene, "suzanne_va_use_conversation_context", False):
         return ""
 
-    conversation, _ = _get_active_conversation(scene, create_if_missing=False)
+    if conversation is None:
+        conversation, _ = _get_active_conversation(scene, create_if_missing=False)
     if not conversation:
         return ""
 
     max_turns = max(1, int(getattr(scene, "suzanne_va_context_turns", 4)))
     max_messages = max_turns * 2
-    recent_messages = conversation.get("messages", [])[-max_messages:]
+    messages = conversation.get("messages", [])
+    if getattr(scene, "suzanne_va_context_mode", "recent") == "relevant" and str(query or "").strip():
+        recent_messages = _relevant_context_messages(conversation, query, max_turns)
+    else:
+        # Turns already folded into the running summary are not repeated.
+        summarized = int(conversation.get("summarized_messages", 0) or 0)
+        recent_messages = messages[max(summarized, len(messages) - max_messages):]
 
     lines = []
     for msg in recent_messages:
@@ -898,27 +1559,197 @@ def _conversation_context_block(scene):
             continue
         lines.append(f"{role}: {text}")
 
-    if not lines:
-        return ""
-    joined_lines = "\n".join(lines)
+    summary_line = ""
+    summary = str(conversation.get("summary") or "").strip()
+    if summary:
+        summary_line = f"Summary of earlier turns: {summary}"
 
-    return (
-        "## Previous Conversation Context\n"
-        "```text\n"
-        f"{joined_lines}\n"
-        "```"
-    )
+    if max_tokens is not None:
+        # Recent turns win over the summary when the budget is tight.
+        remaining = max_tokens - _estimate_tokens(_format_conversation_context(["-"]))
+        lines = _newest_lines_within_tokens(lines, remaining)
+        remaining -= sum(_estimate_tokens(line) + 1 for line in lines)
+        if summary_line and _estimate_tokens(summary_line) + 1 > remaining:
+            summary_line = ""
+
+    if summary_line:
+        lines.insert(0, summary_line)
+    return _format_conversation_context(lines)
+
+def _index_terms(text):
+    return [
+        term for term in re.findall(r"[a-z0-9_]+", str(text or "").lower())
+        if len(term) > 1 and term not in _CONTEXT_INDEX_STOPWORDS
+    ]
+
+def _context_index_reset():
+    _CONTEXT_INDEX["loaded"] = False
+    _CONTEXT_INDEX["docs"] = {}
+    _CONTEXT_INDEX["lengths"] = {}
+    _CONTEXT_INDEX["postings"] = {}
+    _CONTEXT_INDEX["titles"] = {}
+    _CONTEXT_INDEX["total_length"] = 0
+    _CONTEXT_INDEX["next_id"] = 0
+
+def _context_index_add(conversation_id, user_text, assistant_text):
+    terms = _index_terms(f"{user_text}\n{assistant_text}")
+    if not terms:
+        return None
+    doc_id = _CONTEXT_INDEX["next_id"]
+    _CONTEXT_INDEX["next_id"] = doc_id + 1
+    _CONTEXT_INDEX["docs"][doc_id] = {
+        "conversation_id": conversation_id,
+        "user": user_text,
+        "assistant": assistant_text,
+    }
+    _CONTEXT_INDEX["lengths"][doc_id] = len(terms)
+    _CONTEXT_INDEX["total_length"] += len(terms)
+    postings = _CONTEXT_INDEX["postings"]
+    for term in terms:
+        term_docs = postings.setdefault(term, {})
+        term_docs[doc_id] = term_docs.get(doc_id, 0) + 1
+    return doc_id
+
+def _conversation_exchanges(conversation):
+    # Pair each user message with the assistant reply that directly follows it.
+    messages = conversation.get("messages", [])
+    exchanges = []
+    for index, msg in enumerate(messages):
+        if msg.get("role") != "user":
+            continue
+        reply = ""
+        if index + 1 < len(messages) and messages[index + 1].get("role") == "assistant":
+            reply = messages[index + 1].get("text", "")
+        exchanges.append((msg.get("text", ""), reply))
+    return exchanges
+
+def _ensure_context_index(store=None):
+    if _CONTEXT_INDEX["loaded"]:
+        return
+    _context_index_reset()
+    store = store if store is not None else _load_conversation_store()
+    for conversation in store.get("conversations", []):
+        _CONTEXT_INDEX["titles"][conversation.get("id", "")] = conversation.get("title", "")
+        for user_text, assistant_text in _conversation_exchanges(conversation):
+            _context_index_add(conversation.get("id", ""), user_text, assistant_text)
+    _CONTEXT_INDEX["loaded"] = True
+
+def _context_index_search(query, limit):
+    """
+    BM25 ranking over indexed exchanges in all conversations.
+    Returns up to `limit` (score, doc) pairs, best first.
+    """
+    _ensure_context_index()
+    docs = _CONTEXT_INDEX["docs"]
+    if not docs or limit <= 0:
+        return []
+    doc_count = len(docs)
+    lengths = _CONTEXT_INDEX["lengths"]
+    postings = _CONTEXT_INDEX["postings"]
+    # BM25 length normalisation split into a constant and a per-length term.
+    norm_base = _BM25_K1 * (1.0 - _BM25_B)
+    norm_scale = _BM25_K1 * _BM25_B * doc_count / _CONTEXT_INDEX["total_length"]
+
+    scores = {}
+    for term in set(_index_terms(query)):
+        term_docs = postings.get(term)
+        if not term_docs:
+            continue
+        weight = (_BM25_K1 + 1.0) * math.log(1.0 + (doc_count - len(term_docs) + 0.5) / (len(term_docs) + 0.5))
+        for doc_id, frequency in term_docs.items():
+            gain = weight * frequency / (frequency + norm_base + norm_scale * lengths[doc_id])
+            scores[doc_id] = scores.get(doc_id, 0.0) + gain
+
+    best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    return [(score, docs[doc_id]) for doc_id, score in best]
+
+def _relevant_context_messages(conversation, query, max_turns):
+    """
+    The active conversation's latest exchange plus the past exchanges (from
+    any conversation) that best match the query, least relevant first.
+    """
+    exchanges = _conversation_exchanges(conversation)
+    latest = exchanges[-1] if exchanges else None
+
+    selected = []
+    for _score, doc in _context_index_search(query, max_turns):
+        exchange = (doc["user"], doc["assistant"])
+        if exchange == latest or exchange in selected:
+            continue
+        selected.append(exchange)
+    selected = selected[:max_turns - 1] if latest else selected[:max_turns]
+    selected.reverse()
+    if latest:
+        selected.append(latest)
+
+    messages = []
+    for user_text, assistant_text in selected:
+        messages.append({"role": "user", "text": user_text})
+        if assistant_text:
+            messages.append({"role": "assistant", "text": assistant_text})
+    return messages
+
+def _search_snippet(text, terms, width=90):
+    flat = " ".join(str(text or "").split())
+    lowered = flat.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    if not positions:
+        return _clip_text(flat, width)
+    start = max(0, min(positions) - width // 3)
+    snippet = flat[start:start + width].strip()
+    if start > 0:
+        snippet = "..." + snippet
+    if start + width < len(flat):
+        snippet += "..."
+    return snippet
+
+def _search_conversations(query, limit=_SEARCH_RESULT_LIMIT):
+    """
+    Ranked full-text hits across every stored conversation.
+    Each hit carries the conversation id/title, the matching role and a snippet.
+    """
+    terms = _index_terms(query)
+    if not terms:
+        return []
+    hits = []
+    for score, doc in _context_index_search(query, limit):
+        user_terms = set(_index_terms(doc["user"]))
+        in_user = any(term in user_terms for term in terms)
+        text = doc["user"] if in_user else doc["assistant"]
+        hits.append({
+            "conversation_id": doc["conversation_id"],
+            "title": _CONTEXT_INDEX["titles"].get(doc["conversation_id"]) or "Untitled",
+            "role": "You" if in_user else "Suzanne",
+            "snippet": _search_snippet(_clean_markdown(text), terms),
+            "score": score,
+        })
+    return hits
+
+def _run_conversation_search(query):
+    started = time.perf_counter()
+    hits = _search_conversations(query)
+    _SEARCH_RESULTS["query"] = str(query or "").strip()
+    _SEARCH_RESULTS["hits"] = hits
+    _SEARCH_RESULTS["elapsed_ms"] = (time.perf_counter() - started) * 1000.0
+    return hits
 
-def _append_conversation_exchange(scene, user_text, assistant_text, source):
+def _append_conversation_exchange(scene, user_text, assistant_text, source, response_id="", conversation_id=""):
     prefs = _get_addon_preferences()
     if prefs and not getattr(prefs, "auto_save_conversations", True):
         return True
 
-    conversation, store = _get_active_conversation(
-        scene,
-        create_if_missing=True,
-        title_seed=user_text,
-    )
+    # A queued turn saves into the conversation it was asked in, even if the
+    # user has switched conversations since.
+    conversation = None
+    if conversation_id and conversation_id != _NO_CONVERSATION_ID:
+        store = _load_conversation_store()
+        conversation = _find_conversation(store, conversation_id)
+    if not conversation:
+        conversation, store = _get_active_conversation(
+            scene,
+            create_if_missing=True,
+            title_seed=user_text,
+        )
     if not conversation:
         return False
 
@@ -935,19 +1766,189 @@ def _append_conversation_exchange(scene, user_text, assistant_text, source):
             "timestamp": now,
         })
     if assistant_clean:
-        messages.append({
+        assistant_message = {
             "role": "assistant",
             "text": assistant_clean,
             "source": "assistant",
             "timestamp": now,
-        })
+        }
+        if response_id:
+            assistant_message["response_id"] = str(response_id)
+        messages.append(assistant_message)
 
     if len(messages) > 400:
+        dropped = len(messages) - 400
         conversation["messages"] = messages[-400:]
+        if conversation.get("summarized_messages"):
+            conversation["summarized_messages"] = max(0, conversation["summarized_messages"] - dropped)
     conversation["updated_at"] = now
     conversation["title"] = str(conversation.get("title") or "").strip() or _conversation_title_from_seed(user_clean)
 
-    return _save_conversation_store(store)
+    if not _save_conversation_store(store):
+        return False
+
+    if _CONTEXT_INDEX["loaded"]:
+        _CONTEXT_INDEX["titles"][conversation.get("id", "")] = conversation["title"]
+        if user_clean:
+            _context_index_add(conversation.get("id", ""), user_clean, assistant_clean)
+    keep_messages = max(1, int(getattr(scene, "suzanne_va_context_turns", 4) or 4)) * 2
+    _schedule_conversation_summary(conversation, prefs, keep_messages)
+    return True
+
+def _summary_span(conversation, keep_messages):
+    """
+    Slice (start, end) of messages that should be folded into the summary,
+    or None while the unsummarized backlog is below the trigger threshold.
+    """
+    messages = conversation.get("messages", [])
+    start = int(conversation.get("summarized_messages", 0) or 0)
+    end = len(messages) - keep_messages
+    if end - start < _SUMMARY_TRIGGER_MESSAGES:
+        return None
+    return start, end
+
+def _summary_input(previous_summary, messages):
+    lines = []
+    if previous_summary:
+        lines.append(f"Existing summary: {previous_summary}")
+        lines.append("")
+    lines.append("New turns:")
+    for msg in messages:
+        role = "User" if msg.get("role") == "user" else "Assistant"
+        lines.append(f"{role}: {_clip_text(msg.get('text', ''), _CONVERSATION_MESSAGE_CHAR_LIMIT)}")
+    return "\n".join(lines)
+
+def _summary_instructions():
+    return (
+        "You maintain a running summary of a Blender help conversation. "
+        "Merge the existing summary with the new turns into one updated summary. "
+        "Keep decisions, settings, object names and unresolved questions; drop pleasantries. "
+        f"Plain text, at most {_SUMMARY_CHAR_LIMIT // 6} words."
+    )
+
+def _schedule_conversation_summary(conversation, prefs, keep_messages):
+    if not prefs or not getattr(prefs, "summarize_conversations", False):
+        return False
+    endpoint = _backend_endpoint(prefs, "chat")
+    conversation_id = conversation.get("id")
+    if _endpoint_key_error(endpoint) or not conversation_id or conversation_id in _SUMMARY_JOBS["active"]:
+        return False
+
+    span = _summary_span(conversation, keep_messages)
+    if not span:
+        return False
+    start, end = span
+    messages = conversation.get("messages", [])
+    last_covered = messages[end - 1]
+    job = {
+        "conversation_id": conversation_id,
+        "anchor": (last_covered.get("timestamp", ""), last_covered.get("text", "")),
+        "input": _summary_input(conversation.get("summary", ""), messages[start:end]),
+        "api_key": endpoint["api_key"],
+        "model": prefs.response_model,
+        "base_url": endpoint["base_url"],
+    }
+
+    _SUMMARY_JOBS["active"].add(conversation_id)
+    worker = threading.Thread(target=_run_summary_job, args=(job,), daemon=True)
+    worker.start()
+    if not bpy.app.timers.is_registered(_apply_pending_summaries):
+        bpy.app.timers.register(_apply_pending_summaries, first_interval=_SUMMARY_POLL_INTERVAL_S)
+    return True
+
+def _run_summary_job(job):
+    # Worker thread: network only. Store writes happen in _apply_pending_summaries.
+    summary = ""
+    try:
+        response = _call_chatgpt(
+            job["api_key"],
+            job["model"],
+            job["input"],
+            instructions=_summary_instructions(),
+            base_url=job.get("base_url", ""),
+        )
+        summary = _clip_text(_response_output_text(response), _SUMMARY_CHAR_LIMIT)
+    except Exception as exc:
+        _log(f"Conversation summary failed: {exc}")
+    _SUMMARY_JOBS["results"].put((job, summary))
+
+def _apply_pending_summaries():
+    """
+    Main-thread timer: merge finished summaries into the conversation store.
+    Returns the next poll interval while jobs are running, None once idle.
+    """
+    finished = []
+    while True:
+        try:
+            finished.append(_SUMMARY_JOBS["results"].get_nowait())
+        except queue.Empty:
+            break
+
+    if finished:
+        store = _load_conversation_store()
+        changed = False
+        for job, summary in finished:
+            _SUMMARY_JOBS["active"].discard(job["conversation_id"])
+            conversation = _find_conversation(store, job["conversation_id"])
+            if not summary or not conversation:
+                continue
+            messages = conversation.get("messages", [])
+            covered = 0
+            for index in range(len(messages) - 1, -1, -1):
+                msg = messages[index]
+                if (msg.get("timestamp", ""), msg.get("text", "")) == job["anchor"]:
+                    covered = index + 1
+                    break
+            if not covered:
+                # The turns it covers were trimmed or cleared meanwhile; keep the
+                # previous summary and count rather than summarizing them again.
+                _log(f"Conversation {job['conversation_id']} changed during summary; discarding it.")
+                continue
+            conversation["summary"] = summary
+            conversation["summarized_messages"] = covered
+            changed = True
+        if changed:
+            _save_conversation_store(store)
+
+    if _SUMMARY_JOBS["active"]:
+        return _SUMMARY_POLL_INTERVAL_S
+    return None
+
+def _conversation_chain_id(scene, prefs, conversation=None):
+    """
+    Response id to chain the next request from with previous_response_id.
+    Empty when chaining is off, the newest message is not a stored assistant
+    reply, or the reply is older than the provider's retention window.
+    Pass an already loaded active conversation to skip reading the store.
+    """
+    if not prefs or not getattr(prefs, "use_response_chaining", False):
+        return ""
+    if not getattr(scene, "suzanne_va_use_conversation_context", False):
+        return ""
+
+    if conversation is None:
+        conversation, _ = _get_active_conversation(scene, create_if_missing=False)
+    if not conversation:
+        return ""
+    messages = conversation.get("messages", [])
+    if not messages or messages[-1].get("role") != "assistant":
+        return ""
+
+    last_message = messages[-1]
+    response_id = str(last_message.get("response_id") or "").strip()
+    if not response_id:
+        return ""
+    try:
+        replied_at = datetime.datetime.fromisoformat(str(last_message.get("timestamp") or ""))
+    except ValueError:
+        return ""
+    if datetime.datetime.now() - replied_at > datetime.timedelta(days=_RESPONSE_CHAIN_MAX_AGE_DAYS):
+        return ""
+    return response_id
+
+def _is_missing_chain_error(exc):
+    # The Responses API answers 400/404 when previous_response_id is unknown or expired.
+    return isinstance(exc, HTTPError) and exc.code in (400, 404)
 
 def _new_conversation(scene, title_seed=""):
     store = _load_conversation_store()
@@ -959,9 +1960,11 @@ def _new_conversation(scene, title_seed=""):
         "updated_at": now,
         "messages": [],
     }
+    previous_id = _active_transcript_id(scene)
     store.setdefault("conversations", []).append(conversation)
     if not _save_conversation_store(store):
         return None
+    _remember_conversation_change("created", conversation["id"], previous_id, label="New conversation")
     _set_active_conversation(scene, conversation["id"])
     return conversation
 
@@ -979,9 +1982,21 @@ def _rename_conversation(scene, new_title):
     if not cleaned_title:
         return False
 
+    previous_title = conversation.get("title", "")
     conversation["title"] = _clip_text(cleaned_title, 72)
     conversation["updated_at"] = _now_iso_timestamp()
-    return _save_conversation_store(store)
+    if not _save_conversation_store(store):
+        return False
+    _remember_conversation_change(
+        "renamed",
+        active_id,
+        active_id,
+        label=f"Rename '{_clip_text(previous_title, 30)}'",
+        title=previous_title,
+    )
+    if _CONTEXT_INDEX["loaded"]:
+        _CONTEXT_INDEX["titles"][active_id] = conversation["title"]
+    return True
 
 def _delete_active_conversation(scene):
     store = _load_conversation_store()
@@ -989,20 +2004,74 @@ def _delete_active_conversation(scene):
     if not active_id or active_id == _NO_CONVERSATION_ID:
         return False
 
-    before = len(store.get("conversations", []))
+    deleted = _find_conversation(store, active_id)
+    if not deleted:
+        return False
     store["conversations"] = [
         c for c in store.get("conversations", [])
         if c.get("id") != active_id
     ]
-    if len(store["conversations"]) == before:
-        return False
 
     if not _save_conversation_store(store):
         return False
+    _remember_conversation_change(
+        "deleted",
+        active_id,
+        active_id,
+        label=f"Delete '{_clip_text(deleted.get('title', 'Untitled'), 30)}'",
+        conversation=deleted,
+    )
 
+    _context_index_reset()
+    _SEARCH_RESULTS["hits"] = [hit for hit in _SEARCH_RESULTS["hits"] if hit["conversation_id"] != active_id]
     _sync_active_conversation(scene, store)
     return True
 
+def _remember_conversation_change(kind, conversation_id, active_id, label, **data):
+    _CONVERSATION_HISTORY.append({
+        "kind": kind,
+        "conversation_id": conversation_id,
+        "active_id": active_id,
+        "label": label,
+        **data,
+    })
+    del _CONVERSATION_HISTORY[:-_CONVERSATION_HISTORY_LIMIT]
+
+def _undo_conversation_change(scene):
+    """Revert the most recent new/rename/delete; returns (ok, message)."""
+    if not _CONVERSATION_HISTORY:
+        return False, "Nothing to undo."
+
+    entry = _CONVERSATION_HISTORY[-1]
+    store = _load_conversation_store()
+    conversation = _find_conversation(store, entry["conversation_id"])
+    kind = entry["kind"]
+
+    if kind == "created":
+        if conversation and conversation.get("messages"):
+            _CONVERSATION_HISTORY.pop()
+            return False, "That conversation has messages now; delete it instead."
+        store["conversations"] = [
+            c for c in store.get("conversations", [])
+            if c.get("id") != entry["conversation_id"]
+        ]
+    elif kind == "renamed":
+        if not conversation:
+            _CONVERSATION_HISTORY.pop()
+            return False, "That conversation no longer exists."
+        conversation["title"] = entry["title"]
+    elif kind == "deleted" and not conversation:
+        store.setdefault("conversations", []).append(entry["conversation"])
+
+    if not _save_conversation_store(store):
+        return False, "Could not save conversations file."
+
+    _CONVERSATION_HISTORY.pop()
+    _context_index_reset()
+    _set_active_conversation(scene, entry["active_id"])
+    _sync_active_conversation(scene, store)
+    return True, f"Undid: {entry['label']}"
+
 def _conversation_preview_lines(scene, max_items=8):
     conversation, _ = _get_active_conversation(scene, create_if_missing=False)
     if not conversation:
@@ -1020,18 +2089,276 @@ def _conversation_preview_lines(scene, max_items=8):
             preview.append(f"{role}: {body}")
     return preview
 
+def _transcript_key(conversation_id):
+    return f"{conversation_id}:{_STORE_REVISION['session']}:{_STORE_REVISION['value']}"
+
+def _active_transcript_id(scene):
+    conversation_id = str(getattr(scene, "suzanne_va_active_conversation", "") or "").strip()
+    return conversation_id or _NO_CONVERSATION_ID
+
+def _transcript_messages(conversation_id):
+    # The store is only re-read when it was saved since the last fetch.
+    key = _transcript_key(conversation_id)
+    if _TRANSCRIPT_CACHE["key"] != key:
+        conversation = None
+        if conversation_id != _NO_CONVERSATION_ID:
+            conversation = _find_conversation(_load_conversation_store(), conversation_id)
+        _TRANSCRIPT_CACHE["key"] = key
+        _TRANSCRIPT_CACHE["messages"] = list(conversation.get("messages", [])) if conversation else []
+        _TRANSCRIPT_CACHE["pages"] = {}
+    return _TRANSCRIPT_CACHE["messages"]
+
+def _transcript_page_count(conversation_id):
+    total = len(_transcript_messages(conversation_id))
+    return max(1, math.ceil(total / _TRANSCRIPT_PAGE_SIZE))
+
+def _transcript_rows(messages):
+    rows = []
+    for msg in messages:
+        role = "user" if msg.get("role") == "user" else "assistant"
+        body = _clip_text(
+            _clean_markdown(msg.get("text", "")).replace("\n", " "),
+            _TRANSCRIPT_ROW_CHAR_LIMIT,
+        )
+        rows.append((role, body, str(msg.get("timestamp") or "")))
+    return rows
+
+def _transcript_page(conversation_id, page):
+    """Return (page, rows) for one page, formatting its neighbours ahead of time."""
+    messages = _transcript_messages(conversation_id)
+    page_count = max(1, math.ceil(len(messages) / _TRANSCRIPT_PAGE_SIZE))
+    page = min(max(0, int(page)), page_count - 1)
+
+    pages = _TRANSCRIPT_CACHE["pages"]
+    wanted = range(
+        max(0, page - _TRANSCRIPT_PREFETCH_PAGES),
+        min(page_count, page + _TRANSCRIPT_PREFETCH_PAGES + 1),
+    )
+    for index in wanted:
+        if index not in pages:
+            start = index * _TRANSCRIPT_PAGE_SIZE
+            pages[index] = _transcript_rows(messages[start:start + _TRANSCRIPT_PAGE_SIZE])
+    for index in list(pages):
+        if index not in wanted:
+            del pages[index]
+    return page, pages[page]
+
+def _transcript_view(scene, page=None):
+    """Return (page, page_count, rows) for the transcript list of `scene`.
+
+    Rows are built from the cached pages on demand, so nothing is written to
+    the scene. With page=None the current page is kept for the same
+    conversation, and the view follows new messages when it was already
+    showing the newest page.
+    """
+    conversation_id = _active_transcript_id(scene)
+    page_count = _transcript_page_count(conversation_id)
+    state = _RUNTIME_STATE.setdefault(_runtime_state_key(scene), {})
+    view = state.get("transcript_view") or {"conversation": "", "page": 0, "page_count": 1}
+    if page is None:
+        if view["conversation"] == conversation_id and view["page"] < view["page_count"] - 1:
+            page = view["page"]
+        else:
+            page = page_count - 1
+
+    page, rows = _transcript_page(conversation_id, page)
+    state["transcript_view"] = {"conversation": conversation_id, "page": page, "page_count": page_count}
+    return page, page_count, rows
+
+def _conversation_transcript_markdown(conversation):
+    sections = [f"# {conversation.get('title') or 'Conversation'}"]
+    for msg in conversation.get("messages", []):
+        role = "You" if msg.get("role") == "user" else "Suzanne"
+        sections.append(f"## {role}\n\n{str(msg.get('text') or '').strip()}")
+    return "\n\n".join(sections) + "\n"
+
+def _output_text_block(create=True):
+    texts = getattr(getattr(bpy, "data", None), "texts", None)
+    if texts is None:
+        return None
+    text_block = texts.get(_OUTPUT_TEXT_NAME)
+    if text_block is None and create:
+        text_block = texts.new(_OUTPUT_TEXT_NAME)
+    return text_block
+
+def _write_output_text(scene, response_text):
+    """Mirror the latest response (or the whole conversation) into a Text datablock.
+
+    Text that only grew since the last write is appended, so a streamed
+    response costs one small write per chunk instead of a full rewrite.
+    """
+    if not getattr(scene, "suzanne_va_output_to_text", False):
+        return None
+
+    body = str(response_text or "").strip() + "\n"
+    if getattr(scene, "suzanne_va_output_text_conversation", False):
+        conversation, _ = _get_active_conversation(scene, create_if_missing=False)
+        if conversation:
+            body = _conversation_transcript_markdown(conversation)
+
+    text_block = _output_text_block()
+    if text_block is None:
+        return None
+
+    current = text_block.as_string()
+    if current and body.startswith(current):
+        text_block.cursor_set(len(text_block.lines) - 1, character=len(text_block.lines[-1].body))
+        text_block.write(body[len(current):])
+    elif current != body:
+        text_block.clear()
+        text_block.write(body)
+    return text_block
+
 def _log(msg):
     print(f"[Suzanne VA] {msg}")
 
+def _backend_id(prefs, role):
+    backend = getattr(prefs, f"{role}_backend", _BACKEND_OPENAI)
+    return backend if backend in _BACKENDS else _BACKEND_OPENAI
+
+def _api_base_url(prefs=None, backend=_BACKEND_OPENAI):
+    """
+    Base URL of a backend, without a trailing slash.
+    Preference first, then the backend's environment override, then its default.
+    """
+    if prefs is None:
+        prefs = _get_addon_preferences()
+    spec = _BACKENDS[backend]
+    base_url = str(getattr(prefs, spec["base_url_pref"], "") or "").strip()
+    if not base_url and spec["base_url_env"]:
+        base_url = os.environ.get(spec["base_url_env"], "").strip()
+    return (base_url or spec["default_base_url"]).rstrip("/")
+
+def _api_url(path, base_url="", prefs=None):
+    # An explicit base_url wins; worker threads pass one resolved on the main thread.
+    base_url = (base_url or _api_base_url(prefs)).rstrip("/")
+    return f"{base_url}/{path.lstrip('/')}"
+
+def _backend_endpoint(prefs, role):
+    """
+    Resolve the backend selected for `role` ("chat" or "transcription") into
+    plain values that are safe to hand to a worker thread.
+    """
+    backend = _backend_id(prefs, role)
+    spec = _BACKENDS[backend]
+    return {
+        "backend": backend,
+        "label": spec["label"],
+        "base_url": _api_base_url(prefs, backend),
+        "api_key": str(getattr(prefs, spec["api_key_pref"], "") or "").strip(),
+        "requires_key": spec["requires_key"],
+    }
+
+def _endpoint_key_error(endpoint):
+    if endpoint["requires_key"] and not endpoint["api_key"]:
+        return f"Missing {endpoint['label']} API key in add-on preferences."
+    return ""
+
 def _build_openai_headers(api_key):
     api_key = (api_key or "").strip()
     headers = {
-        "Authorization": f"Bearer {api_key}",
         "User-Agent": "Suzanne-VA-Addon/1.7.0",
     }
+    # Self-hosted servers often run without auth; send no empty bearer token.
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
     return headers
 
-def _post_multipart(url, api_key, fields, files):
+def _tracked_connection(connection_class, job):
+    # Hands each new connection to the job so _cancel_request_connection can close it.
+    def connect(host, **kwargs):
+        connection = connection_class(host, **kwargs)
+        job["connection"] = connection
+        return connection
+    return connect
+
+class _CancellableHTTPHandler(HTTPHandler):
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def http_open(self, req):
+        return self.do_open(_tracked_connection(HTTPConnection, self.job), req)
+
+class _CancellableHTTPSHandler(HTTPSHandler):
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def https_open(self, req):
+        return self.do_open(_tracked_connection(HTTPSConnection, self.job), req, context=self._context)
+
+def _cancel_request_connection(job):
+    """
+    Abort the job's HTTP request from another thread. shutdown() wakes a
+    worker blocked in recv(); close() alone would leave it waiting for the
+    server until the timeout.
+    """
+    connection = job.pop("connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    if connection is not None:
+        connection.close()
+
+def _abandon_speculation(job):
+    """Cancel the job's speculative chat request, if any; its results are then dropped."""
+    speculation = job.pop("speculation", None)
+    if speculation is not None:
+        speculation["cancel"].set()
+        _cancel_request_connection(speculation)
+    return speculation
+
+def _request_queue_counts():
+    """(running, queued) turns; a reply waiting for an earlier turn to be saved counts as running."""
+    queued = sum(1 for job in _REQUEST_JOBS["jobs"] if job["state"] == "queued")
+    return len(_REQUEST_JOBS["jobs"]) - queued, queued
+
+def _urlopen_for_job(req, timeout, job=None):
+    if job is None:
+        return urlopen(req, timeout=timeout)
+    opener = build_opener(_CancellableHTTPHandler(job), _CancellableHTTPSHandler(job))
+    return opener.open(req, timeout=timeout)
+
+def _open_paced(req, timeout, tokens=0, job=None, stream_reader=None, wait=True):
+    # stream_reader() returns an on_line(line) handler that sees each line of
+    # a streamed body as it arrives; a fresh one per attempt.
+    # wait=False is for the main thread: the request is sent without pacing.
+    reserved = {"requests": 1, "tokens": tokens}
+    try:
+        # Inside the try: a cancel during the pacing wait still releases the reservation.
+        _pace_request(req.full_url, tokens, job=job, wait=wait)
+        with _urlopen_for_job(req, timeout, job=job) as resp:
+            _update_rate_limits(req.full_url, getattr(resp, "headers", None), reserved=reserved)
+            if stream_reader is None:
+                return resp.read().decode("utf-8")
+            on_line = stream_reader()
+            lines = []
+            for raw_line in resp:
+                line = raw_line.decode("utf-8").rstrip("\r\n")
+                lines.append(line)
+                on_line(line)
+            return "\n".join(lines)
+    except HTTPError as exc:
+        _update_rate_limits(req.full_url, exc.headers, reserved=reserved)
+        raise
+    finally:
+        _release_rate_limit(req.full_url, reserved)
+
+def _send_request(req, timeout, job=None, tokens=0, stream_reader=None, idempotent=None):
+    # POSTs are not idempotent unless the caller says so (see _is_retryable_error).
+    if idempotent is None:
+        idempotent = req.get_method() in ("GET", "HEAD")
+    return _with_retries(
+        lambda: _open_paced(req, timeout, tokens=tokens, job=job, stream_reader=stream_reader),
+        job=job,
+        idempotent=idempotent,
+    )
+
+def _post_multipart(url, api_key, fields, files, job=None, stream_reader=None, idempotent=False):
     boundary = f"----suzanne-va-{uuid.uuid4().hex}"
     body = bytearray()
 
@@ -1059,27 +2386,25 @@ def _post_multipart(url, api_key, fields, files):
     for key, value in _build_openai_headers(api_key).items():
         req.add_header(key, value)
     req.add_header("Content-Type", f"multipart/form-data; boundary={boundary}")
+    return _send_request(req, 120, job=job, stream_reader=stream_reader, idempotent=idempotent)
 
-    with urlopen(req, timeout=120) as resp:
-        return resp.read().decode("utf-8")
-
-def _post_json(url, api_key, payload):
+def _post_json(url, api_key, payload, job=None):
     data = json.dumps(payload).encode("utf-8")
     req = Request(url, data=data, method="POST")
     for key, value in _build_openai_headers(api_key).items():
         req.add_header(key, value)
     req.add_header("Content-Type", "application/json")
+    return _send_request(req, 120, job=job, tokens=_estimate_tokens(data.decode("utf-8")))
 
-    with urlopen(req, timeout=120) as resp:
-        return resp.read().decode("utf-8")
-
-def _get_json(url, api_key):
+def _get_json(url, api_key, wait=True):
     req = Request(url, method="GET")
     for key, value in _build_openai_headers(api_key).items():
         req.add_header(key, value)
 
-    with urlopen(req, timeout=30) as resp:
-        return resp.read().decode("utf-8")
+    if not wait:
+        # Main thread: one attempt, no pacing or retry backoff that would freeze the UI.
+        return _open_paced(req, 30, wait=False)
+    return _send_request(req, 30)
 
 def _read_http_error_body(exc):
     try:
@@ -1090,11 +2415,299 @@ def _read_http_error_body(exc):
     except Exception:
         return ""
 
+class _RequestCancelled(Exception):
+    """Raised in a worker when the user cancelled the request it belongs to."""
+
+def _parse_reset_duration(value):
+    """
+    Seconds from an x-ratelimit-reset-* value such as "20ms", "1.5s" or "6m0s".
+    Returns None when the value cannot be parsed.
+    """
+    text = str(value or "").strip()
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+def _retry_after_seconds(headers):
+    """
+    Server-requested wait from Retry-After(-ms), or for an exhausted
+    x-ratelimit bucket its reset time. None when the response has no hint.
+    """
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after-ms")) / 1000.0
+    except (TypeError, ValueError):
+        pass
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(retry_after)
+            return (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            pass
+    resets = []
+    for kind in ("requests", "tokens"):
+        if str(headers.get(f"x-ratelimit-remaining-{kind}", "")).strip() == "0":
+            reset = _parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if reset is not None:
+                resets.append(reset)
+    return max(resets) if resets else None
+
+def _rate_limit_key(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+def _header_number(value):
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+def _refill_bucket(bucket, now):
+    elapsed = max(0.0, now - bucket["ts"])
+    bucket["available"] = min(bucket["limit"], bucket["available"] + elapsed * bucket["rate"])
+    bucket["ts"] = now
+
+def _update_rate_limits(url, headers, reserved=None):
+    """
+    Reset the origin's buckets to what the server reports, less what other
+    requests still in flight have reserved (`reserved` is this response's own
+    reservation, already counted by the server).
+    The refill rate is inferred from the deficit and the reset time; a full
+    bucket assumes the usual per-minute window.
+    """
+    if headers is None:
+        return
+    now = time.monotonic()
+    key = _rate_limit_key(url)
+    observed = {}
+    for kind in ("requests", "tokens"):
+        limit = _header_number(headers.get(f"x-ratelimit-limit-{kind}"))
+        remaining = _header_number(headers.get(f"x-ratelimit-remaining-{kind}"))
+        if not limit or remaining is None:
+            continue
+        reset = _parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+        deficit = max(0.0, limit - remaining)
+        rate = deficit / reset if deficit and reset else limit / 60.0
+        observed[kind] = {"limit": limit, "available": min(limit, remaining), "rate": rate, "ts": now}
+    if observed:
+        with _RATE_LIMITS["lock"]:
+            in_flight = _RATE_LIMITS["in_flight"].get(key, {})
+            for kind, bucket in observed.items():
+                others = in_flight.get(kind, 0) - (reserved or {}).get(kind, 0)
+                bucket["available"] -= max(0, others)
+            _RATE_LIMITS["buckets"].setdefault(key, {}).update(observed)
+
+def _release_rate_limit(url, reserved):
+    # The reply (or failure) is in: the server's counts now cover this request.
+    with _RATE_LIMITS["lock"]:
+        in_flight = _RATE_LIMITS["in_flight"].get(_rate_limit_key(url))
+        if in_flight:
+            for kind, amount in reserved.items():
+                in_flight[kind] = max(0, in_flight.get(kind, 0) - amount)
+
+def _reserve_rate_limit(url, tokens=0, in_flight=False):
+    """
+    Take one request and `tokens` from the origin's buckets.
+    Returns the seconds to wait before sending; 0.0 while under the limits or
+    before the server has reported any. Reservations may overdraw a bucket,
+    so concurrent callers queue behind each other. With in_flight=True the
+    reservation is also held until _release_rate_limit.
+    """
+    key = _rate_limit_key(url)
+    with _RATE_LIMITS["lock"]:
+        if in_flight:
+            held = _RATE_LIMITS["in_flight"].setdefault(key, {"requests": 0, "tokens": 0})
+            held["requests"] += 1
+            held["tokens"] += tokens
+        buckets = _RATE_LIMITS["buckets"].get(key)
+        if not buckets:
+            return 0.0
+        now = time.monotonic()
+        wait = 0.0
+        for kind, amount in (("requests", 1), ("tokens", tokens)):
+            bucket = buckets.get(kind)
+            if bucket is None or amount <= 0:
+                continue
+            _refill_bucket(bucket, now)
+            # A request larger than the whole bucket waits for a full one, not forever.
+            bucket["available"] -= min(amount, bucket["limit"])
+            if bucket["available"] < 0 and bucket["rate"] > 0:
+                wait = max(wait, -bucket["available"] / bucket["rate"])
+        return wait
+
+def _wait_or_cancel(delay, job=None):
+    cancel = job.get("cancel") if job else None
+    if cancel is None:
+        time.sleep(delay)
+    elif cancel.wait(delay):
+        raise _RequestCancelled()
+
+def _pace_request(url, tokens=0, job=None, wait=True):
+    delay = min(_reserve_rate_limit(url, tokens, in_flight=True), _RATE_LIMIT_MAX_WAIT_S)
+    if delay <= 0 or not wait:
+        return
+    _log(f"Rate limit for {_rate_limit_key(url)} nearly used; waiting {delay:.1f} s")
+    if job and job.get("on_throttle"):
+        job["on_throttle"](delay)
+    with _trace_span("rate_limit_wait"):
+        _wait_or_cancel(delay, job)
+
+def _is_retryable_error(exc, idempotent=True):
+    """
+    Whether a failed request is worth sending again. A POST that may have
+    been processed (timeouts, dropped connections, plain 5xx) is not resent,
+    as that could create and bill a second response. 429s are rejections and
+    always retried; 5xx only with a Retry-After hint; connections only when
+    refused.
+    """
+    if isinstance(exc, HTTPError):
+        # The API says explicitly when a retry cannot help (e.g. quota exhausted).
+        should_retry = str((exc.headers or {}).get("x-should-retry", "")).lower()
+        if should_retry in ("true", "false"):
+            return should_retry == "true"
+        if exc.code not in _RETRYABLE_HTTP_CODES:
+            return False
+        if idempotent or exc.code == 429:
+            return True
+        return exc.code >= 500 and _retry_after_seconds(exc.headers) is not None
+    reason = exc.reason if isinstance(exc, URLError) else exc
+    if not idempotent:
+        # Nothing was sent when the connection was refused.
+        return isinstance(reason, ConnectionRefusedError)
+    if isinstance(exc, URLError):
+        # Refused/reset connections and timeouts; DNS and certificate errors are permanent.
+        return isinstance(reason, (ConnectionError, TimeoutError))
+    return isinstance(exc, (ConnectionError, TimeoutError, HTTPException))
+
+def _retry_delay(attempt, exc):
+    """Seconds to wait before attempt + 1: the server's hint, else capped backoff with jitter."""
+    hint = _retry_after_seconds(getattr(exc, "headers", None)) if isinstance(exc, HTTPError) else None
+    if hint is not None and 0 < hint <= _HTTP_RETRY_HINT_MAX_S:
+        return hint
+    backoff = min(_HTTP_RETRY_MAX_S, _HTTP_RETRY_BASE_S * (2 ** (attempt - 1)))
+    return backoff * random.uniform(0.5, 1.0)
+
+def _describe_request_error(exc):
+    if isinstance(exc, HTTPError):
+        return f"HTTP {exc.code}"
+    if isinstance(exc, URLError):
+        return str(exc.reason)
+    return type(exc).__name__
+
+def _trace_note_retry(attempt, exc, delay):
+    trace = _current_trace()
+    if trace is not None:
+        trace.setdefault("retries", []).append(
+            {"attempt": attempt, "error": _describe_request_error(exc), "delay_s": round(delay, 2)}
+        )
+
+def _with_retries(send, job=None, idempotent=True):
+    """
+    Call send() until it succeeds, fails permanently or attempts run out.
+    Pass idempotent=False for POSTs; see _is_retryable_error.
+    A job (optional) supplies "cancel", a threading.Event checked before every
+    attempt and during backoff, and "on_retry", called as (attempt, delay_s, exc)
+    just before waiting. Raises _RequestCancelled once the job is cancelled.
+    """
+    cancel = job.get("cancel") if job else None
+    for attempt in range(1, _HTTP_RETRY_ATTEMPTS + 1):
+        if cancel is not None and cancel.is_set():
+            raise _RequestCancelled()
+        try:
+            return send()
+        except Exception as exc:
+            if cancel is not None and cancel.is_set():
+                # The socket was closed under the request by Cancel.
+                raise _RequestCancelled() from exc
+            if attempt >= _HTTP_RETRY_ATTEMPTS or not _is_retryable_error(exc, idempotent=idempotent):
+                raise
+            error = exc
+        delay = _retry_delay(attempt, error)
+        _log(
+            f"Request failed ({_describe_request_error(error)}); "
+            f"attempt {attempt + 1}/{_HTTP_RETRY_ATTEMPTS} in {delay:.1f} s"
+        )
+        _trace_note_retry(attempt + 1, error, delay)
+        if job and job.get("on_retry"):
+            job["on_retry"](attempt + 1, delay, error)
+        with _trace_span("retry_wait"):
+            _wait_or_cancel(delay, job)
+
 def _read_file_bytes(path):
     with open(path, "rb") as f:
         return f.read()
 
-def _transcribe_audio(api_key, model, audio_path):
+def _transcription_streams(model):
+    # whisper-1 has no streamed output; the gpt-4o-*-transcribe models do.
+    return "transcribe" in str(model or "").lower()
+
+def _transcript_words(text):
+    return re.findall(r"[\w']+", str(text or "").lower())
+
+def _stable_partial_transcript(text):
+    """
+    The partial transcript up to its last finished sentence: later deltas
+    rarely change it. Empty while that holds fewer than _SPECULATION_MIN_WORDS.
+    """
+    text = str(text or "")
+    end = max(text.rfind("."), text.rfind("?"), text.rfind("!"))
+    stable = text[:end + 1].strip() if end >= 0 else ""
+    return stable if len(_transcript_words(stable)) >= _SPECULATION_MIN_WORDS else ""
+
+def _without_trailing_filler(words):
+    while words and words[-1] in _SPECULATION_FILLER_WORDS:
+        words = words[:-1]
+    return words
+
+def _transcripts_match(speculated, final):
+    """
+    True when a reply to `speculated` also answers `final`: the same words,
+    apart from case, punctuation and trailing filler such as "please".
+    A single changed word ("do" / "don't") is a different question.
+    """
+    speculated_words = _without_trailing_filler(_transcript_words(speculated))
+    final_words = _without_trailing_filler(_transcript_words(final))
+    return bool(final_words) and speculated_words == final_words
+
+def _transcript_stream_reader(on_partial):
+    """
+    on_line handler for a streamed transcription. Calls on_partial(text)
+    with the transcript so far after each delta; returns the state dict
+    whose "text" is the final transcript once the stream is done.
+    """
+    state = {"text": "", "events": 0}
+
+    def on_line(line):
+        if not line.startswith("data:"):
+            return
+        try:
+            event = json.loads(line[len("data:"):].strip())
+        except json.JSONDecodeError:
+            return
+        state["events"] += 1
+        if event.get("type") == "transcript.text.delta":
+            state["text"] += str(event.get("delta") or "")
+            on_partial(state["text"])
+        elif event.get("type") == "transcript.text.done":
+            state["text"] = str(event.get("text") or state["text"])
+
+    return on_line, state
+
+@_trace_span("transcription")
+def _transcribe_audio(api_key, model, audio_path, base_url="", job=None, on_partial=None):
+    """
+    Transcribe audio_path. With on_partial (and a model that streams) the
+    transcript is streamed and on_partial(text) sees it grow; the return
+    value is {"text": final transcript} either way.
+    """
     mime_type, _ = mimetypes.guess_type(audio_path)
     if not mime_type:
         mime_type = "audio/wav"
@@ -1105,23 +2718,44 @@ def _transcribe_audio(api_key, model, audio_path):
     files = {
         "file": (os.path.basename(audio_path), mime_type, _read_file_bytes(audio_path)),
     }
-    response_text = _post_multipart(
-        "https://api.openai.com/v1/audio/transcriptions",
-        api_key,
-        fields,
-        files,
-    )
+    url = _api_url("audio/transcriptions", base_url=base_url)
+    # Transcription has no server-side effects, so it is resent like a GET.
+    if on_partial is not None and _transcription_streams(model):
+        fields["stream"] = "true"
+        attempts = []
+
+        def stream_reader():
+            # A retried attempt restarts the transcript rather than appending to it.
+            on_line, state = _transcript_stream_reader(on_partial)
+            attempts.append(state)
+            return on_line
+
+        response_text = _post_multipart(
+            url, api_key, fields, files, job=job, stream_reader=stream_reader, idempotent=True
+        )
+        if attempts and attempts[-1]["events"]:
+            return {"text": attempts[-1]["text"]}
+        # Some self-hosted servers ignore stream=true and answer with plain JSON.
+        return json.loads(response_text)
+
+    response_text = _post_multipart(url, api_key, fields, files, job=job, idempotent=True)
     return json.loads(response_text)
 
-def _call_chatgpt(api_key, model, input_text):
+@_trace_span("responses_api")
+def _call_chatgpt(api_key, model, input_text, previous_response_id="", instructions="", base_url="", job=None):
     payload = {
         "model": model,
         "input": input_text,
     }
+    if instructions:
+        payload["instructions"] = instructions
+    if previous_response_id:
+        payload["previous_response_id"] = previous_response_id
     response_text = _post_json(
-        "https://api.openai.com/v1/responses",
+        _api_url("responses", base_url=base_url),
         api_key,
         payload,
+        job=job,
     )
     return json.loads(response_text)
 
@@ -2,11 +2,479 @@ from .common import *  # noqa: F403,F401
 
 # --------------------------- operator --------------------------
 
+# ----------------------- request pipeline ----------------------
+# A turn's HTTP calls run on worker threads so the panel stays responsive and
+# further prompts can be queued. Workers post (job, event, payload) to
+# _REQUEST_JOBS["results"]; _apply_request_results handles them on the main
+# thread, where scene and store updates are safe. Replies are saved in the
+# order their prompts were sent within each conversation.
+
+def _new_request_job(scene, prefs, kind, chat_endpoint):
+    job = {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "scene": scene,
+        "prefs": prefs,
+        "chat": chat_endpoint,
+        "model": prefs.response_model,
+        "conversation": str(scene.suzanne_va_active_conversation or ""),
+        "user_text": "",
+        "info_context": "",
+        "state": "queued",
+        "status": "Sending...",
+        "response": None,
+        "cancel": threading.Event(),
+        "trace": _trace_detach(),
+    }
+    job["on_retry"] = lambda attempt, delay, exc: _REQUEST_JOBS["results"].put(
+        (job, "retrying", (attempt, delay, _describe_request_error(exc)))
+    )
+    job["on_throttle"] = lambda delay: _REQUEST_JOBS["results"].put((job, "throttled", delay))
+    return job
+
+def _submit_request_job(job, launch):
+    """
+    Queue a turn. `launch(job)` runs on the main thread once a slot is free
+    and starts the job's first worker. Returns False when the queue is full.
+    """
+    if len(_REQUEST_JOBS["jobs"]) >= _REQUEST_QUEUE_LIMIT:
+        return False
+    job["launch"] = launch
+    _REQUEST_JOBS["jobs"].append(job)
+    _pump_request_queue()
+    if not bpy.app.timers.is_registered(_apply_request_results):
+        bpy.app.timers.register(_apply_request_results, first_interval=_REQUEST_POLL_INTERVAL_S)
+    return True
+
+def _pump_request_queue():
+    # One turn per conversation at a time: a turn chains from, and sees, the
+    # reply of the one before it. The concurrency limit is spent across conversations.
+    running = [job for job in _REQUEST_JOBS["jobs"] if job["state"] == "running"]
+    busy = {job["conversation"] for job in running}
+    slots = _REQUEST_MAX_CONCURRENCY - len(running)
+    for job in list(_REQUEST_JOBS["jobs"]):
+        if slots <= 0:
+            break
+        if job["state"] != "queued" or job["conversation"] in busy:
+            continue
+        job["state"] = "running"
+        try:
+            job["scene"].suzanne_va_status = job["status"]
+            with _trace_bind(job["trace"]):
+                job["launch"](job)
+        except ReferenceError:
+            _drop_request_job(job)
+            continue
+        slots -= 1
+        busy.add(job["conversation"])
+
+def _run_request_worker(job, target):
+    with _trace_bind(job["trace"]):
+        target(job)
+
+def _start_request_worker(job, target):
+    worker = threading.Thread(target=_run_request_worker, args=(job, target), daemon=True)
+    worker.start()
+
+def _run_transcription_job(job):
+    # Worker thread: network only, no bpy access.
+    endpoint = job["transcription"]
+    on_partial = None
+    if job.get("speculate"):
+
+        def on_partial(text):
+            # Every delta is reported, so the main thread can tell when the
+            # transcript pauses (see _start_settled_speculations).
+            stable = _stable_partial_transcript(text)
+            if stable:
+                _REQUEST_JOBS["results"].put((job, "partial", stable))
+
+    try:
+        transcription = _transcribe_audio(
+            endpoint["api_key"],
+            job["transcription_model"],
+            job["audio_path"],
+            base_url=endpoint["base_url"],
+            job=job,
+            on_partial=on_partial,
+        )
+    except _RequestCancelled:
+        _REQUEST_JOBS["results"].put((job, "cancelled", None))
+    except Exception as exc:
+        _REQUEST_JOBS["results"].put((job, "error", f"Transcription failed: {exc}"))
+    else:
+        _REQUEST_JOBS["results"].put((job, "transcribed", transcription))
+
+def _run_chat_job(job):
+    # Worker thread: network only, no bpy access.
+    endpoint = job["chat"]
+    previous_response_id = job["previous_response_id"]
+    try:
+        response = _call_chatgpt(
+            endpoint["api_key"],
+            job["model"],
+            job["prompt"],
+            previous_response_id=previous_response_id,
+            instructions=_system_instructions(),
+            base_url=endpoint["base_url"],
+            job=job,
+        )
+    except _RequestCancelled:
+        _REQUEST_JOBS["results"].put((job, "cancelled", None))
+    except HTTPError as exc:
+        if previous_response_id and _is_missing_chain_error(exc):
+            _log(f"Response chain {previous_response_id} unavailable (HTTP {exc.code}); resending local context.")
+            _REQUEST_JOBS["results"].put((job, "chain_missing", None))
+        else:
+            _REQUEST_JOBS["results"].put((job, "error", f"{job['error_prefix']}: {exc}"))
+    except Exception as exc:
+        _REQUEST_JOBS["results"].put((job, "error", f"{job['error_prefix']}: {exc}"))
+    else:
+        _REQUEST_JOBS["results"].put((job, "responded", response))
+
+def _start_chat_request(scene, prefs, job, user_text, info_context, chained=True, prefetched=None):
+    # Chained turns send only the new user turn; the provider already holds
+    # the earlier ones. A missing or expired chain comes back as
+    # "chain_missing" and is resent here with chained=False. A turn sees the
+    # conversation as saved when it starts, not replies still in flight.
+    # `prefetched` comes from _prefetch_turn_context and spares the store reads.
+    conversation = prefetched["conversation"] if prefetched else _load_turn_conversation(job)
+    if not chained:
+        previous_response_id = ""
+    elif prefetched:
+        previous_response_id = prefetched["previous_response_id"]
+    else:
+        previous_response_id = _conversation_chain_id(scene, prefs, conversation=conversation)
+    prompt_text, prompt_tokens = _assemble_prompt(
+        scene,
+        user_text,
+        info_context,
+        is_voice=job["kind"] == "voice",
+        include_conversation=not previous_response_id,
+        conversation=conversation,
+    )
+    scene.suzanne_va_last_prompt_tokens = prompt_tokens
+    job.update(
+        user_text=user_text,
+        info_context=info_context,
+        prompt=prompt_text,
+        previous_response_id=previous_response_id,
+        error_prefix="Send failed" if job["kind"] == "text" else "ChatGPT request failed",
+    )
+    _start_request_worker(job, _run_chat_job)
+
+def _load_turn_conversation(job):
+    """
+    The conversation the turn was asked in. A queued turn launches later and
+    must not pick up whichever conversation is active by then; {} stands for
+    "no conversation" so the helpers do not fall back to the active one.
+    """
+    if not getattr(job["scene"], "suzanne_va_use_conversation_context", False):
+        return None
+    conversation_id = job["conversation"]
+    if not conversation_id:
+        # Nothing was selected at submit; the reply is saved to the active one too.
+        conversation, _ = _get_active_conversation(job["scene"], create_if_missing=False)
+        return conversation or {}
+    if conversation_id == _NO_CONVERSATION_ID:
+        return {}
+    return _find_conversation(_load_conversation_store(), conversation_id) or {}
+
+def _prefetch_turn_context(job):
+    """
+    Everything the chat request needs except the transcript: Info history,
+    the active conversation and its chain id. Runs on the main thread while
+    the transcription upload is in flight, off the turn's critical path.
+    """
+    scene = job["scene"]
+    with _trace_span("context_prefetch"):
+        conversation = _load_turn_conversation(job)
+        job["prefetched"] = {
+            "info_context": _capture_info_context(scene),
+            "conversation": conversation,
+            "previous_response_id": _conversation_chain_id(scene, job["prefs"], conversation=conversation),
+        }
+
+def _launch_voice_job(job):
+    _start_request_worker(job, _run_transcription_job)
+    _prefetch_turn_context(job)
+
+def _capture_info_context(scene):
+    if not scene.suzanne_va_include_info_history:
+        _set_runtime_text(scene, "last_info_history", "")
+        return ""
+    info_context = _get_info_history_lines(_INFO_HISTORY_LINE_LIMIT)
+    _set_runtime_text(scene, "last_info_history", info_context or "(No Info history was captured.)")
+    return info_context
+
+def _finish_request_job(job, status, message=""):
+    if job in _REQUEST_JOBS["jobs"]:
+        _REQUEST_JOBS["jobs"].remove(job)
+    job["state"] = "done"
+    _abandon_speculation(job)
+    _trace_end(status, job["prefs"], trace=job["trace"])
+    scene = job["scene"]
+    # With more turns pending, keep showing the oldest one's progress.
+    pending = [other for other in _REQUEST_JOBS["jobs"] if other["scene"] is scene]
+    if status == "ok":
+        scene.suzanne_va_status = pending[0]["status"] if pending else "Idle (sent)"
+        _log(f"Request {job['kind']} -> sent")
+    elif status == "cancelled":
+        scene.suzanne_va_status = pending[0]["status"] if pending else "Idle (cancelled)"
+        _log(f"Request {job['kind']} -> cancelled")
+    else:
+        if pending:
+            scene.suzanne_va_status = _clip_text(f"{pending[0]['status']} Previous turn error: {message}", 200)
+        else:
+            scene.suzanne_va_status = _clip_text(f"Idle (error): {message}", 200)
+        _log(f"Request {job['kind']} -> error: {message}")
+
+def _cancel_request_job(job):
+    # The turn ends now: the worker's socket is closed under it, and whatever
+    # it still posts is dropped because the job is no longer pending.
+    job["cancel"].set()
+    _cancel_request_connection(job)
+    _finish_request_job(job, "cancelled")
+
+def _complete_request_job(job, response):
+    scene = job["scene"]
+    _record_response_usage(scene, response)
+    response_text = _response_output_text(response)
+    if job["kind"] == "voice":
+        scene.suzanne_va_last_audio = job["audio_path"]
+    _set_runtime_text(scene, "last_transcript", job["user_text"])
+    _set_runtime_text(scene, "last_response", response_text or "")
+    scene.suzanne_va_expand_transcript = False
+    scene.suzanne_va_expand_response = False
+    _append_conversation_exchange(
+        scene,
+        job["user_text"],
+        response_text or "",
+        source=job["kind"],
+        response_id=str(response.get("id") or ""),
+        conversation_id=job["conversation"],
+    )
+    _write_output_text(scene, response_text)
+    _finish_request_job(job, "ok")
+
+def _commit_request_jobs():
+    """
+    Save finished replies in submission order per conversation: a reply
+    waits while an earlier turn of the same conversation is still pending.
+    """
+    waiting = set()
+    for job in list(_REQUEST_JOBS["jobs"]):
+        if job["response"] is not None and job["conversation"] not in waiting:
+            with _trace_bind(job["trace"]):
+                _complete_request_job(job, job["response"])
+        else:
+            waiting.add(job["conversation"])
+
+def _start_speculation(job, partial_text):
+    """
+    Start the chat request from a stable partial transcript while the rest
+    is still being transcribed. Runs as a child job; see _apply_speculation_event.
+    """
+    job["speculated"] = True
+    scene = job["scene"]
+    speculation = {
+        "id": uuid.uuid4().hex,
+        "kind": job["kind"],
+        "scene": scene,
+        "prefs": job["prefs"],
+        "chat": job["chat"],
+        "model": job["model"],
+        "parent": job,
+        "response": None,
+        "failed": False,
+        "cancel": threading.Event(),
+        "trace": job["trace"],
+    }
+    job["speculation"] = speculation
+    prefetched = job["prefetched"]
+    _log(f"Speculative reply started from partial transcript: {_clip_text(partial_text, 80)}")
+    _start_chat_request(
+        scene,
+        job["prefs"],
+        speculation,
+        partial_text,
+        prefetched["info_context"],
+        prefetched=prefetched,
+    )
+
+def _start_final_chat_request(job, transcript_text):
+    scene = job["scene"]
+    # Joins the context prefetched while the upload was in flight.
+    prefetched = job["prefetched"]
+    _start_chat_request(
+        scene,
+        job["prefs"],
+        job,
+        transcript_text,
+        prefetched["info_context"],
+        prefetched=prefetched,
+    )
+
+def _adopt_speculation(job, speculation, transcript_text):
+    # The final transcript matches: the speculative reply stands in for the real one.
+    job["user_text"] = transcript_text
+    job["adopted"] = speculation
+    if job["trace"] is not None:
+        job["trace"]["speculation"] = "hit"
+    if speculation["response"] is not None:
+        job["response"] = speculation["response"]
+        job["status"] = "Reply received, saving after earlier turns..."
+
+def _apply_speculation_event(speculation, event, payload):
+    job = speculation["parent"]
+    if event in ("retrying", "throttled"):
+        return
+    if event == "responded":
+        speculation["response"] = payload
+        if job.get("adopted") is speculation:
+            job["response"] = payload
+            job["status"] = "Reply received, saving after earlier turns..."
+        return
+    # Failed, cancelled or its chain expired: the final transcript goes the normal way.
+    speculation["failed"] = True
+    if job.get("adopted") is speculation:
+        del job["adopted"]
+        _abandon_speculation(job)
+        _start_final_chat_request(job, job["user_text"])
+
+def _apply_request_event(job, event, payload):
+    scene = job["scene"]
+    if job["cancel"].is_set():
+        # Whatever the worker produced after Cancel is discarded.
+        if event not in ("retrying", "throttled"):
+            _finish_request_job(job, "cancelled")
+        return
+
+    if event == "retrying":
+        attempt, delay, reason = payload
+        scene.suzanne_va_status = (
+            f"{job['status']} retry {attempt}/{_HTTP_RETRY_ATTEMPTS} in {delay:.0f} s ({reason})"
+        )
+    elif event == "throttled":
+        scene.suzanne_va_status = f"{job['status']} waiting {payload:.0f} s for rate limit"
+    elif event == "partial":
+        job["partial"] = (payload, time.monotonic())
+    elif event == "transcribed":
+        job.pop("partial", None)
+        transcript_text = payload.get("text", "") if isinstance(payload, dict) else ""
+        if not transcript_text:
+            _finish_request_job(job, "error", "Transcription returned no text.")
+            return
+        job["status"] = "Sending to ChatGPT..."
+        scene.suzanne_va_status = job["status"]
+        speculation = job.get("speculation")
+        if (
+            speculation is not None
+            and not speculation["failed"]
+            and _transcripts_match(speculation["user_text"], transcript_text)
+        ):
+            _adopt_speculation(job, speculation, transcript_text)
+            return
+        if speculation is not None:
+            if speculation["failed"]:
+                outcome = "failed"
+                _log("Speculative reply failed; sending the final transcript.")
+            else:
+                outcome = "miss"
+                _log("Final transcript differs from the speculative one; resending.")
+            _abandon_speculation(job)
+            if job["trace"] is not None:
+                job["trace"]["speculation"] = outcome
+        _start_final_chat_request(job, transcript_text)
+    elif event == "chain_missing":
+        _start_chat_request(
+            scene,
+            job["prefs"],
+            job,
+            job["user_text"],
+            job["info_context"],
+            chained=False,
+            prefetched=job.get("prefetched"),
+        )
+    elif event == "responded":
+        job["response"] = payload
+        job["status"] = "Reply received, saving after earlier turns..."
+    elif event == "cancelled":
+        _finish_request_job(job, "cancelled")
+    else:
+        _finish_request_job(job, "error", payload)
+
+def _drop_request_job(job):
+    # The scene was removed (or reloaded by undo) while the request ran.
+    _log("Scene of a pending request is gone; dropping its result.")
+    job["cancel"].set()
+    _abandon_speculation(job)
+    if job in _REQUEST_JOBS["jobs"]:
+        _REQUEST_JOBS["jobs"].remove(job)
+    _trace_end("error", trace=job["trace"])
+
+def _start_settled_speculations():
+    # One speculation per turn, once the partial transcript has stopped growing:
+    # a question sent mid-sentence would only be cancelled and billed again.
+    now = time.monotonic()
+    for job in list(_REQUEST_JOBS["jobs"]):
+        partial = job.get("partial")
+        if partial is None or job.get("speculated") or job["cancel"].is_set():
+            continue
+        text, received_at = partial
+        if now - received_at < _SPECULATION_SETTLE_S:
+            continue
+        try:
+            with _trace_bind(job["trace"]):
+                _start_speculation(job, text)
+        except ReferenceError:
+            _drop_request_job(job)
+
+def _apply_request_results():
+    """
+    Main-thread timer: apply worker results, save finished replies in order
+    and start queued turns as slots free up.
+    Returns the next poll interval while turns are pending, None once idle.
+    """
+    while True:
+        try:
+            job, event, payload = _REQUEST_JOBS["results"].get_nowait()
+        except queue.Empty:
+            break
+        owner = job.get("parent", job)
+        if owner not in _REQUEST_JOBS["jobs"]:
+            continue
+        if owner is not job and owner.get("speculation") is not job:
+            continue  # abandoned speculation
+        try:
+            with _trace_bind(job["trace"]):
+                if owner is job:
+                    _apply_request_event(job, event, payload)
+                else:
+                    _apply_speculation_event(job, event, payload)
+        except ReferenceError:
+            _drop_request_job(owner)
+        _request_redraw()
+
+    _start_settled_speculations()
+    try:
+        _commit_request_jobs()
+    except ReferenceError:
+        for job in list(_REQUEST_JOBS["jobs"]):
+            if job["response"] is not None:
+                _drop_request_job(job)
+    _pump_request_queue()
+
+    if _REQUEST_JOBS["jobs"]:
+        return _REQUEST_POLL_INTERVAL_S
+    return None
+
+
 class SUZANNEVA_OT_microphone_press(Operator):
     """Single Microphone button: press to switch ON/OFF"""
     bl_idname = "suzanne_va.microphone_press"
     bl_label = "Microphone"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'}
 
     recording_process = None
     recording_path = ""
@@ -85,7 +553,7 @@ class SUZANNEVA_OT_microphone_press(Operator):
                 "--output-path",
                 SUZANNEVA_OT_microphone_press.recording_path,
             ]]
-            fallback_device = _first_non_default_audio_device(_get_audio_devices_macos())
+            fallback_device = _first_non_default_audio_device(_cached_audio_devices())
             if fallback_device:
                 candidates.append([
                     atunc_path,
@@ -110,7 +578,7 @@ class SUZANNEVA_OT_microphone_press(Operator):
                     [ffmpeg_path, "-f", "wasapi", "-i", "default"] + self._recording_output_args(),
                     [ffmpeg_path, "-f", "dshow", "-i", "audio=default"] + self._recording_output_args(),
                 ]
-                fallback_device = _first_non_default_audio_device(_get_audio_devices_windows())
+                fallback_device = _first_non_default_audio_device(_cached_audio_devices())
                 if fallback_device:
                     candidates.append(
                         [ffmpeg_path, "-f", "dshow", "-i", f"audio={fallback_device}"] + self._recording_output_args()
@@ -149,70 +617,36 @@ class SUZANNEVA_OT_microphone_press(Operator):
         return False
 
     def _send_to_chatgpt(self, context, audio_path):
+        """
+        Start the voice turn: transcription, then the chat request, on workers.
+        Returns (started, error_message); the outcome lands in the status card.
+        """
         prefs = _get_addon_preferences(context)
-        api_key = _get_effective_api_key(prefs)
-        if not api_key:
-            return False, "Missing OpenAI API key in add-on preferences."
+        transcription_endpoint = _backend_endpoint(prefs, "transcription")
+        chat_endpoint = _backend_endpoint(prefs, "chat")
+        key_error = _endpoint_key_error(transcription_endpoint) or _endpoint_key_error(chat_endpoint)
+        if key_error:
+            return False, key_error
 
         if not audio_path or not os.path.exists(audio_path):
             return False, f"Recording file not found: {audio_path}"
 
-        try:
-            transcription = _transcribe_audio(
-                api_key,
-                prefs.transcription_model,
-                audio_path,
-            )
-        except (HTTPError, URLError, json.JSONDecodeError) as exc:
-            return False, f"Transcription failed: {exc}"
-
-        transcript_text = transcription.get("text", "")
-        if not transcript_text:
-            return False, "Transcription returned no text."
-
-        scene = context.scene
-        info_context = ""
-        if scene.suzanne_va_include_info_history:
-            info_context = _get_info_history_lines(_INFO_HISTORY_LINE_LIMIT)
-            scene.suzanne_va_last_info_history = info_context or "(No Info history was captured.)"
-        else:
-            scene.suzanne_va_last_info_history = ""
-        conversation_context = _conversation_context_block(scene)
-
-        prompt_text = _build_markdown_input(
-            transcript_text,
-            info_context,
-            is_voice=True,
-            conversation_context_text=conversation_context,
+        job = _new_request_job(context.scene, prefs, "voice", chat_endpoint)
+        job.update(
+            transcription=transcription_endpoint,
+            transcription_model=prefs.transcription_model,
+            audio_path=audio_path,
+            status="Transcribing...",
+            speculate=(
+                getattr(prefs, "speculative_voice_replies", False)
+                and _transcription_streams(prefs.transcription_model)
+            ),
         )
-        prompt_text = _blender_only_prefix(prompt_text)
-
-        try:
-            response = _call_chatgpt(
-                api_key,
-                prefs.response_model,
-                prompt_text,
-            )
-        except (HTTPError, URLError, json.JSONDecodeError) as exc:
-            return False, f"ChatGPT request failed: {exc}"
-
-        response_text = response.get("output_text")
-        if not response_text:
-            output_items = response.get("output", [])
-            response_text = ""
-            for item in output_items:
-                if item.get("type") == "message":
-                    for content in item.get("content", []):
-                        if content.get("type") == "output_text":
-                            response_text += content.get("text", "")
-
-        scene.suzanne_va_last_audio = audio_path
-        scene.suzanne_va_last_transcript = transcript_text
-        scene.suzanne_va_last_response = response_text or ""
-        scene.suzanne_va_expand_transcript = False
-        scene.suzanne_va_expand_response = False
-        _append_conversation_exchange(scene, transcript_text, response_text or "", source="voice")
-
+        if not _submit_request_job(job, _launch_voice_job):
+            _trace_end("error", prefs, trace=job["trace"])
+            return False, _REQUEST_QUEUE_FULL_MESSAGE
+        if job["state"] == "queued":
+            context.scene.suzanne_va_status = "Queued..."
         return True, ""
 
     def execute(self, context):
@@ -224,7 +658,7 @@ class SUZANNEVA_OT_microphone_press(Operator):
             if not self._start_recording(context):
                 scene.suzanne_va_mic_active = False
                 scene.suzanne_va_status = "Idle"
-                _tag_redraw_all()
+                _request_redraw()
                 return {'CANCELLED'}
 
             scene.suzanne_va_status = "Recording..."
@@ -232,36 +666,42 @@ class SUZANNEVA_OT_microphone_press(Operator):
             _log("Mic -> ON (recording)")
         else:
             scene.suzanne_va_status = "Stopping..."
-            _tag_redraw_all()
+            _request_redraw()
+            prefs = _get_addon_preferences(context)
+            _trace_begin("voice")
 
-            self._stop_recording()
+            with _trace_span("stop_recorder"):
+                self._stop_recording()
 
             recording_path = SUZANNEVA_OT_microphone_press.recording_path
-            if not self._wait_for_file(recording_path):
+            with _trace_span("wait_for_file"):
+                file_ready = self._wait_for_file(recording_path)
+            if not file_ready:
+                _trace_end("error", prefs)
                 scene.suzanne_va_status = "Idle (error)"
                 self.report(
                     {'ERROR'},
                     f"Suzanne VA: Recording file not found: {recording_path}",
                 )
                 _log(f"Mic -> OFF (error: file not found: {recording_path})")
-                _tag_redraw_all()
+                _request_redraw()
                 return {'FINISHED'}
 
-            scene.suzanne_va_status = "Sending to ChatGPT..."
+            scene.suzanne_va_status = "Transcribing..."
             success, message = self._send_to_chatgpt(
                 context,
                 recording_path,
             )
             if success:
-                scene.suzanne_va_status = "Idle (sent)"
-                self.report({'INFO'}, "Suzanne VA: Sent to ChatGPT")
-                _log("Mic -> OFF (sent)")
+                self.report({'INFO'}, "Suzanne VA: Recording sent")
+                _log("Mic -> OFF (sent to request queue)")
             else:
+                _trace_end("error", prefs)
                 scene.suzanne_va_status = "Idle (error)"
                 self.report({'ERROR'}, f"Suzanne VA: {message}")
                 _log(f"Mic -> OFF (error: {message})")
 
-        _tag_redraw_all()
+        _request_redraw()
         return {'FINISHED'}
 
 # ------------------------ send message -------------------------
@@ -279,59 +719,46 @@ class SUZANNEVA_OT_send_message(Operator):
             return {'CANCELLED'}
 
         prefs = _get_addon_preferences(context)
-        api_key = _get_effective_api_key(prefs)
-        if not api_key:
-            self.report({'ERROR'}, "Missing OpenAI API key in add-on preferences.")
+        endpoint = _backend_endpoint(prefs, "chat")
+        key_error = _endpoint_key_error(endpoint)
+        if key_error:
+            self.report({'ERROR'}, key_error)
             return {'CANCELLED'}
 
-        info_context = ""
-        if scene.suzanne_va_include_info_history:
-            info_context = _get_info_history_lines(_INFO_HISTORY_LINE_LIMIT)
-            scene.suzanne_va_last_info_history = info_context or "(No Info history was captured.)"
-        else:
-            scene.suzanne_va_last_info_history = ""
-        conversation_context = _conversation_context_block(scene)
-
-        prompt_text = _build_markdown_input(
-            prompt,
-            info_context,
-            is_voice=False,
-            conversation_context_text=conversation_context,
+        _trace_begin("text")
+        info_context = _capture_info_context(scene)
+        job = _new_request_job(scene, prefs, "text", endpoint)
+        launched = _submit_request_job(
+            job,
+            lambda job: _start_chat_request(job["scene"], job["prefs"], job, prompt, info_context),
         )
-        prompt_text = _blender_only_prefix(prompt_text)
+        if not launched:
+            _trace_end("error", prefs, trace=job["trace"])
+            self.report({'WARNING'}, _REQUEST_QUEUE_FULL_MESSAGE)
+            return {'CANCELLED'}
+        if job["state"] == "queued":
+            scene.suzanne_va_status = "Queued..."
+        _request_redraw()
+        return {'FINISHED'}
 
-        scene.suzanne_va_status = "Sending..."
-        _tag_redraw_all()
+class SUZANNEVA_OT_cancel_request(Operator):
+    """Abort every pending request; replies that still arrive are discarded"""
+    bl_idname = "suzanne_va.cancel_request"
+    bl_label = "Cancel Request"
+    bl_options = {'REGISTER'}
 
-        try:
-            response = _call_chatgpt(
-                api_key,
-                prefs.response_model,
-                prompt_text,
-            )
-        except (HTTPError, URLError, json.JSONDecodeError) as exc:
-            scene.suzanne_va_status = "Idle (error)"
-            self.report({'ERROR'}, f"Send failed: {exc}")
-            _tag_redraw_all()
-            return {'CANCELLED'}
+    @classmethod
+    def poll(cls, context):
+        return bool(_REQUEST_JOBS["jobs"])
 
-        response_text = response.get("output_text")
-        if not response_text:
-            output_items = response.get("output", [])
-            response_text = ""
-            for item in output_items:
-                if item.get("type") == "message":
-                    for content in item.get("content", []):
-                        if content.get("type") == "output_text":
-                            response_text += content.get("text", "")
-
-        scene.suzanne_va_last_transcript = prompt
-        scene.suzanne_va_last_response = response_text or ""
-        scene.suzanne_va_expand_transcript = False
-        scene.suzanne_va_expand_response = False
-        _append_conversation_exchange(scene, prompt, response_text or "", source="text")
-        scene.suzanne_va_status = "Idle (sent)"
-        _tag_redraw_all()
+    def execute(self, context):
+        jobs = list(_REQUEST_JOBS["jobs"])
+        if not jobs:
+            return {'CANCELLED'}
+        for job in jobs:
+            _cancel_request_job(job)
+        _request_redraw()
+        self.report({'INFO'}, f"Cancelled {len(jobs)} request(s).")
         return {'FINISHED'}
 
 # ------------------------- test key ----------------------------
@@ -356,9 +783,11 @@ class SUZANNEVA_OT_test_api_key(Operator):
             return {'CANCELLED'}
 
         try:
+            # Runs on the main thread: never sleep in the rate limiter here.
             response_text = _get_json(
-                "https://api.openai.com/v1/models",
+                _api_url("models", prefs=prefs),
                 api_key,
+                wait=False,
             )
             _ = json.loads(response_text)
         except HTTPError as exc:
@@ -391,10 +820,20 @@ class SUZANNEVA_OT_refresh_models(Operator):
 
     def execute(self, context):
         prefs = _get_addon_preferences(context)
-        api_key = _get_effective_api_key(prefs)
-        _get_models_cached(api_key, force=True)
-        _set_diagnostics_message(prefs, message="Model list refreshed.")
-        self.report({'INFO'}, "Model list refreshed.")
+        # Chat and transcription may share a backend; refresh each backend once.
+        endpoints = {}
+        for role in ("chat", "transcription"):
+            endpoint = _backend_endpoint(prefs, role)
+            key_error = _endpoint_key_error(endpoint)
+            if key_error:
+                _set_diagnostics_message(prefs, error=key_error)
+                self.report({'ERROR'}, key_error)
+                return {'CANCELLED'}
+            endpoints[endpoint["backend"]] = endpoint
+        for endpoint in endpoints.values():
+            _get_models_cached(endpoint, force=True)
+        _set_diagnostics_message(prefs, message="Refreshing model list in the background...")
+        self.report({'INFO'}, "Refreshing model list...")
         return {'FINISHED'}
 
 class SUZANNEVA_OT_refresh_devices(Operator):
@@ -405,6 +844,7 @@ class SUZANNEVA_OT_refresh_devices(Operator):
     def execute(self, context):
         _AUDIO_DEVICES_CACHE["ts"] = 0.0
         _AUDIO_DEVICES_CACHE["items"] = []
+        _refresh_audio_devices_async(force=True)
         self.report({'INFO'}, "Audio devices refreshed.")
         return {'FINISHED'}
 
@@ -450,6 +890,31 @@ class SUZANNEVA_OT_open_recordings_folder(Operator):
         self.report({'INFO'}, "Opened recordings folder.")
         return {'FINISHED'}
 
+class SUZANNEVA_OT_open_output_text(Operator):
+    """Show the Suzanne output text in a Text Editor."""
+    bl_idname = "suzanne_va.open_output_text"
+    bl_label = "Open in Text Editor"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        text_block = _output_text_block(create=False)
+        if text_block is None:
+            self.report({'ERROR'}, "No Suzanne output text yet.")
+            return {'CANCELLED'}
+
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'TEXT_EDITOR':
+                    area.spaces.active.text = text_block
+                    area.tag_redraw()
+                    return {'FINISHED'}
+
+        bpy.ops.wm.window_new()
+        area = context.window_manager.windows[-1].screen.areas[0]
+        area.type = 'TEXT_EDITOR'
+        area.spaces.active.text = text_block
+        return {'FINISHED'}
+
 class SUZANNEVA_OT_test_microphone(Operator):
     bl_idname = "suzanne_va.test_microphone"
     bl_label = "Test Microphone"
@@ -474,9 +939,9 @@ class SUZANNEVA_OT_test_transcription(Operator):
 
     def execute(self, context):
         prefs = _get_addon_preferences(context)
-        api_key = _get_effective_api_key(prefs)
-        if not api_key:
-            message = "Missing OpenAI API key for transcription test."
+        endpoint = _backend_endpoint(prefs, "transcription")
+        if _endpoint_key_error(endpoint):
+            message = f"Missing {endpoint['label']} API key for transcription test."
             _set_diagnostics_message(prefs, error=message)
             self.report({'ERROR'}, message)
             return {'CANCELLED'}
@@ -487,9 +952,10 @@ class SUZANNEVA_OT_test_transcription(Operator):
         try:
             _write_silence_wav(temp_wav)
             response = _transcribe_audio(
-                api_key,
+                endpoint["api_key"],
                 prefs.transcription_model,
                 temp_wav,
+                base_url=endpoint["base_url"],
             )
         except (HTTPError, URLError, json.JSONDecodeError) as exc:
             message = f"Transcription test failed: {exc}"
@@ -526,7 +992,7 @@ class SUZANNEVA_OT_test_transcription(Operator):
 class SUZANNEVA_OT_new_conversation(Operator):
     bl_idname = "suzanne_va.new_conversation"
     bl_label = "New Conversation"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'}
 
     def execute(self, context):
         scene = context.scene
@@ -536,13 +1002,13 @@ class SUZANNEVA_OT_new_conversation(Operator):
             self.report({'ERROR'}, "Could not create a local conversation.")
             return {'CANCELLED'}
         self.report({'INFO'}, f"Created conversation: {conversation.get('title', 'Untitled')}")
-        _tag_redraw_all()
+        _request_redraw()
         return {'FINISHED'}
 
 class SUZANNEVA_OT_rename_conversation(Operator):
     bl_idname = "suzanne_va.rename_conversation"
     bl_label = "Rename Conversation"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'}
 
     new_title: StringProperty(
         name="Title",
@@ -567,13 +1033,13 @@ class SUZANNEVA_OT_rename_conversation(Operator):
             self.report({'ERROR'}, "Could not rename conversation.")
             return {'CANCELLED'}
         self.report({'INFO'}, "Conversation renamed.")
-        _tag_redraw_all()
+        _request_redraw()
         return {'FINISHED'}
 
 class SUZANNEVA_OT_delete_conversation(Operator):
     bl_idname = "suzanne_va.delete_conversation"
     bl_label = "Delete Conversation"
-    bl_options = {'REGISTER', 'UNDO'}
+    bl_options = {'REGISTER'}
 
     def invoke(self, context, event):
         return context.window_manager.invoke_confirm(self, event)
@@ -583,5 +1049,98 @@ class SUZANNEVA_OT_delete_conversation(Operator):
             self.report({'ERROR'}, "Could not delete conversation.")
             return {'CANCELLED'}
         self.report({'INFO'}, "Conversation deleted.")
-        _tag_redraw_all()
+        _request_redraw()
+        return {'FINISHED'}
+
+class SUZANNEVA_OT_undo_conversation_change(Operator):
+    """Revert the last new, rename or delete of a local conversation."""
+    bl_idname = "suzanne_va.undo_conversation_change"
+    bl_label = "Undo Conversation Change"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, _context):
+        return bool(_CONVERSATION_HISTORY)
+
+    def execute(self, context):
+        success, message = _undo_conversation_change(context.scene)
+        if not success:
+            self.report({'ERROR'}, message)
+            return {'CANCELLED'}
+        self.report({'INFO'}, message)
+        _request_redraw()
+        return {'FINISHED'}
+
+class SUZANNEVA_OT_search_conversations(Operator):
+    """Search every local conversation for the query text."""
+    bl_idname = "suzanne_va.search_conversations"
+    bl_label = "Search Conversations"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        query = (context.scene.suzanne_va_search_query or "").strip()
+        if not query:
+            _SEARCH_RESULTS["query"] = ""
+            _SEARCH_RESULTS["hits"] = []
+            _request_redraw()
+            return {'CANCELLED'}
+        hits = _run_conversation_search(query)
+        self.report(
+            {'INFO'},
+            f"{len(hits)} match(es) in {_SEARCH_RESULTS['elapsed_ms']:.1f} ms.",
+        )
+        _request_redraw()
+        return {'FINISHED'}
+
+class SUZANNEVA_OT_open_search_hit(Operator):
+    """Switch to the conversation containing this search hit."""
+    bl_idname = "suzanne_va.open_search_hit"
+    bl_label = "Open Conversation"
+    bl_options = {'REGISTER'}
+
+    conversation_id: StringProperty(
+        name="Conversation",
+        default="",
+    )
+
+    def execute(self, context):
+        conversation_id = (self.conversation_id or "").strip()
+        if not conversation_id or not _find_conversation(_load_conversation_store(), conversation_id):
+            self.report({'ERROR'}, "That conversation no longer exists.")
+            return {'CANCELLED'}
+        scene = context.scene
+        _set_active_conversation(scene, conversation_id)
+        scene.suzanne_va_show_conversation = True
+        _request_redraw()
+        return {'FINISHED'}
+
+class SUZANNEVA_OT_transcript_page(Operator):
+    """Show another page of the conversation transcript."""
+    bl_idname = "suzanne_va.transcript_page"
+    bl_label = "Transcript Page"
+    bl_options = {'REGISTER'}
+
+    direction: EnumProperty(
+        name="Direction",
+        items=[
+            ("FIRST", "First", "Show the oldest messages"),
+            ("PREVIOUS", "Previous", "Show older messages"),
+            ("NEXT", "Next", "Show newer messages"),
+            ("LAST", "Last", "Show the newest messages"),
+        ],
+        default="NEXT",
+    )
+
+    def execute(self, context):
+        scene = context.scene
+        current, page_count, _ = _transcript_view(scene)
+        last = page_count - 1
+        target = {
+            "FIRST": 0,
+            "PREVIOUS": current - 1,
+            "NEXT": current + 1,
+            "LAST": last,
+        }[self.direction]
+        _transcript_view(scene, page=min(max(0, target), last))
+        _request_redraw()
         return {'FINISHED'}
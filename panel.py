@@ -1,10 +1,16 @@
 from .common import *  # noqa: F403,F401
 from .operators import (  # noqa: F401
     SUZANNEVA_OT_send_message,
+    SUZANNEVA_OT_cancel_request,
     SUZANNEVA_OT_microphone_press,
     SUZANNEVA_OT_new_conversation,
     SUZANNEVA_OT_rename_conversation,
     SUZANNEVA_OT_delete_conversation,
+    SUZANNEVA_OT_undo_conversation_change,
+    SUZANNEVA_OT_search_conversations,
+    SUZANNEVA_OT_open_search_hit,
+    SUZANNEVA_OT_transcript_page,
+    SUZANNEVA_OT_open_output_text,
 )
 
 # ----------------------------- panel ---------------------------
@@ -15,7 +21,7 @@ class SUZANNEVA_PT_sidebar(Panel):
     bl_idname = "SUZANNEVA_PT_sidebar"
     bl_space_type = 'VIEW_3D'
     bl_region_type = 'UI'
-    bl_category = "Suzanne"
+    bl_category = _PANEL_CATEGORY
 
     @classmethod
     def poll(cls, context):
@@ -36,8 +42,45 @@ class SUZANNEVA_PT_sidebar(Panel):
                 'REC',
                 False,
             )
+        if "for rate limit" in normalized:
+            return (
+                "Waiting for rate limit...",
+                "Pacing requests to stay under the API rate limit. The request is queued, not failed.",
+                'TIME',
+                False,
+            )
+        if " retry " in normalized:
+            return ("Retrying...", raw_status, 'FILE_REFRESH', False)
         if "error" in normalized:
             return ("Error", raw_status, 'ERROR', True)
+        if "cancelled" in normalized:
+            return (
+                "Ready",
+                "Request cancelled. Nothing was added to the conversation.",
+                'CANCEL',
+                False,
+            )
+        if "transcribing" in normalized:
+            return (
+                "Transcribing...",
+                "Turning the recording into text before sending it.",
+                'TIME',
+                False,
+            )
+        if "queued" in normalized:
+            return (
+                "Queued...",
+                "Waiting for an earlier request to finish. Replies are saved in the order you asked.",
+                'SORTTIME',
+                False,
+            )
+        if "saving after earlier" in normalized:
+            return (
+                "Reply received...",
+                "Saved as soon as the earlier questions in this conversation are answered.",
+                'SORTTIME',
+                False,
+            )
         if "sending" in normalized:
             return (
                 "Sending...",
@@ -68,20 +111,21 @@ class SUZANNEVA_PT_sidebar(Panel):
             False,
         )
 
+    def _conversation_placeholder_row(self, scene):
+        active_conversation_id = str(scene.suzanne_va_active_conversation or "").strip()
+        has_conversation = bool(active_conversation_id) and active_conversation_id != _NO_CONVERSATION_ID
+        if has_conversation:
+            return ("No saved messages yet. Start by asking a question.", True)
+        return ("No conversation yet. Create one or send a prompt.", True)
+
     def _conversation_preview_rows(self, scene):
         preview_lines = _conversation_preview_lines(
             scene,
             max_items=max(2, min(14, scene.suzanne_va_context_turns * 2)),
         )
-
-        active_conversation_id = str(scene.suzanne_va_active_conversation or "").strip()
-        has_conversation = bool(active_conversation_id) and active_conversation_id != _NO_CONVERSATION_ID
-
         if preview_lines:
             return [(line, False) for line in preview_lines]
-        if has_conversation:
-            return [("No saved messages yet. Start by asking a question.", True)]
-        return [("No conversation yet. Create one or send a prompt.", True)]
+        return [self._conversation_placeholder_row(scene)]
 
     def _draw_status_card(self, layout, scene, is_recording):
         title, detail, icon_name, is_alert = self._status_presentation(scene, is_recording)
@@ -93,9 +137,20 @@ class SUZANNEVA_PT_sidebar(Panel):
         header_row.label(text=title, icon=icon_name)
 
         detail_col = status_box.column(align=True)
-        for line in _wrap_ui_text(detail, width=42):
+        for line in _wrap_ui_text(detail, width=_ui_wrap_width(fallback=42)):
             detail_col.label(text=line)
 
+        running, queued = _request_queue_counts()
+        if running or queued:
+            queue_row = status_box.row(align=True)
+            queue_row.enabled = False
+            queue_text = f"{running} in flight"
+            if queued:
+                queue_text += f", {queued} queued"
+            queue_row.label(text=queue_text, icon='SORTTIME')
+            cancel_row = status_box.row(align=True)
+            cancel_row.operator(SUZANNEVA_OT_cancel_request.bl_idname, text="Cancel", icon='CANCEL')
+
         layout.separator()
 
     def _draw_ask_card(self, layout, scene):
@@ -127,8 +182,24 @@ class SUZANNEVA_PT_sidebar(Panel):
         context_col = body.column(align=True)
         context_col.prop(scene, "suzanne_va_use_conversation_context", text="Use Conversation Context")
         if scene.suzanne_va_use_conversation_context:
+            context_col.prop(scene, "suzanne_va_context_mode", expand=True)
             context_col.prop(scene, "suzanne_va_context_turns", text="Context Turns")
         context_col.prop(scene, "suzanne_va_include_info_history", text="Include Info History (100 lines)")
+        context_col.prop(scene, "suzanne_va_prompt_token_budget", text="Token Budget")
+        last_tokens = int(getattr(scene, "suzanne_va_last_prompt_tokens", 0) or 0)
+        if last_tokens:
+            usage_row = context_col.row(align=True)
+            usage_row.enabled = False
+            usage_row.label(
+                text=f"Last prompt: ~{last_tokens} / {scene.suzanne_va_prompt_token_budget} tokens",
+                icon='INFO',
+            )
+        input_tokens = int(getattr(scene, "suzanne_va_last_input_tokens", 0) or 0)
+        if input_tokens:
+            cached_tokens = int(getattr(scene, "suzanne_va_last_cached_tokens", 0) or 0)
+            cache_row = context_col.row(align=True)
+            cache_row.enabled = False
+            cache_row.label(text=f"Billed: {input_tokens} input, {cached_tokens} cached")
         layout.separator()
 
     def _draw_conversation_card(self, layout, scene):
@@ -154,13 +225,78 @@ class SUZANNEVA_PT_sidebar(Panel):
         delete_row.enabled = has_conversation
         delete_row.operator(SUZANNEVA_OT_delete_conversation.bl_idname, text="", icon='TRASH')
 
-        preview_box = conversation_col.box()
-        for label, is_placeholder in self._conversation_preview_rows(scene):
-            preview_row = preview_box.row(align=True)
-            preview_row.enabled = not is_placeholder
-            preview_row.label(text=label, icon='INFO' if is_placeholder else 'TEXT')
+        if _CONVERSATION_HISTORY:
+            controls_row.operator(SUZANNEVA_OT_undo_conversation_change.bl_idname, text="", icon='LOOP_BACK')
+
+        self._draw_transcript(conversation_col, scene)
+        self._draw_search_results(conversation_col, scene)
         layout.separator()
 
+    def _draw_transcript(self, layout, scene):
+        # Rows come from the cached pages at draw time; nothing is stored in the scene.
+        page, page_count, rows = _transcript_view(scene)
+        transcript_box = layout.box()
+        if not rows:
+            for label, is_placeholder in self._conversation_preview_rows(scene):
+                preview_row = transcript_box.row(align=True)
+                preview_row.enabled = not is_placeholder
+                preview_row.label(text=label, icon='INFO' if is_placeholder else 'TEXT')
+            return
+
+        for role, text, _timestamp in rows:
+            speaker = "You" if role == "user" else "Suzanne"
+            transcript_box.label(text=f"{speaker}: {text}", icon='USER' if role == "user" else 'TEXT')
+
+        if page_count < 2:
+            return
+
+        nav_row = layout.row(align=True)
+        for direction, icon_name, enabled in (
+            ("FIRST", 'REW', page > 0),
+            ("PREVIOUS", 'TRIA_LEFT', page > 0),
+        ):
+            button_row = nav_row.row(align=True)
+            button_row.enabled = enabled
+            button_row.operator(SUZANNEVA_OT_transcript_page.bl_idname, text="", icon=icon_name).direction = direction
+        nav_row.label(text=f"Page {page + 1} / {page_count}")
+        for direction, icon_name, enabled in (
+            ("NEXT", 'TRIA_RIGHT', page < page_count - 1),
+            ("LAST", 'FF', page < page_count - 1),
+        ):
+            button_row = nav_row.row(align=True)
+            button_row.enabled = enabled
+            button_row.operator(SUZANNEVA_OT_transcript_page.bl_idname, text="", icon=icon_name).direction = direction
+
+    def _draw_search_results(self, layout, scene):
+        search_row = layout.row(align=True)
+        search_row.prop(scene, "suzanne_va_search_query", text="", icon='VIEWZOOM')
+        search_row.operator(SUZANNEVA_OT_search_conversations.bl_idname, text="", icon='VIEWZOOM')
+
+        query = (scene.suzanne_va_search_query or "").strip()
+        if not query or query != _SEARCH_RESULTS["query"]:
+            return
+
+        results_box = layout.box()
+        hits = _SEARCH_RESULTS["hits"]
+        if not hits:
+            empty_row = results_box.row(align=True)
+            empty_row.enabled = False
+            empty_row.label(text="No matching messages.", icon='INFO')
+            return
+
+        for hit in hits:
+            hit_row = results_box.row(align=True)
+            open_op = hit_row.operator(
+                SUZANNEVA_OT_open_search_hit.bl_idname,
+                text=_clip_text(hit["title"], 40),
+                icon='TEXT',
+                emboss=False,
+            )
+            open_op.conversation_id = hit["conversation_id"]
+            snippet_row = results_box.row(align=True)
+            snippet_row.enabled = False
+            snippet_row.label(text=f"{hit['role']}: {hit['snippet']}")
+
     def _draw_voice_card(self, layout, scene, is_recording):
         header, body = layout.panel_prop(scene, "suzanne_va_show_recording")
         header.label(text="Voice", icon='REC')
@@ -192,10 +328,17 @@ class SUZANNEVA_PT_sidebar(Panel):
         if body is None:
             return
 
-        has_transcript = bool((scene.suzanne_va_last_transcript or "").strip())
-        has_response = bool((scene.suzanne_va_last_response or "").strip())
+        last_transcript = _runtime_text(scene, "last_transcript")
+        last_response = _runtime_text(scene, "last_response")
+        has_transcript = bool(last_transcript.strip())
+        has_response = bool(last_response.strip())
         output_col = body.column(align=True)
 
+        target_row = output_col.row(align=True)
+        target_row.prop(scene, "suzanne_va_output_to_text", icon='TEXT')
+        if scene.suzanne_va_output_to_text:
+            target_row.prop(scene, "suzanne_va_output_text_conversation", toggle=True)
+
         if not has_transcript and not has_response:
             empty_row = output_col.row(align=True)
             empty_row.enabled = False
@@ -205,6 +348,7 @@ class SUZANNEVA_PT_sidebar(Panel):
         if has_transcript and has_response:
             output_col.prop(scene, "suzanne_va_output_view", expand=True)
 
+        wrap_width = _ui_wrap_width(fallback=80)
         selected_view = scene.suzanne_va_output_view
         if selected_view == "transcript" and not has_transcript:
             selected_view = "response"
@@ -214,8 +358,8 @@ class SUZANNEVA_PT_sidebar(Panel):
         if selected_view == "transcript":
             output_col.label(text="Transcript", icon='TEXT')
             transcript_lines, transcript_needs_toggle = _preview_response_lines(
-                scene.suzanne_va_last_transcript,
-                width=80,
+                last_transcript,
+                width=wrap_width,
                 max_lines=_TRANSCRIPT_PREVIEW_LINES,
                 expanded=scene.suzanne_va_expand_transcript,
             )
@@ -226,18 +370,22 @@ class SUZANNEVA_PT_sidebar(Panel):
             return
 
         output_col.label(text="ChatGPT Response", icon='CHECKMARK')
+        # Long answers live in the Text Editor; the panel keeps a short preview.
+        in_text_editor = bool(scene.suzanne_va_output_to_text)
         response_lines, response_needs_toggle = _preview_response_lines(
-            scene.suzanne_va_last_response,
-            width=80,
+            last_response,
+            width=wrap_width,
             max_lines=_RESPONSE_PREVIEW_LINES,
-            expanded=scene.suzanne_va_expand_response,
+            expanded=scene.suzanne_va_expand_response and not in_text_editor,
         )
         for line in response_lines:
             if line.lower().startswith("step "):
                 output_col.label(text=line, icon='CHECKMARK')
             else:
                 output_col.label(text=line)
-        if response_needs_toggle:
+        if in_text_editor:
+            output_col.operator(SUZANNEVA_OT_open_output_text.bl_idname, icon='TEXT')
+        elif response_needs_toggle:
             _draw_expand_toggle(output_col, scene, "suzanne_va_expand_response")
 
     def draw(self, context):
@@ -10,6 +10,39 @@ class SUZANNEVA_Preferences(AddonPreferences):
         description="API key used to send recordings to ChatGPT",
         default="",
     )
+    api_base_url: StringProperty(
+        name="API Base URL",
+        description=(
+            "OpenAI-compatible endpoint root, e.g. http://127.0.0.1:8765/v1 for the local mock server. "
+            "Leave empty for https://api.openai.com/v1"
+        ),
+        default="",
+    )
+    chat_backend: EnumProperty(
+        name="Chat Backend",
+        description="Service that answers prompts (Responses API)",
+        items=_BACKEND_ENUM_ITEMS,
+        default=_BACKEND_OPENAI,
+        update=_on_backend_changed,
+    )
+    transcription_backend: EnumProperty(
+        name="Transcription Backend",
+        description="Service that transcribes recordings",
+        items=_BACKEND_ENUM_ITEMS,
+        default=_BACKEND_OPENAI,
+        update=_on_backend_changed,
+    )
+    local_base_url: StringProperty(
+        name="Server Base URL",
+        description="Root of the OpenAI-compatible server's API, including /v1",
+        default=_LOCAL_API_BASE_URL,
+    )
+    local_api_key: StringProperty(
+        name="Server API Key",
+        description="Optional bearer token for the OpenAI-compatible server; leave empty when it has no auth",
+        default="",
+        subtype='PASSWORD',
+    )
     show_api_key: BoolProperty(
         name="Show API Key",
         description="Reveal or hide the API key",
@@ -40,16 +73,47 @@ class SUZANNEVA_Preferences(AddonPreferences):
         description="Automatically append each user/assistant exchange to local conversation history",
         default=True,
     )
+    use_response_chaining: BoolProperty(
+        name="Chain Responses on Server",
+        description=(
+            "Send only the new turn and continue from the stored OpenAI response "
+            "(previous_response_id). Falls back to local context when the chain is unavailable"
+        ),
+        default=False,
+    )
+    speculative_voice_replies: BoolProperty(
+        name="Speculative Voice Replies",
+        description=(
+            "Stream the transcript and start the reply once it pauses after a finished sentence; "
+            "it is cancelled and resent if the final transcript differs. "
+            "Faster voice replies at the cost of at most one extra request per turn. Needs a *-transcribe model"
+        ),
+        default=False,
+    )
+    summarize_conversations: BoolProperty(
+        name="Summarize Long Conversations",
+        description=(
+            "Condense turns older than the context window into a running summary "
+            "in the background, and send it with the recent turns. "
+            "Each summary is an extra request to the chat model"
+        ),
+        default=False,
+    )
     diagnostics_last_message: StringProperty(
         name="Diagnostics Message",
         default="",
     )
+    write_latency_traces: BoolProperty(
+        name="Log Latency Traces",
+        description="Append a per-stage timing record for every assistant turn to data/suzanne_traces.jsonl",
+        default=False,
+    )
     diagnostics_last_error: StringProperty(
         name="Last Error",
         default="",
     )
 
-    def draw(self, _context):
+    def draw(self, context):
         layout = self.layout
         os_name = _os_display_name()
         layout.label(text="Suzanne Version 1.0.0")
@@ -60,6 +124,17 @@ class SUZANNEVA_Preferences(AddonPreferences):
         layout.prop(self, "file_prefix")
         layout.separator()
 
+        layout.label(text="Backends")
+        row = layout.row(align=True)
+        row.prop(self, "chat_backend", text="Chat")
+        row.prop(self, "transcription_backend", text="Transcription")
+        if _BACKEND_LOCAL in {self.chat_backend, self.transcription_backend}:
+            server_box = layout.box()
+            server_box.label(text=_BACKENDS[_BACKEND_LOCAL]["label"])
+            server_box.prop(self, "local_base_url")
+            server_box.prop(self, "local_api_key")
+        layout.separator()
+
         layout.label(text="OpenAI Settings")
         row = layout.row(align=True)
         if self.show_api_key:
@@ -70,6 +145,7 @@ class SUZANNEVA_Preferences(AddonPreferences):
             row.label(text=f"API Key: {masked}")
             row.prop(self, "show_api_key", text="Show")
         row.operator("suzanne_va.clear_saved_api_key", text="Clear")
+        layout.prop(self, "api_base_url")
 
         row = layout.row(align=True)
         row.prop(self, "response_model")
@@ -78,15 +154,19 @@ class SUZANNEVA_Preferences(AddonPreferences):
         row = layout.row(align=True)
         row.prop(self, "transcription_model")
         row.operator("suzanne_va.refresh_models", text="Refresh")
+        layout.prop(self, "speculative_voice_replies")
 
         layout.separator()
         layout.label(text="Conversation Storage")
         layout.prop(self, "auto_save_conversations")
+        layout.prop(self, "use_response_chaining")
+        layout.prop(self, "summarize_conversations")
 
+        wrap_width = _ui_wrap_width(context, fallback=78)
         recordings_path = str(_recordings_dir())
         recordings_box = layout.box()
         recordings_box.label(text="Recordings Folder")
-        for line in _wrap_ui_text(recordings_path, width=78):
+        for line in _wrap_ui_text(recordings_path, width=wrap_width):
             recordings_box.label(text=line)
         recordings_box.operator("suzanne_va.open_recordings_folder", text="Open Recordings Folder")
 
@@ -97,10 +177,12 @@ class SUZANNEVA_Preferences(AddonPreferences):
         diag_row.operator("suzanne_va.test_microphone", text="Test Microphone")
         diag_row.operator("suzanne_va.test_transcription", text="Test Transcription")
 
+        self._draw_latency_trace(layout)
+
         if self.diagnostics_last_message:
             info_box = layout.box()
             info_box.label(text="Last Result")
-            for line in _wrap_ui_text(self.diagnostics_last_message, width=78):
+            for line in _wrap_ui_text(self.diagnostics_last_message, width=wrap_width):
                 info_box.label(text=line)
 
         if self.diagnostics_last_error:
@@ -109,5 +191,28 @@ class SUZANNEVA_Preferences(AddonPreferences):
             header.alert = True
             header.label(text="Last Error")
             header.operator("suzanne_va.copy_last_error", text="Copy")
-            for line in _wrap_ui_text(self.diagnostics_last_error, width=78):
+            for line in _wrap_ui_text(self.diagnostics_last_error, width=wrap_width):
                 error_box.label(text=line)
+
+    def _draw_latency_trace(self, layout):
+        trace_box = layout.box()
+        header = trace_box.row(align=True)
+        header.label(text="Last Turn Latency")
+        header.prop(self, "write_latency_traces")
+        if not _TRACES:
+            trace_box.label(text="No assistant turns timed yet.")
+            return
+
+        trace = _TRACES[-1]
+        trace_box.label(text=f"{trace['kind'].title()} turn ({trace['status']}): {trace['total_ms']:.0f} ms")
+        stage_col = trace_box.column(align=True)
+        for name, elapsed_ms in trace["spans"]:
+            stage_row = stage_col.row(align=True)
+            stage_row.label(text=name.replace("_", " "))
+            stage_row.label(text=f"{elapsed_ms:.0f} ms")
+        if trace.get("speculation"):
+            trace_box.label(text=f"Speculative reply: {trace['speculation']}")
+        retries = trace.get("retries") or []
+        if retries:
+            reasons = ", ".join(retry["error"] for retry in retries)
+            trace_box.label(text=f"Retries: {len(retries)} ({reasons})", icon='FILE_REFRESH')
@@ -2,25 +2,31 @@ from .common import *  # noqa: F403,F401
 
 # --------------------------- state -----------------------------
 # Use Scene properties (reliable & per-file). No WindowManager quirks.
+# Large transient text (responses, transcripts) lives in _RUNTIME_STATE instead.
 
 _SCENE_PROP_NAMES = (
     "suzanne_va_mic_active",
     "suzanne_va_status",
     "suzanne_va_last_audio",
-    "suzanne_va_last_transcript",
-    "suzanne_va_last_response",
     "suzanne_va_prompt",
     "suzanne_va_active_conversation",
+    "suzanne_va_search_query",
     "suzanne_va_use_conversation_context",
     "suzanne_va_context_turns",
+    "suzanne_va_context_mode",
+    "suzanne_va_prompt_token_budget",
+    "suzanne_va_last_prompt_tokens",
+    "suzanne_va_last_input_tokens",
+    "suzanne_va_last_cached_tokens",
     "suzanne_va_include_info_history",
-    "suzanne_va_last_info_history",
     "suzanne_va_show_message",
     "suzanne_va_show_context",
     "suzanne_va_show_conversation",
     "suzanne_va_show_recording",
     "suzanne_va_show_output",
     "suzanne_va_output_view",
+    "suzanne_va_output_to_text",
+    "suzanne_va_output_text_conversation",
     "suzanne_va_expand_transcript",
     "suzanne_va_expand_response",
 )
@@ -46,18 +52,6 @@ def ensure_props():
             description="Most recent recording file path",
             default="",
         )
-    if not hasattr(sc, "suzanne_va_last_transcript"):
-        sc.suzanne_va_last_transcript = StringProperty(
-            name="Last Transcript",
-            description="Most recent transcription text",
-            default="",
-        )
-    if not hasattr(sc, "suzanne_va_last_response"):
-        sc.suzanne_va_last_response = StringProperty(
-            name="Last ChatGPT Response",
-            description="Most recent ChatGPT response text",
-            default="",
-        )
     if not hasattr(sc, "suzanne_va_prompt"):
         sc.suzanne_va_prompt = StringProperty(
             name="Prompt",
@@ -70,6 +64,12 @@ def ensure_props():
             description="Choose a locally saved conversation",
             items=_conversation_enum_items,
         )
+    if not hasattr(sc, "suzanne_va_search_query"):
+        sc.suzanne_va_search_query = StringProperty(
+            name="Search Conversations",
+            description="Find past messages across all local conversations",
+            default="",
+        )
     if not hasattr(sc, "suzanne_va_use_conversation_context"):
         sc.suzanne_va_use_conversation_context = BoolProperty(
             name="Use Conversation Context",
@@ -84,18 +84,51 @@ def ensure_props():
             min=1,
             max=20,
         )
+    if not hasattr(sc, "suzanne_va_context_mode"):
+        sc.suzanne_va_context_mode = EnumProperty(
+            name="Context Mode",
+            description="How past turns are picked for the conversation context",
+            items=[
+                ("recent", "Recent", "Send the most recent turns of the selected conversation"),
+                ("relevant", "Relevant", "Send the past exchanges that best match the question, from any conversation"),
+            ],
+            default="recent",
+        )
+    if not hasattr(sc, "suzanne_va_prompt_token_budget"):
+        sc.suzanne_va_prompt_token_budget = IntProperty(
+            name="Prompt Token Budget",
+            description="Estimated token limit for each request; oldest context is trimmed first",
+            default=_PROMPT_TOKEN_BUDGET_DEFAULT,
+            min=256,
+            max=128000,
+        )
+    if not hasattr(sc, "suzanne_va_last_prompt_tokens"):
+        sc.suzanne_va_last_prompt_tokens = IntProperty(
+            name="Last Prompt Tokens",
+            description="Estimated token count of the most recent request",
+            default=0,
+            min=0,
+        )
+    if not hasattr(sc, "suzanne_va_last_input_tokens"):
+        sc.suzanne_va_last_input_tokens = IntProperty(
+            name="Last Input Tokens",
+            description="Input tokens reported by the provider for the most recent request",
+            default=0,
+            min=0,
+        )
+    if not hasattr(sc, "suzanne_va_last_cached_tokens"):
+        sc.suzanne_va_last_cached_tokens = IntProperty(
+            name="Last Cached Tokens",
+            description="Input tokens served from the provider's prompt cache for the most recent request",
+            default=0,
+            min=0,
+        )
     if not hasattr(sc, "suzanne_va_include_info_history"):
         sc.suzanne_va_include_info_history = BoolProperty(
             name="Include Blender Info History",
             description="Send the last 100 lines from Blender Info with text and voice prompts",
             default=False,
         )
-    if not hasattr(sc, "suzanne_va_last_info_history"):
-        sc.suzanne_va_last_info_history = StringProperty(
-            name="Last Attached Info History",
-            description="Most recent Blender Info history block sent with a prompt",
-            default="",
-        )
     if not hasattr(sc, "suzanne_va_show_message"):
         sc.suzanne_va_show_message = BoolProperty(
             name="Show Ask Section",
@@ -131,6 +164,18 @@ def ensure_props():
             ],
             default="response",
         )
+    if not hasattr(sc, "suzanne_va_output_to_text"):
+        sc.suzanne_va_output_to_text = BoolProperty(
+            name="Write to Text Editor",
+            description="Write responses into a Text datablock and show only a short preview here",
+            default=False,
+        )
+    if not hasattr(sc, "suzanne_va_output_text_conversation"):
+        sc.suzanne_va_output_text_conversation = BoolProperty(
+            name="Whole Conversation",
+            description="Write the whole active conversation instead of only the latest response",
+            default=False,
+        )
     if not hasattr(sc, "suzanne_va_expand_transcript"):
         sc.suzanne_va_expand_transcript = BoolProperty(
             name="Expand Transcript",
@@ -143,7 +188,35 @@ def ensure_props():
         )
 
 def clear_props():
+    _RUNTIME_STATE.clear()
+    for pending_request in _REQUEST_JOBS["jobs"]:
+        pending_request["cancel"].set()
+        _cancel_request_connection(pending_request)
+        _abandon_speculation(pending_request)
+    _REQUEST_JOBS["jobs"].clear()
     sc = bpy.types.Scene
     for prop_name in _SCENE_PROP_NAMES:
         if hasattr(sc, prop_name):
             delattr(sc, prop_name)
+
+def register_keymaps():
+    """Ctrl+Alt+Period cancels the request in flight from any editor."""
+    keyconfigs = getattr(bpy.context.window_manager, "keyconfigs", None)
+    addon_keyconfig = getattr(keyconfigs, "addon", None)
+    if addon_keyconfig is None:
+        # Background mode has no add-on keyconfig.
+        return
+    keymap = addon_keyconfig.keymaps.new(name="Window", space_type='EMPTY')
+    keymap_item = keymap.keymap_items.new(
+        "suzanne_va.cancel_request",
+        type='PERIOD',
+        value='PRESS',
+        ctrl=True,
+        alt=True,
+    )
+    _ADDON_KEYMAPS.append((keymap, keymap_item))
+
+def unregister_keymaps():
+    for keymap, keymap_item in _ADDON_KEYMAPS:
+        keymap.keymap_items.remove(keymap_item)
+    _ADDON_KEYMAPS.clear()
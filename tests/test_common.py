@@ -126,6 +126,55 @@ def test_preview_response_lines_returns_full_content_when_expanded():
     assert needs_toggle is True
 
 
+def test_preview_response_lines_reuses_rendered_lines_until_invalidated():
+    common._invalidate_rendered_lines()
+    text = "## Title\n" + "word " * 60
+
+    with mock.patch.object(common, "_response_lines", wraps=common._response_lines) as render:
+        lines, needs_toggle = common._preview_response_lines(text, width=40, max_lines=2)
+        expected = list(lines)
+        lines.append("mutated")
+        assert common._preview_response_lines(text, width=40, max_lines=2) == (expected, needs_toggle)
+        common._preview_response_lines(text, width=40, max_lines=2, expanded=True)
+        assert render.call_count == 2
+
+        common._invalidate_rendered_lines()
+        common._preview_response_lines(text, width=40, max_lines=2)
+        assert render.call_count == 3
+
+    for index in range(common._RENDERED_LINES_CACHE_SIZE + 5):
+        common._preview_response_lines(f"text {index}", width=40)
+    assert len(common._RENDERED_LINES_CACHE) == common._RENDERED_LINES_CACHE_SIZE
+
+
+def test_ui_wrap_width_follows_region_width_and_ui_scale_in_buckets():
+    def context(width, scale=1.0):
+        return SimpleNamespace(
+            region=SimpleNamespace(width=width),
+            preferences=SimpleNamespace(system=SimpleNamespace(ui_scale=scale)),
+        )
+
+    assert common._ui_wrap_width(SimpleNamespace(region=None), fallback=42) == 42
+    assert common._ui_wrap_width(context(400)) == 48
+    assert common._ui_wrap_width(context(402)) == 48
+    assert common._ui_wrap_width(context(800, scale=2.0)) == 48
+    assert common._ui_wrap_width(context(900)) == 120
+    assert common._ui_wrap_width(context(60)) == common._UI_WRAP_MIN_CHARS
+
+
+def test_wrap_ui_text_caches_lines_per_width():
+    common._invalidate_rendered_lines()
+    text = "alpha beta gamma delta " * 10
+
+    with mock.patch.object(common.textwrap, "wrap", wraps=common.textwrap.wrap) as wrap:
+        narrow = common._wrap_ui_text(text, width=20)
+        narrow.append("mutated")
+        assert common._wrap_ui_text(text, width=20) == narrow[:-1]
+        wide = common._wrap_ui_text(text, width=60)
+    assert wrap.call_count == 2
+    assert len(wide) < len(narrow) - 1
+
+
 def test_status_visual_maps_recording_error_sent_and_idle_states():
     assert common._status_visual("Anything", True) == ("Anything", "REC", True)
     assert common._status_visual("Idle (error)", False) == ("Idle (error)", "ERROR", True)
@@ -190,10 +239,10 @@ def test_build_markdown_input_includes_context_sections_in_order():
         conversation_context_text="## Previous Conversation Context\n```text\nUser: Hi\n```",
     )
 
-    assert built.startswith("## Assistant Guidance")
-    assert "## Previous Conversation Context" in built
-    assert "## Voice Transcript\nHow do I bevel an edge?" in built
-    assert "## Blender Session History (last 100 lines)" in built
+    assert "## Assistant Guidance" not in built
+    assert built.startswith("## Previous Conversation Context")
+    assert built.index("## Blender Session History (last 100 lines)") < built.index("## Voice Transcript")
+    assert built.endswith("## Voice Transcript\nHow do I bevel an edge?")
 
 
 def test_merge_tail_lines_deduplicates_and_keeps_latest_lines():
@@ -246,3 +295,108 @@ def test_conversation_preview_lines_formats_recent_entries():
         lines = common._conversation_preview_lines(scene, max_items=2)
 
     assert lines == ["You: Plain text", "Suzanne: Heading Formatted reply"]
+
+
+def test_estimate_tokens_is_zero_for_empty_text_and_grows_with_length():
+    assert common._estimate_tokens("") == 0
+    assert common._estimate_tokens("abcd") == 1
+    assert common._estimate_tokens("a" * 400) == 100
+    assert common._estimate_tokens("a b c d e f") == 8
+
+
+def test_assemble_prompt_trims_oldest_turns_and_history_to_fit_budget():
+    scene = SimpleNamespace(
+        suzanne_va_use_conversation_context=True,
+        suzanne_va_context_turns=20,
+        suzanne_va_prompt_token_budget=400,
+    )
+    conversation = {
+        "messages": [
+            {"role": "user" if index % 2 == 0 else "assistant", "text": f"Turn {index} " + "x" * 200}
+            for index in range(40)
+        ]
+    }
+    history = "\n".join(f"bpy.ops.history.line_{index}()" for index in range(100))
+
+    with mock.patch.object(common, "_get_active_conversation", return_value=(conversation, {})):
+        prompt, tokens = common._assemble_prompt(scene, "How do I bevel?", history, is_voice=False)
+
+    assert tokens == common._estimate_tokens(common._system_instructions()) + common._estimate_tokens(prompt)
+    assert tokens <= 400
+    assert "How do I bevel?" in prompt
+    assert "Turn 39" in prompt
+    assert "Turn 0 " not in prompt
+    assert "line_99()" in prompt
+    assert "line_0()" not in prompt
+
+
+def test_assemble_prompt_keeps_everything_when_budget_allows():
+    scene = SimpleNamespace(
+        suzanne_va_use_conversation_context=True,
+        suzanne_va_context_turns=2,
+        suzanne_va_prompt_token_budget=6000,
+    )
+    conversation = {"messages": [{"role": "user", "text": "Hi"}, {"role": "assistant", "text": "Hello"}]}
+
+    with mock.patch.object(common, "_get_active_conversation", return_value=(conversation, {})):
+        prompt, _tokens = common._assemble_prompt(scene, "Question", "line one\nline two", is_voice=True)
+
+    assert "Answer only about Blender" not in prompt
+    assert "User: Hi\nAssistant: Hello" in prompt
+    assert "## Voice Transcript\nQuestion" in prompt
+    assert "line one\nline two" in prompt
+
+
+def test_conversation_chain_id_requires_recent_assistant_reply_with_response_id():
+    scene = SimpleNamespace(suzanne_va_use_conversation_context=True)
+    prefs = SimpleNamespace(use_response_chaining=True)
+    fresh = common._now_iso_timestamp()
+    conversation = {
+        "messages": [
+            {"role": "user", "text": "Hi", "timestamp": fresh},
+            {"role": "assistant", "text": "Hello", "timestamp": fresh, "response_id": "resp_1"},
+        ]
+    }
+
+    with mock.patch.object(common, "_get_active_conversation", return_value=(conversation, {})):
+        assert common._conversation_chain_id(scene, prefs) == "resp_1"
+        assert common._conversation_chain_id(scene, SimpleNamespace(use_response_chaining=False)) == ""
+
+        conversation["messages"][-1]["timestamp"] = "2000-01-01T00:00:00"
+        assert common._conversation_chain_id(scene, prefs) == ""
+
+        conversation["messages"].append({"role": "user", "text": "Unanswered", "timestamp": fresh})
+        assert common._conversation_chain_id(scene, prefs) == ""
+
+    normalized = common._normalize_conversation(
+        {"id": "c1", "messages": [{"role": "assistant", "text": "Hi", "response_id": "resp_9"}]}
+    )
+    assert normalized["messages"][0]["response_id"] == "resp_9"
+
+    with mock.patch.object(common, "_post_json", return_value='{"id": "resp_2"}') as post_json:
+        common._call_chatgpt("sk-live", "gpt-4o-mini", "Next", previous_response_id="resp_1")
+    assert post_json.call_args.args[2]["previous_response_id"] == "resp_1"
+
+
+def test_response_usage_reads_cached_tokens_and_records_them_on_the_scene():
+    response = {
+        "usage": {
+            "input_tokens": 1800,
+            "input_tokens_details": {"cached_tokens": 1536},
+            "output_tokens": 210,
+        }
+    }
+    assert common._response_usage(response) == (1800, 1536, 210)
+    assert common._response_usage({}) == (0, 0, 0)
+    assert common._response_usage({"usage": {"input_tokens": 12}}) == (12, 0, 0)
+
+    scene = SimpleNamespace(suzanne_va_last_input_tokens=0, suzanne_va_last_cached_tokens=0)
+    common._record_response_usage(scene, response)
+    assert scene.suzanne_va_last_input_tokens == 1800
+    assert scene.suzanne_va_last_cached_tokens == 1536
+
+    with mock.patch.object(common, "_post_json", return_value="{}") as post_json:
+        common._call_chatgpt("sk-live", "gpt-4o-mini", "Input", instructions=common._system_instructions())
+    payload = post_json.call_args.args[2]
+    assert payload["instructions"] == common._system_instructions()
+    assert payload["input"] == "Input"
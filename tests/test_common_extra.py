@@ -1,11 +1,21 @@
+import email.message
 import json
 import os
 import pathlib
 import tempfile
+import threading
 from types import SimpleNamespace
 from unittest import mock
 
-from tests.test_support import LayoutRecorder, load_suzanne_modules, make_context, make_preferences
+import pytest
+
+from tests.test_support import (
+    LayoutRecorder,
+    load_suzanne_modules,
+    make_context,
+    make_preferences,
+    make_scene,
+)
 
 
 def test_common_text_and_ui_helpers_cover_basic_rendering_paths():
@@ -13,16 +23,45 @@ def test_common_text_and_ui_helpers_cover_basic_rendering_paths():
     common = modules.common
 
     redrawn = []
-    area_one = SimpleNamespace(tag_redraw=lambda: redrawn.append("one"))
-    area_two = SimpleNamespace(tag_redraw=lambda: redrawn.append("two"))
+
+    def region(name, region_type="UI", width=300, category="Suzanne"):
+        return SimpleNamespace(
+            type=region_type,
+            width=width,
+            active_panel_category=category,
+            tag_redraw=lambda: redrawn.append(name),
+        )
+
+    viewport = SimpleNamespace(
+        type="VIEW_3D",
+        regions=[
+            region("window", region_type="WINDOW"),
+            region("sidebar"),
+            region("hidden", width=1),
+            region("item_tab", category="Item"),
+        ],
+    )
+    image_editor = SimpleNamespace(type="IMAGE_EDITOR", tag_redraw=lambda: redrawn.append("image"))
+    preferences = SimpleNamespace(type="PREFERENCES", tag_redraw=lambda: redrawn.append("prefs"))
     common.bpy.context.window_manager.windows = [
         SimpleNamespace(screen=None),
-        SimpleNamespace(screen=SimpleNamespace(areas=[area_one, area_two])),
+        SimpleNamespace(screen=SimpleNamespace(areas=[viewport, image_editor, preferences])),
     ]
 
-    common._tag_redraw_all()
-
-    assert redrawn == ["one", "two"]
+    registered = []
+    with mock.patch.object(common.bpy.app.timers, "register", side_effect=lambda fn, **kw: registered.append(fn)):
+        with mock.patch.object(common.bpy.app.timers, "is_registered", side_effect=lambda fn: fn in registered):
+            common._request_redraw()
+            common._request_redraw(preferences=True)
+            common._request_redraw()
+    assert registered == [common._flush_redraws]
+    assert redrawn == []
+    assert common._flush_redraws() is None
+    assert redrawn == ["sidebar", "prefs"]
+
+    redrawn.clear()
+    common._tag_redraw_targets()
+    assert redrawn == ["sidebar"]
     assert common._wrap_ui_text("", width=4) == [""]
     assert common._wrap_ui_text("abcde\n\nxyz", width=4) == ["abcd", "e", "", "xyz"]
     assert common._response_lines("# Header\n**Bold**", width=20) == ["Header", "Bold"]
@@ -38,7 +77,8 @@ def test_common_text_and_ui_helpers_cover_basic_rendering_paths():
     common._draw_expand_toggle(toggle_layout, scene, "expanded")
     assert toggle_layout.calls[0][2]["text"] == "Show less"
 
-    assert "Answer only about Blender" in common._blender_only_prefix("Hello")
+    assert common._system_instructions().startswith("Answer only about Blender")
+    assert common._system_instructions() == common._system_instructions()
     assert common._tail_lines("a\nb\nc", 2) == "b\nc"
     assert common._tail_lines("a", 0) == ""
     assert "Assistant Guidance" in common._history_guidance_block()
@@ -171,12 +211,82 @@ def test_common_model_preferences_and_audio_helpers_cover_parsing_and_defaults()
     ):
         assert common._get_models_from_api("sk-live") == ["a", "z"]
 
-    with mock.patch.object(common, "_get_models_from_api", return_value=["fresh-model"]):
-        with mock.patch.object(common.time, "time", return_value=123.0):
-            common._MODELS_CACHE["ids"] = []
-            common._MODELS_CACHE["ts"] = 0.0
-            assert common._get_models_cached("sk-live", force=True) == ["fresh-model"]
-            assert common._MODELS_CACHE["ts"] == 123.0
+    class InlineThread:
+        def __init__(self, target, args=(), daemon=None):
+            self.target = target
+            self.args = args
+
+        def start(self):
+            self.target(*self.args)
+
+    prefs = make_preferences(api_key="sk-live")
+    endpoint = common._backend_endpoint(prefs, "chat")
+    openai_cache = common._models_cache(common._BACKEND_OPENAI)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = pathlib.Path(temp_dir) / "suzanne_models.json"
+        with mock.patch.object(common, "_models_cache_path", return_value=cache_path):
+            with mock.patch.object(common.threading, "Thread", InlineThread):
+                with mock.patch.object(common, "_get_models_from_api", return_value=["fresh-model", "whisper-1"]):
+                    with mock.patch.object(common.time, "time", return_value=123.0):
+                        openai_cache["ids"] = []
+                        openai_cache["ts"] = 0.0
+                        assert common._get_models_cached(endpoint, force=True) == []
+                        assert openai_cache["refreshing"] is True
+                        assert common._apply_models_refresh() is None
+                        assert common._get_models_cached(endpoint) == ["fresh-model", "whisper-1"]
+                        assert openai_cache["transcribe_ids"] == ["whisper-1"]
+                        assert openai_cache["ts"] == 123.0
+                        assert common._refresh_models_async(endpoint) is False
+                        assert common._refresh_models_async(dict(endpoint, api_key="")) is False
+            assert common._apply_models_refresh() is None
+
+            openai_cache["ids"] = []
+            assert common._load_models_cache() is True
+            assert openai_cache["ids"] == ["fresh-model", "whisper-1"]
+            with mock.patch.object(common.time, "time", return_value=123.0 + common._MODELS_CACHE_TTL_S + 1):
+                assert common._models_cache_is_stale() is True
+            cache_path.write_text("not json", encoding="utf-8")
+            assert common._load_models_cache() is False
+
+    # A keyless local server keeps its own list, and any model may transcribe
+    # when none is named like a speech model.
+    local_endpoint = common._backend_endpoint(make_preferences(chat_backend="LOCAL", api_key=""), "chat")
+    assert local_endpoint["base_url"] == "http://127.0.0.1:8000/v1"
+    assert common._endpoint_key_error(local_endpoint) == ""
+    with mock.patch.object(common, "_get_json", return_value=json.dumps({"data": [{"id": "llama-3.1-8b"}]})) as get_json:
+        common._run_models_refresh(local_endpoint)
+    get_json.assert_called_once_with("http://127.0.0.1:8000/v1/models", "")
+    with mock.patch.object(common, "_save_models_cache") as save_cache:
+        assert common._apply_models_refresh() is None
+    save_cache.assert_called_once_with(common._BACKEND_LOCAL)
+    assert common._models_cache(common._BACKEND_LOCAL)["transcribe_ids"] == ["llama-3.1-8b"]
+    assert common._transcribe_model_ids(["llama", "faster-Whisper-small"], common._BACKEND_LOCAL) == ["faster-Whisper-small"]
+    assert "llama-3.1-8b" not in common._models_cache(common._BACKEND_OPENAI)["ids"]
+
+    # A failed refresh backs off: redraws asking for the list do not start new fetches.
+    local_cache = common._models_cache(common._BACKEND_LOCAL)
+    local_cache["ids"] = []
+    with mock.patch.object(common.threading, "Thread", InlineThread), mock.patch.object(
+        common, "_set_diagnostics_message"
+    ) as set_diag:
+        with mock.patch.object(common, "_get_models_from_api", return_value=[]) as fetch:
+            with mock.patch.object(common.time, "time", return_value=1000.0):
+                assert common._refresh_models_async(local_endpoint) is True
+                assert common._apply_models_refresh() is None
+                assert local_cache["failures"] == 1
+                assert common._get_models_cached(local_endpoint) == []
+                assert common._refresh_models_async(local_endpoint) is False
+            with mock.patch.object(common.time, "time", return_value=1000.0 + common._MODELS_REFRESH_BACKOFF_S + 1):
+                assert common._refresh_models_async(local_endpoint) is True
+                assert common._apply_models_refresh() is None
+                assert local_cache["failures"] == 2
+                # The second failure waits twice as long; the Refresh button still goes through.
+                assert common._refresh_models_async(local_endpoint) is False
+                assert common._refresh_models_async(local_endpoint, force=True) is True
+                assert common._apply_models_refresh() is None
+    assert fetch.call_count == 3
+    # Background failures are only logged; the forced one is reported to Diagnostics.
+    set_diag.assert_called_once_with(mock.ANY, error="Could not refresh the OpenAI-compatible Server model list.")
 
     prefs = make_preferences(api_key="  sk-live  ")
     context = make_context(common.ADDON_MODULE, prefs=prefs)
@@ -193,8 +303,8 @@ def test_common_model_preferences_and_audio_helpers_cover_parsing_and_defaults()
 
         with mock.patch.object(
             common,
-            "_get_models_cached",
-            return_value=["base-model", "whisper-1", "custom-transcribe"],
+            "_get_transcribe_models_cached",
+            return_value=["whisper-1", "custom-transcribe"],
         ):
             assert common._transcribe_model_enum_items(None, context) == [
                 ("whisper-1", "whisper-1", ""),
@@ -261,7 +371,7 @@ def test_common_probe_storage_and_conversation_helpers_cover_disk_workflows():
     with mock.patch.object(common.platform, "system", return_value="Windows"):
         with mock.patch.object(
             common,
-            "_get_audio_devices_windows",
+            "_cached_audio_devices",
             return_value=[("default", "default", "default"), ("USB Mic", "USB Mic", "USB Mic")],
         ):
             probe_candidates = common._microphone_probe_candidates("ffmpeg", "probe.wav")
@@ -328,6 +438,16 @@ def test_common_probe_storage_and_conversation_helpers_cover_disk_workflows():
                 "Suzanne: Assistant answers",
             ]
 
+            other = common._new_conversation(scene, title_seed="Other")
+            assert common._append_conversation_exchange(
+                scene, "Queued ask", "Late answer", "text", conversation_id=created["id"]
+            ) is True
+            loaded_store = common._load_conversation_store()
+            assert len(common._find_conversation(loaded_store, created["id"])["messages"]) == 4
+            assert common._find_conversation(loaded_store, other["id"])["messages"] == []
+            assert common._delete_active_conversation(scene) is True
+            common._set_active_conversation(scene, created["id"])
+
             assert common._rename_conversation(scene, "Renamed conversation") is True
 
             scene.suzanne_va_active_conversation = ""
@@ -430,6 +550,7 @@ def test_common_http_helpers_cover_request_wrappers_and_api_shims():
                 "https://api.openai.com/v1/responses",
                 "sk-live",
                 {"model": "gpt-4o-mini", "input": "Prompt"},
+                job=None,
             )
     finally:
         if os.path.exists(audio_path):
@@ -598,7 +719,7 @@ def test_common_audio_and_preference_helpers_cover_remaining_fallback_branches()
     prefs = make_preferences()
     context = make_context(common.ADDON_MODULE, prefs=prefs)
     with mock.patch.object(common, "_get_addon_preferences", return_value=prefs):
-        with mock.patch.object(common, "_get_models_cached", return_value=["base-model"]):
+        with mock.patch.object(common, "_get_transcribe_models_cached", return_value=[]):
             assert common._transcribe_model_enum_items(None, context) == [
                 ("gpt-4o-mini-transcribe", "gpt-4o-mini-transcribe", ""),
                 ("whisper-1", "whisper-1", ""),
@@ -1075,3 +1196,631 @@ def test_common_path_and_creation_helpers_cover_remaining_success_paths():
     assert conversation["id"] == "saved123"
     assert len(store["conversations"]) == 1
     set_active.assert_called_once_with(scene, "saved123")
+
+
+def test_common_conversation_summaries_run_in_background_and_prefix_context():
+    modules = load_suzanne_modules()
+    common = modules.common
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        addon_dir = pathlib.Path(tmpdir)
+        scene = SimpleNamespace(
+            suzanne_va_active_conversation="",
+            suzanne_va_use_conversation_context=True,
+            suzanne_va_context_turns=2,
+        )
+        prefs = make_preferences(summarize_conversations=True)
+
+        class InlineThread:
+            def __init__(self, target, args, daemon):
+                self.target = target
+                self.args = args
+
+            def start(self):
+                self.target(*self.args)
+
+        with mock.patch.object(common, "_addon_dir", return_value=addon_dir):
+            with mock.patch.object(common, "_get_addon_preferences", return_value=prefs):
+                with mock.patch.object(common.threading, "Thread", InlineThread):
+                    with mock.patch.object(
+                        common,
+                        "_call_chatgpt",
+                        return_value={"output_text": "User is modelling a chair; bevel width 0.02 m."},
+                    ) as call_chatgpt:
+                        with mock.patch.object(common.bpy.app.timers, "register") as register_timer:
+                            for index in range(8):
+                                common._append_conversation_exchange(
+                                    scene, f"Question {index}", f"Answer {index}", "text"
+                                )
+
+                    assert call_chatgpt.call_count == 1
+                    assert "Question 0" in call_chatgpt.call_args.args[2]
+                    assert "Question 6" not in call_chatgpt.call_args.args[2]
+                    register_timer.assert_called_once()
+                    assert common._apply_pending_summaries() is None
+
+                    conversation, _ = common._get_active_conversation(scene)
+                    assert conversation["summary"].startswith("User is modelling a chair")
+                    assert conversation["summarized_messages"] == 12
+                    assert common._SUMMARY_JOBS["active"] == set()
+
+                    block = common._conversation_context_block(scene)
+                    assert "Summary of earlier turns: User is modelling a chair" in block
+                    assert "Question 5" not in block
+                    assert "User: Question 6" in block
+                    assert "Assistant: Answer 7" in block
+
+                    tight_block = common._conversation_context_block(scene, max_tokens=40)
+                    assert "Summary of earlier turns" not in tight_block
+                    assert "Answer 7" in tight_block
+
+                    # A summary whose last covered turn is gone keeps the previous summary and count.
+                    stale_job = {"conversation_id": conversation["id"], "anchor": ("gone", "gone")}
+                    common._SUMMARY_JOBS["results"].put((stale_job, "Stale summary."))
+                    assert common._apply_pending_summaries() is None
+                    conversation, _ = common._get_active_conversation(scene)
+                    assert conversation["summary"].startswith("User is modelling a chair")
+                    assert conversation["summarized_messages"] == 12
+
+    assert common._summary_span({"messages": [{}] * 10}, keep_messages=4) is None
+    assert common._summary_span({"messages": [{}] * 20, "summarized_messages": 2}, keep_messages=4) == (2, 16)
+    assert common._schedule_conversation_summary({"id": "c"}, make_preferences(summarize_conversations=False), 4) is False
+
+
+def test_common_context_index_ranks_relevant_exchanges_across_conversations():
+    modules = load_suzanne_modules()
+    common = modules.common
+    store = {
+        "conversations": [
+            {
+                "id": "old",
+                "messages": [
+                    {"role": "user", "text": "How do I bevel an edge?"},
+                    {"role": "assistant", "text": "Select the edge and press Ctrl+B to bevel."},
+                    {"role": "user", "text": "How do I add a light?"},
+                    {"role": "assistant", "text": "Use Shift+A and pick a light type."},
+                ],
+            },
+            {
+                "id": "active",
+                "messages": [
+                    {"role": "user", "text": "Which render engine is faster?"},
+                    {"role": "assistant", "text": "Eevee renders faster than Cycles."},
+                ],
+            },
+        ]
+    }
+
+    common._context_index_reset()
+    with mock.patch.object(common, "_load_conversation_store", return_value=store):
+        results = common._context_index_search("bevel width for the edge", limit=2)
+        assert results[0][1]["user"] == "How do I bevel an edge?"
+        assert len(results) == 1
+
+        common._context_index_add("active", "Can I change bevel segments?", "Yes, scroll the mouse wheel.")
+        assert len(common._context_index_search("bevel", limit=5)) == 2
+
+        scene = SimpleNamespace(
+            suzanne_va_use_conversation_context=True,
+            suzanne_va_context_turns=2,
+            suzanne_va_context_mode="relevant",
+        )
+        with mock.patch.object(
+            common,
+            "_get_active_conversation",
+            return_value=(store["conversations"][1], store),
+        ):
+            block = common._conversation_context_block(scene, query="How wide should the bevel be?")
+            recent_block = common._conversation_context_block(scene)
+
+    assert "User: How do I bevel an edge?" in block
+    assert "Shift+A" not in block
+    assert block.index("bevel an edge") < block.index("Which render engine is faster?")
+    assert "bevel" not in recent_block
+    common._context_index_reset()
+
+
+def test_common_search_conversations_returns_titled_hits_with_snippets():
+    modules = load_suzanne_modules()
+    common = modules.common
+    store = {
+        "conversations": [
+            {
+                "id": "chair",
+                "title": "Chair modelling",
+                "messages": [
+                    {"role": "user", "text": "Which modifier rounds corners?"},
+                    {"role": "assistant", "text": "Add a **Bevel** modifier and raise the segment count."},
+                ],
+            },
+        ]
+    }
+
+    common._context_index_reset()
+    with mock.patch.object(common, "_load_conversation_store", return_value=store):
+        hits = common._run_conversation_search("bevel segments")
+
+    assert common._SEARCH_RESULTS["query"] == "bevel segments"
+    assert hits == common._SEARCH_RESULTS["hits"]
+    assert hits[0]["conversation_id"] == "chair"
+    assert hits[0]["title"] == "Chair modelling"
+    assert hits[0]["role"] == "Suzanne"
+    assert "Bevel modifier" in hits[0]["snippet"]
+    assert common._search_conversations("   ") == []
+    assert common._search_snippet("x" * 50 + " needle " + "y" * 200, ["needle"], width=40).startswith("...")
+    common._context_index_reset()
+
+
+def test_common_transcript_pages_load_once_per_store_revision_and_follow_new_messages():
+    modules = load_suzanne_modules()
+    common = modules.common
+    messages = [
+        {"role": "user" if index % 2 == 0 else "assistant", "text": f"**Message** {index}"}
+        for index in range(45)
+    ]
+    store = {"conversations": [{"id": "conv-1", "messages": messages}]}
+    scene = make_scene(suzanne_va_active_conversation="conv-1")
+
+    with mock.patch.object(common, "_load_conversation_store", return_value=store) as load_store:
+        assert common._transcript_view(scene)[:2] == (2, 3)
+        assert common._transcript_view(scene, page=1)[0] == 1
+        page, page_count, rows = common._transcript_view(scene, page=0)
+        assert common._transcript_view(scene) == (page, page_count, rows)
+    assert load_store.call_count == 1
+
+    assert (page, page_count) == (0, 3)
+    assert [row[1] for row in rows][:2] == ["Message 0", "Message 1"]
+    assert rows[1][0] == "assistant"
+    assert sorted(common._TRANSCRIPT_CACHE["pages"]) == [0, 1]
+
+    common._STORE_REVISION["value"] += 1
+    with mock.patch.object(common, "_load_conversation_store", return_value=store) as load_store:
+        assert common._transcript_view(scene)[0] == 0
+    assert load_store.call_count == 1
+
+    # A view on the newest page follows messages added to the conversation.
+    assert common._transcript_view(scene, page=2)[0] == 2
+    messages.extend({"role": "user", "text": f"Message {index}"} for index in range(45, 61))
+    common._STORE_REVISION["value"] += 1
+    with mock.patch.object(common, "_load_conversation_store", return_value=store):
+        page, page_count, rows = common._transcript_view(scene)
+    assert (page, page_count) == (3, 4)
+    assert rows[-1][1] == "Message 60"
+    assert not hasattr(scene, "suzanne_va_transcript_rows")
+
+    empty_scene = make_scene(suzanne_va_active_conversation=common._NO_CONVERSATION_ID)
+    with mock.patch.object(common, "_load_conversation_store") as load_store:
+        assert common._transcript_view(empty_scene) == (0, 1, [])
+    load_store.assert_not_called()
+
+
+class _FakeText:
+    def __init__(self, name):
+        self.name = name
+        self.content = ""
+        self.writes = []
+
+    @property
+    def lines(self):
+        return [SimpleNamespace(body=line) for line in self.content.split("\n")]
+
+    def as_string(self):
+        return self.content
+
+    def clear(self):
+        self.content = ""
+
+    def cursor_set(self, line, character=0):
+        self.cursor = (line, character)
+
+    def write(self, text):
+        self.writes.append(text)
+        self.content += text
+
+
+class _FakeTexts(dict):
+    def new(self, name):
+        self[name] = _FakeText(name)
+        return self[name]
+
+
+def test_common_output_text_appends_growing_responses_and_renders_conversations():
+    modules = load_suzanne_modules()
+    common = modules.common
+    modules.bpy.data = SimpleNamespace(texts=_FakeTexts())
+    scene = make_scene(suzanne_va_active_conversation="conv-1")
+
+    assert common._write_output_text(scene, "Ignored") is None
+    assert common._output_text_block(create=False) is None
+
+    scene.suzanne_va_output_to_text = True
+    text_block = common._write_output_text(scene, "Step 1")
+    assert text_block.as_string() == "Step 1\n"
+    common._write_output_text(scene, "Step 1\nStep 2")
+    assert text_block.writes[-1] == "Step 2\n"
+    assert text_block.cursor == (1, 0)
+    common._write_output_text(scene, "Other")
+    assert text_block.as_string() == "Other\n"
+
+    conversation = {
+        "id": "conv-1",
+        "title": "Chair",
+        "messages": [
+            {"role": "user", "text": "How?"},
+            {"role": "assistant", "text": "Like this."},
+        ],
+    }
+    scene.suzanne_va_output_text_conversation = True
+    with mock.patch.object(common, "_get_active_conversation", return_value=(conversation, {})):
+        common._write_output_text(scene, "Like this.")
+    assert text_block.as_string() == "# Chair\n\n## You\n\nHow?\n\n## Suzanne\n\nLike this.\n"
+    del modules.bpy.data
+
+
+def test_common_conversation_changes_can_be_undone_without_scene_undo():
+    modules = load_suzanne_modules()
+    common = modules.common
+    scene = make_scene(suzanne_va_active_conversation=common._NO_CONVERSATION_ID)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store_path = pathlib.Path(temp_dir) / common._CONVERSATION_FILE_NAME
+        with mock.patch.object(common, "_conversation_store_path", return_value=store_path):
+            assert common._undo_conversation_change(scene) == (False, "Nothing to undo.")
+
+            conversation = common._new_conversation(scene, title_seed="Chair")
+            assert common._rename_conversation(scene, "Chair modelling") is True
+            assert common._delete_active_conversation(scene) is True
+            assert common._load_conversation_store()["conversations"] == []
+
+            assert common._undo_conversation_change(scene) == (True, "Undid: Delete 'Chair modelling'")
+            assert scene.suzanne_va_active_conversation == conversation["id"]
+            assert common._undo_conversation_change(scene)[0] is True
+            restored = common._find_conversation(common._load_conversation_store(), conversation["id"])
+            assert restored["title"] == conversation["title"]
+
+            restored["messages"].append({"role": "user", "text": "Hi"})
+            common._save_conversation_store({"conversations": [restored]})
+            assert common._undo_conversation_change(scene) == (
+                False,
+                "That conversation has messages now; delete it instead.",
+            )
+            assert common._CONVERSATION_HISTORY == []
+
+    for name in (
+        "SUZANNEVA_OT_microphone_press",
+        "SUZANNEVA_OT_new_conversation",
+        "SUZANNEVA_OT_rename_conversation",
+        "SUZANNEVA_OT_delete_conversation",
+    ):
+        assert "UNDO" not in getattr(modules.operators, name).bl_options
+
+
+def test_common_audio_device_registry_enumerates_in_background_with_ttl():
+    modules = load_suzanne_modules()
+    common = modules.common
+    started = []
+
+    class RecordingThread:
+        def __init__(self, target, args=(), daemon=None):
+            self.target = target
+
+        def start(self):
+            started.append(self.target)
+
+    devices = [("default", "default", "default"), ("USB Mic", "USB Mic", "USB Mic")]
+    with mock.patch.object(common.threading, "Thread", RecordingThread):
+        with mock.patch.object(common.time, "time", return_value=1000.0):
+            assert common._cached_audio_devices() == []
+            assert common._refresh_audio_devices_async(force=True) is False
+            assert len(started) == 1
+
+            with mock.patch.object(common.platform, "system", return_value="Windows"):
+                with mock.patch.object(common, "_get_audio_devices_windows", return_value=devices):
+                    started[0]()
+            assert common._AUDIO_DEVICES_CACHE["refreshing"] is False
+            assert common._cached_audio_devices() == devices
+            assert len(started) == 1
+
+        with mock.patch.object(common.time, "time", return_value=1000.0 + common._AUDIO_DEVICES_TTL_S + 1):
+            assert common._refresh_audio_devices_async() is True
+        with mock.patch.object(common, "_enumerate_audio_devices", side_effect=RuntimeError("boom")):
+            started[-1]()
+    assert common._AUDIO_DEVICES_CACHE["devices"] == []
+
+    with mock.patch.object(common.platform, "system", return_value="Plan9"):
+        assert common._enumerate_audio_devices() == [("default", "default", "default")]
+
+
+def test_common_latency_traces_record_stage_spans_and_optional_jsonl():
+    modules = load_suzanne_modules()
+    common = modules.common
+
+    with common._trace_span("ignored"):
+        pass
+    assert common._trace_end("ok") is None
+
+    common._trace_begin("text")
+    with common._trace_span("info_history"):
+        pass
+    with mock.patch.object(common, "_post_json", return_value=json.dumps({"id": "resp_1"})):
+        common._call_chatgpt("sk", "gpt-4o-mini", "hi")
+
+    # An unbound worker thread (e.g. a conversation summary) stays out of the open trace.
+    with mock.patch.object(common, "_post_json", return_value=json.dumps({"id": "resp_2"})):
+        worker = common.threading.Thread(target=common._call_chatgpt, args=("sk", "gpt-4o-mini", "sum up"))
+        worker.start()
+        worker.join()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        trace_path = pathlib.Path(temp_dir) / common._TRACE_FILE_NAME
+        with mock.patch.object(common, "_traces_path", return_value=trace_path):
+            trace = common._trace_end("ok", make_preferences(write_latency_traces=True))
+            written = [json.loads(line) for line in trace_path.read_text(encoding="utf-8").splitlines()]
+
+    assert [name for name, _ in trace["spans"]] == ["info_history", "responses_api"]
+    assert trace["status"] == "ok"
+    assert "_t0" not in trace
+    assert list(common._TRACES) == [trace]
+    assert written == [trace]
+
+    for index in range(common._TRACE_LIMIT + 3):
+        common._trace_begin("voice")
+        common._trace_end("error")
+    assert len(common._TRACES) == common._TRACE_LIMIT
+    common._TRACES.clear()
+
+
+def _http_error(common, code, **headers):
+    message = email.message.Message()
+    for name, value in headers.items():
+        message[name.replace("_", "-")] = value
+    return common.HTTPError("https://api.openai.com/v1/responses", code, "failed", message, None)
+
+
+def test_retry_hints_parse_retry_after_and_rate_limit_resets():
+    common = load_suzanne_modules().common
+
+    assert common._parse_reset_duration("6m0s") == 360.0
+    assert common._parse_reset_duration("20ms") == 0.02
+    assert common._parse_reset_duration("1.5s") == 1.5
+    assert common._parse_reset_duration("soon") is None
+
+    assert common._retry_after_seconds(_http_error(common, 429, retry_after_ms="250").headers) == 0.25
+    assert common._retry_after_seconds(_http_error(common, 429, retry_after="3").headers) == 3.0
+    exhausted = _http_error(
+        common,
+        429,
+        x_ratelimit_remaining_requests="0",
+        x_ratelimit_reset_requests="1.5s",
+        x_ratelimit_remaining_tokens="900",
+        x_ratelimit_reset_tokens="6m0s",
+    )
+    assert common._retry_after_seconds(exhausted.headers) == 1.5
+    assert common._retry_after_seconds(_http_error(common, 503).headers) is None
+
+    assert common._is_retryable_error(_http_error(common, 503)) is True
+    assert common._is_retryable_error(_http_error(common, 400)) is False
+    assert common._is_retryable_error(_http_error(common, 429, x_should_retry="false")) is False
+    assert common._is_retryable_error(common.URLError(ConnectionRefusedError())) is True
+    assert common._is_retryable_error(common.URLError("Name or service not known")) is False
+
+    # A POST is only resent when the server cannot have processed it.
+    assert common._is_retryable_error(_http_error(common, 409)) is False
+    assert common._is_retryable_error(_http_error(common, 503), idempotent=False) is False
+    assert common._is_retryable_error(_http_error(common, 503, retry_after="2"), idempotent=False) is True
+    assert common._is_retryable_error(_http_error(common, 429, retry_after_ms="250"), idempotent=False) is True
+    assert common._is_retryable_error(_http_error(common, 429), idempotent=False) is True
+    assert common._is_retryable_error(_http_error(common, 429, x_should_retry="false"), idempotent=False) is False
+    assert common._is_retryable_error(_http_error(common, 408, retry_after="2"), idempotent=False) is False
+    assert common._is_retryable_error(common.URLError(TimeoutError()), idempotent=False) is False
+    assert common._is_retryable_error(common.URLError(ConnectionResetError()), idempotent=False) is False
+    assert common._is_retryable_error(common.URLError(ConnectionRefusedError()), idempotent=False) is True
+
+    with mock.patch.object(common.random, "uniform", return_value=1.0):
+        assert common._retry_delay(3, _http_error(common, 503)) == 2.0
+        assert common._retry_delay(12, common.URLError(TimeoutError())) == common._HTTP_RETRY_MAX_S
+        assert common._retry_delay(1, _http_error(common, 429, retry_after="7")) == 7.0
+        assert common._retry_delay(1, _http_error(common, 429, retry_after="600")) == 0.5
+
+
+def test_with_retries_backs_off_records_trace_and_stops_on_permanent_errors():
+    common = load_suzanne_modules().common
+    send = mock.Mock(side_effect=[_http_error(common, 429, retry_after_ms="250"), common.URLError(TimeoutError()), "ok"])
+
+    common._trace_begin("text")
+    with mock.patch.object(common.time, "sleep") as sleep:
+        with mock.patch.object(common.random, "uniform", return_value=1.0):
+            assert common._with_retries(send) == "ok"
+    trace = common._trace_end("ok")
+
+    assert send.call_count == 3
+    assert sleep.call_args_list == [mock.call(0.25), mock.call(1.0)]
+    assert [retry["error"] for retry in trace["retries"]] == ["HTTP 429", str(TimeoutError())]
+    assert [name for name, _ in trace["spans"]] == ["retry_wait", "retry_wait"]
+
+    rejected = mock.Mock(side_effect=_http_error(common, 400))
+    with mock.patch.object(common.time, "sleep") as sleep:
+        with pytest.raises(common.HTTPError):
+            common._with_retries(rejected)
+    assert rejected.call_count == 1
+    sleep.assert_not_called()
+
+    failing = mock.Mock(side_effect=_http_error(common, 503))
+    with mock.patch.object(common.time, "sleep"):
+        with pytest.raises(common.HTTPError):
+            common._with_retries(failing)
+    assert failing.call_count == common._HTTP_RETRY_ATTEMPTS
+
+    timed_out = mock.Mock(side_effect=common.URLError(TimeoutError()))
+    with mock.patch.object(common.time, "sleep") as sleep:
+        with pytest.raises(common.URLError):
+            common._with_retries(timed_out, idempotent=False)
+    assert timed_out.call_count == 1
+    sleep.assert_not_called()
+
+
+def test_transcription_and_model_lists_are_retried_like_idempotent_requests():
+    common = load_suzanne_modules().common
+    audio_path = os.path.join(tempfile.mkdtemp(), "clip.wav")
+    common._write_silence_wav(audio_path)
+    dropped = common.URLError(ConnectionResetError())
+
+    with mock.patch.object(common, "_open_paced", side_effect=[dropped, '{"text": "Hi"}']) as open_paced:
+        with mock.patch.object(common.time, "sleep"):
+            assert common._transcribe_audio("sk-live", "whisper-1", audio_path) == {"text": "Hi"}
+    assert open_paced.call_count == 2
+
+    with mock.patch.object(common, "_open_paced", side_effect=[_http_error(common, 503), '{"data": []}']) as open_paced:
+        with mock.patch.object(common.time, "sleep"):
+            assert common._get_json("https://example.com/models", "sk-live") == '{"data": []}'
+    assert open_paced.call_count == 2
+
+    # The main thread never sleeps between attempts.
+    with mock.patch.object(common, "_open_paced", side_effect=_http_error(common, 503)) as open_paced:
+        with pytest.raises(common.HTTPError):
+            common._get_json("https://example.com/models", "sk-live", wait=False)
+    assert open_paced.call_count == 1
+
+
+def test_with_retries_reports_attempts_and_honours_cancellation():
+    common = load_suzanne_modules().common
+    job = {"cancel": common.threading.Event(), "on_retry": mock.Mock()}
+    job["on_retry"].side_effect = lambda attempt, delay, exc: job["cancel"].set()
+    send = mock.Mock(side_effect=_http_error(common, 502))
+
+    with pytest.raises(common._RequestCancelled):
+        common._with_retries(send, job=job)
+
+    assert send.call_count == 1
+    attempt, delay, exc = job["on_retry"].call_args.args
+    assert attempt == 2
+    assert 0 < delay <= common._HTTP_RETRY_BASE_S
+    assert exc.code == 502
+
+
+def test_rate_limiter_learns_from_headers_and_queues_bursts():
+    common = load_suzanne_modules().common
+    url = "https://api.openai.com/v1/responses"
+    assert common._reserve_rate_limit(url, tokens=500) == 0.0
+
+    headers = _http_error(
+        common,
+        200,
+        x_ratelimit_limit_requests="60",
+        x_ratelimit_remaining_requests="1",
+        x_ratelimit_reset_requests="59s",
+        x_ratelimit_limit_tokens="1000",
+        x_ratelimit_remaining_tokens="1000",
+        x_ratelimit_reset_tokens="0s",
+    ).headers
+    with mock.patch.object(common.time, "monotonic", return_value=100.0):
+        common._update_rate_limits(url, headers)
+        buckets = common._RATE_LIMITS["buckets"]["https://api.openai.com"]
+        assert buckets["requests"]["rate"] == 1.0
+        assert buckets["tokens"]["rate"] == 1000 / 60.0
+
+        assert common._reserve_rate_limit(url, tokens=400) == 0.0
+        # The second and third callers overdraw the request bucket and queue one refill apart.
+        assert common._reserve_rate_limit(url, tokens=400) == 1.0
+        assert common._reserve_rate_limit(url) == 2.0
+    with mock.patch.object(common.time, "monotonic", return_value=103.0):
+        assert common._reserve_rate_limit(url) == 0.0
+
+    job = {"cancel": common.threading.Event(), "on_throttle": mock.Mock()}
+    job["cancel"].set()
+    common._update_rate_limits(url, headers)
+    common._reserve_rate_limit(url)
+    with pytest.raises(common._RequestCancelled):
+        common._pace_request(url, job=job)
+    assert 0 < job["on_throttle"].call_args.args[0] <= common._RATE_LIMIT_MAX_WAIT_S
+
+
+def test_rate_limiter_keeps_in_flight_reservations_and_never_waits_on_the_main_thread():
+    common = load_suzanne_modules().common
+    url = "https://api.openai.com/v1/models"
+    headers = _http_error(
+        common,
+        200,
+        x_ratelimit_limit_requests="60",
+        x_ratelimit_remaining_requests="10",
+        x_ratelimit_reset_requests="50s",
+    ).headers
+    common._update_rate_limits(url, headers)
+    buckets = common._RATE_LIMITS["buckets"]["https://api.openai.com"]
+
+    # Three requests are in flight; the first reply's headers only count its own.
+    with mock.patch.object(common.time, "monotonic", return_value=100.0):
+        for _ in range(3):
+            common._pace_request(url)
+        common._update_rate_limits(url, headers, reserved={"requests": 1, "tokens": 0})
+        assert buckets["requests"]["available"] == 8
+    common._release_rate_limit(url, {"requests": 1, "tokens": 0})
+    assert common._RATE_LIMITS["in_flight"]["https://api.openai.com"]["requests"] == 2
+
+    buckets["requests"]["available"] = -5
+    with mock.patch.object(common.time, "sleep") as sleep:
+        common._pace_request(url, wait=False)
+    sleep.assert_not_called()
+
+    # Cancelling during the pacing wait gives the reservation back.
+    common._release_rate_limit(url, {"requests": 3, "tokens": 0})
+    cancel = threading.Event()
+    cancel.set()
+    buckets["requests"].update(available=-5, ts=100.0)
+    with mock.patch.object(common.time, "monotonic", return_value=100.0):
+        with mock.patch.object(common, "_urlopen_for_job") as urlopen:
+            with pytest.raises(common._RequestCancelled):
+                common._open_paced(common.Request(url, method="GET"), 30, job={"cancel": cancel})
+    urlopen.assert_not_called()
+    assert common._RATE_LIMITS["in_flight"]["https://api.openai.com"]["requests"] == 0
+
+
+def test_speculation_helpers_pick_stable_partials_and_match_transcripts():
+    common = load_suzanne_modules().common
+
+    assert common._transcription_streams("gpt-4o-mini-transcribe")
+    assert not common._transcription_streams("whisper-1")
+
+    assert common._stable_partial_transcript("Add a bevel") == ""
+    assert common._stable_partial_transcript("Bevel it. Then") == ""
+    assert common._stable_partial_transcript("Add a bevel modifier. Then app") == "Add a bevel modifier."
+    assert common._stable_partial_transcript("How do I bevel? And") == "How do I bevel?"
+
+    assert common._transcripts_match("Add a bevel modifier.", "add a bevel modifier")
+    assert common._transcripts_match(
+        "Add a bevel modifier to the selected object with three segments.",
+        "Add a bevel modifier to the selected object with three segments please.",
+    )
+    assert not common._transcripts_match("Add a bevel modifier.", "Add a bevel modifier. Then apply it.")
+    assert not common._transcripts_match(
+        "Do apply the bevel modifier to the selected object right now.",
+        "Don't apply the bevel modifier to the selected object right now.",
+    )
+    assert not common._transcripts_match("Please.", "")
+
+    partials = []
+    on_line, state = common._transcript_stream_reader(partials.append)
+    for line in (
+        "event: transcript.text.delta",
+        'data: {"type": "transcript.text.delta", "delta": "Add"}',
+        'data: {"type": "transcript.text.delta", "delta": " a bevel."}',
+        "data: not json",
+        'data: {"type": "transcript.text.done", "text": "Add a bevel."}',
+    ):
+        on_line(line)
+    assert partials == ["Add", "Add a bevel."]
+    assert state["text"] == "Add a bevel."
+
+    # A server that ignores stream=true answers with plain JSON, which is parsed as usual.
+    def post_plain_json(_url, _api_key, _fields, _files, job=None, stream_reader=None, idempotent=False):
+        body = '{"text": "Add a bevel."}'
+        on_line = stream_reader()
+        on_line(body)
+        return body
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        audio_path = str(pathlib.Path(temp_dir) / "silence.wav")
+        common._write_silence_wav(audio_path)
+        with mock.patch.object(common, "_post_multipart", side_effect=post_plain_json):
+            result = common._transcribe_audio("sk-live", "gpt-4o-mini-transcribe", audio_path, on_partial=partials.append)
+    assert result == {"text": "Add a bevel."}
@@ -44,18 +44,29 @@ def test_addon_register_registers_classes_and_runs_setup_hooks():
                 side_effect=lambda: events.append(("ensure_props", None)),
             ):
                 with mock.patch.object(
+                    modules.package,
+                    "register_keymaps",
+                    side_effect=lambda: events.append(("register_keymaps", None)),
+                ), mock.patch.object(
                     modules.package,
                     "_ensure_recordings_dir",
                     side_effect=lambda: events.append(("ensure_recordings_dir", None)),
                 ):
-                    modules.package.register()
+                    with mock.patch.object(
+                        modules.package,
+                        "_refresh_audio_devices_async",
+                        side_effect=lambda force: events.append(("refresh_audio_devices", force)),
+                    ):
+                        modules.package.register()
 
     assert events == [
         ("register", classes[0]),
         ("register", classes[1]),
         ("register", classes[2]),
         ("ensure_props", None),
+        ("register_keymaps", None),
         ("ensure_recordings_dir", None),
+        ("refresh_audio_devices", True),
     ]
 
 
@@ -66,6 +77,10 @@ def test_addon_unregister_clears_props_then_unregisters_in_reverse_order():
 
     with mock.patch.object(modules.package, "classes", classes):
         with mock.patch.object(
+            modules.package,
+            "unregister_keymaps",
+            side_effect=lambda: events.append(("unregister_keymaps", None)),
+        ), mock.patch.object(
             modules.package,
             "clear_props",
             side_effect=lambda: events.append(("clear_props", None)),
@@ -78,6 +93,7 @@ def test_addon_unregister_clears_props_then_unregisters_in_reverse_order():
                 modules.package.unregister()
 
     assert events == [
+        ("unregister_keymaps", None),
         ("clear_props", None),
         ("unregister", classes[2]),
         ("unregister", classes[1]),
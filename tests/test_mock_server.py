@@ -0,0 +1,208 @@
+import json
+import os
+import pathlib
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import mock
+from urllib.request import Request, urlopen
+
+import pytest
+
+from benchmarks.mock_openai_server import MockOpenAIServer
+from tests.test_support import load_suzanne_modules, make_preferences
+
+
+def test_api_base_url_prefers_preference_then_environment_then_default():
+    common = load_suzanne_modules().common
+
+    with mock.patch.dict(os.environ, {common._API_BASE_URL_ENV: ""}):
+        assert common._api_base_url(make_preferences()) == "https://api.openai.com/v1"
+        assert common._api_url("/models", prefs=make_preferences()) == "https://api.openai.com/v1/models"
+
+    with mock.patch.dict(os.environ, {common._API_BASE_URL_ENV: "http://127.0.0.1:9000/v1/"}):
+        assert common._api_base_url(make_preferences()) == "http://127.0.0.1:9000/v1"
+        prefs = make_preferences(api_base_url=" http://lan-box:8080/v1/ ")
+        assert common._api_base_url(prefs) == "http://lan-box:8080/v1"
+        assert common._api_url("responses", base_url="http://explicit/v1/", prefs=prefs) == "http://explicit/v1/responses"
+
+
+def test_client_helpers_round_trip_through_mock_server():
+    common = load_suzanne_modules().common
+
+    with MockOpenAIServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+        prefs = make_preferences(api_base_url=server.base_url)
+        common.bpy.context.preferences.addons = {common.ADDON_MODULE: SimpleNamespace(preferences=prefs)}
+
+        assert "gpt-4o-mini" in common._get_models_from_api("sk-mock")
+
+        audio_path = str(pathlib.Path(temp_dir) / "silence.wav")
+        common._write_silence_wav(audio_path)
+        assert common._transcribe_audio("sk-mock", "whisper-1", audio_path)["text"] == server.config["transcript"]
+
+        first = common._call_chatgpt("sk-mock", "gpt-4o-mini", "Bevel?", instructions="Be brief.")
+        assert common._response_output_text(first) == server.config["response_text"]
+        assert common._response_usage(first)[0] > 0
+
+        chained = common._call_chatgpt("sk-mock", "gpt-4o-mini", "More?", previous_response_id=first["id"])
+        assert chained["previous_response_id"] == first["id"]
+
+        with pytest.raises(common.HTTPError) as missing:
+            common._call_chatgpt("sk-mock", "gpt-4o-mini", "More?", previous_response_id="resp_gone")
+        assert common._is_missing_chain_error(missing.value)
+
+        with pytest.raises(common.HTTPError) as unauthorized:
+            common._get_json(common._api_url("models"), "")
+        assert unauthorized.value.code == 401
+
+    assert server.stats["/v1/responses 200"] == 2
+
+
+def test_mock_server_injects_errors_and_rate_limits():
+    common = load_suzanne_modules().common
+
+    with MockOpenAIServer(rate_limit_rpm=2) as server:
+        url = common._api_url("models", base_url=server.base_url)
+        common._get_json(url, "sk-mock")
+        common._get_json(url, "sk-mock")
+        # The client-side limiter would now hold the next request; bypass it to see the server's 429.
+        assert 0 < common._reserve_rate_limit(url) <= 30.0
+        common._RATE_LIMITS["buckets"].clear()
+        # wait=False makes a single attempt, so the 429 surfaces instead of being retried.
+        with pytest.raises(common.HTTPError) as limited:
+            common._get_json(url, "sk-mock", wait=False)
+        assert limited.value.code == 429
+        assert int(limited.value.headers["retry-after"]) >= 1
+        assert limited.value.headers["x-ratelimit-limit-requests"] == "2"
+        assert limited.value.headers["x-ratelimit-remaining-requests"] == "0"
+
+        server.config.update(error_rate=1.0, error_status=503)
+        server.request_bucket = None
+        common._RATE_LIMITS["buckets"].clear()
+        with pytest.raises(common.HTTPError) as failed:
+            common._get_json(url, "sk-mock", wait=False)
+        assert failed.value.code == 503
+        assert "Injected" in json.loads(common._read_http_error_body(failed.value))["error"]["message"]
+
+        # From a worker, the GET is retried like any idempotent request.
+        with mock.patch.object(common.time, "sleep") as sleep:
+            with pytest.raises(common.HTTPError):
+                common._get_json(url, "sk-mock")
+        assert sleep.call_count >= common._HTTP_RETRY_ATTEMPTS - 1
+
+
+def test_mock_server_streams_responses_as_server_sent_events():
+    with MockOpenAIServer() as server:
+        request = Request(
+            f"{server.base_url}/responses",
+            data=json.dumps({"model": "gpt-4o-mini", "input": "Hi", "stream": True}).encode("utf-8"),
+            headers={"Authorization": "Bearer sk-mock", "Content-Type": "application/json"},
+            method="POST",
+        )
+        with urlopen(request, timeout=10) as response:
+            assert response.headers["Content-Type"] == "text/event-stream"
+            events = [
+                json.loads(line[len("data: "):])
+                for line in response.read().decode("utf-8").splitlines()
+                if line.startswith("data: ")
+            ]
+
+    types = [event["type"] for event in events]
+    assert types[0] == "response.created"
+    assert types[-1] == "response.completed"
+    deltas = "".join(event["delta"] for event in events if event["type"] == "response.output_text.delta")
+    assert deltas == server.config["response_text"]
+    assert [event["sequence_number"] for event in events] == list(range(len(events)))
+
+
+def test_streamed_transcription_reports_partials_through_mock_server():
+    common = load_suzanne_modules().common
+    partials = []
+
+    with MockOpenAIServer() as server, tempfile.TemporaryDirectory() as temp_dir:
+        audio_path = str(pathlib.Path(temp_dir) / "silence.wav")
+        common._write_silence_wav(audio_path)
+        result = common._transcribe_audio(
+            "sk-mock",
+            "gpt-4o-mini-transcribe",
+            audio_path,
+            base_url=server.base_url,
+            on_partial=partials.append,
+        )
+
+    transcript = server.config["transcript"]
+    assert result == {"text": transcript}
+    assert partials[0] == transcript.split(" ")[0]
+    assert partials[-1] == transcript
+    assert len(partials) == len(transcript.split(" "))
+    assert server.stats["/v1/audio/transcriptions 200 stream"] == 1
+
+
+def test_keyless_local_backend_talks_to_server_without_auth_header():
+    common = load_suzanne_modules().common
+
+    with MockOpenAIServer(require_auth=False) as server:
+        prefs = make_preferences(
+            api_key="",
+            chat_backend="LOCAL",
+            transcription_backend="OPENAI",
+            local_base_url=server.base_url,
+        )
+        chat = common._backend_endpoint(prefs, "chat")
+        transcription = common._backend_endpoint(prefs, "transcription")
+        assert common._endpoint_key_error(chat) == ""
+        assert common._endpoint_key_error(transcription) == "Missing OpenAI API key in add-on preferences."
+        assert "Authorization" not in common._build_openai_headers(chat["api_key"])
+
+        assert "whisper-1" in common._get_models_from_api("", base_url=chat["base_url"], require_key=False)
+        response = common._call_chatgpt(chat["api_key"], "llama-3.1-8b", "Hi", base_url=chat["base_url"])
+        assert response["model"] == "llama-3.1-8b"
+
+
+def test_rate_limiter_paces_requests_from_server_headers():
+    common = load_suzanne_modules().common
+
+    with MockOpenAIServer(rate_limit_rpm=600) as server:
+        url = common._api_url("models", base_url=server.base_url)
+        common._get_json(url, "sk-mock")
+        bucket = common._RATE_LIMITS["buckets"][common._rate_limit_key(url)]["requests"]
+        assert bucket["limit"] == 600
+        assert bucket["available"] == 599
+
+        # Drain the local bucket: the next request waits roughly one refill interval (0.1 s) instead of failing.
+        bucket["available"] = 0
+        with mock.patch.object(common.time, "sleep") as sleep:
+            common._get_json(url, "sk-mock")
+        # The server thread sleeps too (injected latency), so look for the limiter's wait among the calls.
+        assert any(0 < call.args[0] <= 0.2 for call in sleep.call_args_list)
+
+    assert server.stats["/v1/models 200"] == 2
+
+
+def test_cancel_closes_the_socket_of_a_slow_request():
+    common = load_suzanne_modules().common
+    job = {"cancel": common.threading.Event()}
+    outcome = {}
+
+    def send():
+        try:
+            common._call_chatgpt("sk-mock", "gpt-4o-mini", "Slow?", base_url=server.base_url, job=job)
+        except common._RequestCancelled:
+            outcome["cancelled"] = True
+
+    with MockOpenAIServer(latency_ms=5000) as server:
+        worker = common.threading.Thread(target=send, daemon=True)
+        started = time.monotonic()
+        worker.start()
+        deadline = started + 2.0
+        while "connection" not in job and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        job["cancel"].set()
+        common._cancel_request_connection(job)
+        worker.join(timeout=2.0)
+        elapsed = time.monotonic() - started
+
+    assert outcome == {"cancelled": True}
+    assert elapsed < 2.5
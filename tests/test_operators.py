@@ -7,6 +7,40 @@ from unittest import mock
 from tests.test_support import load_suzanne_modules, make_context, make_preferences, make_scene
 
 
+class InlineThread:
+    def __init__(self, target, args=(), daemon=None):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+def run_request_inline(modules, start):
+    # Request workers run synchronously; one timer tick then applies their results.
+    with mock.patch.object(modules.operators.threading, "Thread", InlineThread):
+        result = start()
+        modules.operators._apply_request_results()
+    return result
+
+
+def run_request_ticks(modules, start):
+    # Like run_request_inline, but a worker only runs after the timer tick that
+    # follows its start, so workers and main-thread ticks interleave as in Blender.
+    pending = []
+
+    class QueuedThread(InlineThread):
+        def start(self):
+            pending.append(self)
+
+    with mock.patch.object(modules.operators.threading, "Thread", QueuedThread):
+        result = start()
+        while pending:
+            InlineThread.start(pending.pop(0))
+            modules.operators._apply_request_results()
+    return result
+
+
 def test_send_message_execute_rejects_blank_prompt():
     modules = load_suzanne_modules()
     context = make_context(modules.common.ADDON_MODULE, scene=make_scene(suzanne_va_prompt="   "))
@@ -31,38 +65,53 @@ def test_send_message_execute_updates_scene_and_saves_history_on_success():
     with mock.patch.object(modules.operators, "_get_info_history_lines", return_value="INFO LOG"):
         with mock.patch.object(
             modules.operators,
-            "_conversation_context_block",
-            return_value="## Previous Conversation Context",
-        ):
-            with mock.patch.object(modules.operators, "_build_markdown_input", return_value="BUILT"):
-                with mock.patch.object(
-                    modules.operators,
-                    "_blender_only_prefix",
-                    side_effect=lambda text: f"PREFIX::{text}",
-                ):
-                    with mock.patch.object(
-                        modules.operators,
-                        "_call_chatgpt",
-                        return_value={"output_text": "Use the bevel tool."},
-                    ) as call_chatgpt:
-                        with mock.patch.object(modules.operators, "_append_conversation_exchange") as append_exchange:
-                            with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
-                                result = operator.execute(context)
+            "_assemble_prompt",
+            return_value=("PREFIX::BUILT", 42),
+        ) as assemble_prompt:
+            with mock.patch.object(
+                modules.operators,
+                "_call_chatgpt",
+                return_value={"output_text": "Use the bevel tool."},
+            ) as call_chatgpt:
+                with mock.patch.object(modules.operators, "_append_conversation_exchange") as append_exchange:
+                    with mock.patch.object(modules.operators, "_request_redraw") as redraw:
+                        result = run_request_inline(modules, lambda: operator.execute(context))
 
     assert result == {"FINISHED"}
     assert scene.suzanne_va_status == "Idle (sent)"
-    assert scene.suzanne_va_last_info_history == "INFO LOG"
-    assert scene.suzanne_va_last_transcript == "How do I bevel an edge?"
-    assert scene.suzanne_va_last_response == "Use the bevel tool."
+    assert modules.common._runtime_text(scene, "last_info_history") == "INFO LOG"
+    assert modules.common._runtime_text(scene, "last_transcript") == "How do I bevel an edge?"
+    assert modules.common._runtime_text(scene, "last_response") == "Use the bevel tool."
     assert scene.suzanne_va_expand_transcript is False
     assert scene.suzanne_va_expand_response is False
+    assert scene.suzanne_va_last_prompt_tokens == 42
     assert redraw.call_count == 2
-    call_chatgpt.assert_called_once_with("sk-test", "gpt-4o-mini", "PREFIX::BUILT")
+    assert modules.common._TRACES[-1]["kind"] == "text"
+    assert modules.common._TRACES[-1]["status"] == "ok"
+    assemble_prompt.assert_called_once_with(
+        scene,
+        "How do I bevel an edge?",
+        "INFO LOG",
+        is_voice=False,
+        include_conversation=True,
+        conversation={},
+    )
+    call_chatgpt.assert_called_once_with(
+        "sk-test",
+        "gpt-4o-mini",
+        "PREFIX::BUILT",
+        previous_response_id="",
+        instructions=modules.operators._system_instructions(),
+        base_url="https://api.openai.com/v1",
+        job=mock.ANY,
+    )
     append_exchange.assert_called_once_with(
         scene,
         "How do I bevel an edge?",
         "Use the bevel tool.",
         source="text",
+        response_id="",
+        conversation_id="",
     )
 
 
@@ -72,21 +121,20 @@ def test_send_message_execute_handles_network_failure():
     context = make_context(modules.common.ADDON_MODULE, scene=scene, prefs=make_preferences())
     operator = modules.operators.SUZANNEVA_OT_send_message()
 
-    with mock.patch.object(modules.operators, "_conversation_context_block", return_value=""):
-        with mock.patch.object(modules.operators, "_build_markdown_input", return_value="BUILT"):
-            with mock.patch.object(modules.operators, "_blender_only_prefix", return_value="PREFIX::BUILT"):
-                with mock.patch.object(
-                    modules.operators,
-                    "_call_chatgpt",
-                    side_effect=modules.operators.URLError("offline"),
-                ):
-                    with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
-                        result = operator.execute(context)
+    with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("PREFIX::BUILT", 3)):
+        with mock.patch.object(
+            modules.operators,
+            "_call_chatgpt",
+            side_effect=modules.operators.URLError("offline"),
+        ):
+            with mock.patch.object(modules.operators, "_request_redraw") as redraw:
+                result = run_request_inline(modules, lambda: operator.execute(context))
 
-    assert result == {"CANCELLED"}
-    assert scene.suzanne_va_status == "Idle (error)"
+    assert result == {"FINISHED"}
+    assert scene.suzanne_va_status.startswith("Idle (error): Send failed")
     assert redraw.call_count == 2
-    assert "Send failed" in operator._reports[-1][1]
+    assert modules.operators._REQUEST_JOBS["jobs"] == []
+    assert modules.common._TRACES[-1]["status"] == "error"
 
 
 def test_test_api_key_execute_rejects_empty_keys():
@@ -131,7 +179,7 @@ def test_test_api_key_execute_accepts_valid_json_response():
             result = operator.execute(context)
 
     assert result == {"FINISHED"}
-    get_json.assert_called_once_with("https://api.openai.com/v1/models", "sk-live")
+    get_json.assert_called_once_with("https://api.openai.com/v1/models", "sk-live", wait=False)
     set_diag.assert_called_once_with(prefs, message="API key is valid.")
 
 
@@ -142,7 +190,7 @@ def test_microphone_press_execute_starts_recording_and_updates_status():
     operator = modules.operators.SUZANNEVA_OT_microphone_press()
 
     with mock.patch.object(operator, "_start_recording", return_value=True):
-        with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
+        with mock.patch.object(modules.operators, "_request_redraw") as redraw:
             result = operator.execute(context)
 
     assert result == {"FINISHED"}
@@ -159,7 +207,7 @@ def test_microphone_press_execute_cancels_when_recording_cannot_start():
     operator = modules.operators.SUZANNEVA_OT_microphone_press()
 
     with mock.patch.object(operator, "_start_recording", return_value=False):
-        with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
+        with mock.patch.object(modules.operators, "_request_redraw") as redraw:
             result = operator.execute(context)
 
     assert result == {"CANCELLED"}
@@ -213,7 +261,7 @@ def test_conversation_operators_delegate_to_storage_helpers():
                 "_delete_active_conversation",
                 return_value=True,
             ) as delete_conversation:
-                with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
+                with mock.patch.object(modules.operators, "_request_redraw") as redraw:
                     new_result = new_operator.execute(context)
                     rename_result = rename_operator.execute(context)
                     delete_result = delete_operator.execute(context)
@@ -236,13 +284,34 @@ def test_simple_operators_cover_refresh_and_recordings_folder_paths():
     with mock.patch.object(modules.operators, "_get_models_cached") as get_models:
         with mock.patch.object(modules.operators, "_set_diagnostics_message") as set_diag:
             assert refresh_models.execute(context) == {"FINISHED"}
-    get_models.assert_called_once_with("sk-test", force=True)
-    set_diag.assert_called_once_with(prefs, message="Model list refreshed.")
+    get_models.assert_called_once_with(modules.common._backend_endpoint(prefs, "chat"), force=True)
+    assert get_models.call_args.args[0]["api_key"] == "sk-test"
+    set_diag.assert_called_once_with(prefs, message="Refreshing model list in the background...")
+
+    prefs.transcription_backend = "LOCAL"
+    with mock.patch.object(modules.operators, "_get_models_cached") as get_models:
+        assert refresh_models.execute(context) == {"FINISHED"}
+    assert [call.args[0]["backend"] for call in get_models.call_args_list] == ["OPENAI", "LOCAL"]
+
+    prefs.api_key = ""
+    with mock.patch.object(modules.operators, "_get_models_cached") as get_models:
+        assert refresh_models.execute(context) == {"CANCELLED"}
+    get_models.assert_not_called()
+    assert refresh_models._reports[-1][1] == "Missing OpenAI API key in add-on preferences."
+
+    prefs.chat_backend = "LOCAL"
+    with mock.patch.object(modules.operators, "_get_models_cached") as get_models:
+        assert refresh_models.execute(context) == {"FINISHED"}
+    assert get_models.call_args.args[0]["base_url"] == "http://127.0.0.1:8000/v1"
+    prefs.api_key = "sk-test"
+    prefs.chat_backend = prefs.transcription_backend = "OPENAI"
 
     modules.operators._AUDIO_DEVICES_CACHE["ts"] = 99.0
     modules.operators._AUDIO_DEVICES_CACHE["items"] = [("x", "x", "x")]
     refresh_devices = modules.operators.SUZANNEVA_OT_refresh_devices()
-    assert refresh_devices.execute(context) == {"FINISHED"}
+    with mock.patch.object(modules.operators, "_refresh_audio_devices_async") as refresh_async:
+        assert refresh_devices.execute(context) == {"FINISHED"}
+    refresh_async.assert_called_once_with(force=True)
     assert modules.operators._AUDIO_DEVICES_CACHE["ts"] == 0.0
     assert modules.operators._AUDIO_DEVICES_CACHE["items"] == []
 
@@ -301,7 +370,7 @@ def test_microphone_press_execute_stop_flow_covers_missing_file_and_success_send
 
     with mock.patch.object(error_operator, "_stop_recording") as stop_recording:
         with mock.patch.object(error_operator, "_wait_for_file", return_value=False):
-            with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
+            with mock.patch.object(modules.operators, "_request_redraw") as redraw:
                 assert error_operator.execute(error_context) == {"FINISHED"}
     assert stop_recording.call_count == 1
     assert error_scene.suzanne_va_mic_active is False
@@ -316,11 +385,11 @@ def test_microphone_press_execute_stop_flow_covers_missing_file_and_success_send
     with mock.patch.object(success_operator, "_stop_recording") as stop_recording:
         with mock.patch.object(success_operator, "_wait_for_file", return_value=True):
             with mock.patch.object(success_operator, "_send_to_chatgpt", return_value=(True, "")):
-                with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
+                with mock.patch.object(modules.operators, "_request_redraw") as redraw:
                     assert success_operator.execute(success_context) == {"FINISHED"}
     assert stop_recording.call_count == 1
     assert success_scene.suzanne_va_mic_active is False
-    assert success_scene.suzanne_va_status == "Idle (sent)"
+    assert success_scene.suzanne_va_status == "Transcribing..."
     assert redraw.call_count == 2
 
 
@@ -451,7 +520,7 @@ def test_microphone_start_recording_covers_platform_and_error_branches():
             with mock.patch.object(operator, "_ffmpeg_path", return_value="ffmpeg"):
                 with mock.patch.object(
                     modules.operators,
-                    "_get_audio_devices_windows",
+                    "_cached_audio_devices",
                     return_value=[("default", "default", "default"), ("USB Mic", "USB Mic", "USB Mic")],
                 ):
                     with mock.patch.object(operator, "_start_process_with_candidates", return_value=(False, "boom")) as start_proc:
@@ -487,64 +556,70 @@ def test_microphone_send_to_chatgpt_covers_failure_and_success_paths():
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as handle:
         audio_path = handle.name
     try:
+        send = lambda: operator._send_to_chatgpt(file_context, audio_path)
         with mock.patch.object(
             modules.operators,
             "_transcribe_audio",
             side_effect=modules.operators.URLError("offline"),
         ):
-            ok, message = operator._send_to_chatgpt(file_context, audio_path)
-        assert ok is False
-        assert "Transcription failed" in message
+            assert run_request_inline(modules, send) == (True, "")
+        assert "Transcription failed" in file_context.scene.suzanne_va_status
 
         with mock.patch.object(modules.operators, "_transcribe_audio", return_value={"text": ""}):
-            ok, message = operator._send_to_chatgpt(file_context, audio_path)
-        assert ok is False
-        assert message == "Transcription returned no text."
+            assert run_request_inline(modules, send) == (True, "")
+        assert file_context.scene.suzanne_va_status == "Idle (error): Transcription returned no text."
+
+        modules.operators._REQUEST_JOBS["jobs"].extend([{"state": "queued"}] * modules.common._REQUEST_QUEUE_LIMIT)
+        assert send() == (False, modules.common._REQUEST_QUEUE_FULL_MESSAGE)
+        modules.operators._REQUEST_JOBS["jobs"].clear()
 
         file_context.scene.suzanne_va_include_info_history = True
         with mock.patch.object(modules.operators, "_transcribe_audio", return_value={"text": "Hello"}):
             with mock.patch.object(modules.operators, "_get_info_history_lines", return_value=""):
-                with mock.patch.object(modules.operators, "_conversation_context_block", return_value="CONTEXT"):
-                    with mock.patch.object(modules.operators, "_build_markdown_input", return_value="BUILT"):
-                        with mock.patch.object(modules.operators, "_blender_only_prefix", side_effect=lambda text: text):
-                            with mock.patch.object(
-                                modules.operators,
-                                "_call_chatgpt",
-                                side_effect=modules.operators.URLError("down"),
-                            ):
-                                ok, message = operator._send_to_chatgpt(file_context, audio_path)
-        assert ok is False
-        assert "ChatGPT request failed" in message
+                with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("BUILT", 1)):
+                    with mock.patch.object(
+                        modules.operators,
+                        "_call_chatgpt",
+                        side_effect=modules.operators.URLError("down"),
+                    ):
+                        assert run_request_inline(modules, send) == (True, "")
+        assert "ChatGPT request failed" in file_context.scene.suzanne_va_status
 
         with mock.patch.object(modules.operators, "_transcribe_audio", return_value={"text": "Hello"}):
             with mock.patch.object(modules.operators, "_get_info_history_lines", return_value=""):
-                with mock.patch.object(modules.operators, "_conversation_context_block", return_value="CONTEXT"):
-                    with mock.patch.object(modules.operators, "_build_markdown_input", return_value="BUILT"):
-                        with mock.patch.object(modules.operators, "_blender_only_prefix", side_effect=lambda text: text):
-                            with mock.patch.object(
-                                modules.operators,
-                                "_call_chatgpt",
-                                return_value={
-                                    "output": [
-                                        {
-                                            "type": "message",
-                                            "content": [
-                                                {"type": "output_text", "text": "Hi "},
-                                                {"type": "output_text", "text": "there"},
-                                            ],
-                                        }
-                                    ]
-                                },
-                            ):
-                                with mock.patch.object(modules.operators, "_append_conversation_exchange") as append_exchange:
-                                    ok, message = operator._send_to_chatgpt(file_context, audio_path)
+                with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("BUILT", 1)):
+                    with mock.patch.object(
+                        modules.operators,
+                        "_call_chatgpt",
+                        return_value={
+                            "output": [
+                                {
+                                    "type": "message",
+                                    "content": [
+                                        {"type": "output_text", "text": "Hi "},
+                                        {"type": "output_text", "text": "there"},
+                                    ],
+                                }
+                            ]
+                        },
+                    ):
+                        with mock.patch.object(modules.operators, "_append_conversation_exchange") as append_exchange:
+                            ok, message = run_request_inline(modules, send)
         assert ok is True
         assert message == ""
-        assert file_context.scene.suzanne_va_last_info_history == "(No Info history was captured.)"
+        assert file_context.scene.suzanne_va_status == "Idle (sent)"
+        assert modules.common._runtime_text(file_context.scene, "last_info_history") == "(No Info history was captured.)"
         assert file_context.scene.suzanne_va_last_audio == audio_path
-        assert file_context.scene.suzanne_va_last_transcript == "Hello"
-        assert file_context.scene.suzanne_va_last_response == "Hi there"
-        append_exchange.assert_called_once_with(file_context.scene, "Hello", "Hi there", source="voice")
+        assert modules.common._runtime_text(file_context.scene, "last_transcript") == "Hello"
+        assert modules.common._runtime_text(file_context.scene, "last_response") == "Hi there"
+        append_exchange.assert_called_once_with(
+            file_context.scene,
+            "Hello",
+            "Hi there",
+            source="voice",
+            response_id="",
+            conversation_id=file_context.scene.suzanne_va_active_conversation,
+        )
     finally:
         if pathlib.Path(audio_path).exists():
             pathlib.Path(audio_path).unlink()
@@ -562,26 +637,24 @@ def test_send_message_and_api_key_cover_more_error_and_fallback_branches():
     scene = make_scene(suzanne_va_prompt="Hello", suzanne_va_include_info_history=False)
     context = make_context(modules.common.ADDON_MODULE, scene=scene, prefs=make_preferences(api_key="sk-live"))
     operator = modules.operators.SUZANNEVA_OT_send_message()
-    with mock.patch.object(modules.operators, "_conversation_context_block", return_value=""):
-        with mock.patch.object(modules.operators, "_build_markdown_input", return_value="BUILT"):
-            with mock.patch.object(modules.operators, "_blender_only_prefix", return_value="PREFIX"):
-                with mock.patch.object(
-                    modules.operators,
-                    "_call_chatgpt",
-                    return_value={
-                        "output": [
-                            {
-                                "type": "message",
-                                "content": [{"type": "output_text", "text": "Chunked reply"}],
-                            }
-                        ]
-                    },
-                ):
-                    with mock.patch.object(modules.operators, "_append_conversation_exchange"):
-                        with mock.patch.object(modules.operators, "_tag_redraw_all"):
-                            assert operator.execute(context) == {"FINISHED"}
-    assert scene.suzanne_va_last_info_history == ""
-    assert scene.suzanne_va_last_response == "Chunked reply"
+    with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("BUILT", 1)):
+        with mock.patch.object(
+            modules.operators,
+            "_call_chatgpt",
+            return_value={
+                "output": [
+                    {
+                        "type": "message",
+                        "content": [{"type": "output_text", "text": "Chunked reply"}],
+                    }
+                ]
+            },
+        ):
+            with mock.patch.object(modules.operators, "_append_conversation_exchange"):
+                with mock.patch.object(modules.operators, "_request_redraw"):
+                    assert run_request_inline(modules, lambda: operator.execute(context)) == {"FINISHED"}
+    assert modules.common._runtime_text(scene, "last_info_history") == ""
+    assert modules.common._runtime_text(scene, "last_response") == "Chunked reply"
 
     api_operator = modules.operators.SUZANNEVA_OT_test_api_key()
     api_context = make_context(modules.common.ADDON_MODULE, prefs=make_preferences(api_key="sk-live"))
@@ -667,7 +740,7 @@ def test_microphone_press_execute_handles_send_failure_branch():
     with mock.patch.object(operator, "_stop_recording"):
         with mock.patch.object(operator, "_wait_for_file", return_value=True):
             with mock.patch.object(operator, "_send_to_chatgpt", return_value=(False, "upload failed")):
-                with mock.patch.object(modules.operators, "_tag_redraw_all") as redraw:
+                with mock.patch.object(modules.operators, "_request_redraw") as redraw:
                     assert operator.execute(context) == {"FINISHED"}
 
     assert scene.suzanne_va_mic_active is False
@@ -703,7 +776,7 @@ def test_microphone_start_recording_covers_remaining_success_branches():
             with mock.patch.object(darwin_operator, "_atunc_path", return_value="atunc"):
                 with mock.patch.object(
                     modules.operators,
-                    "_get_audio_devices_macos",
+                    "_cached_audio_devices",
                     return_value=[("default", "default", "default"), ("7", "Built-in Mic", "Built-in Mic")],
                 ):
                     with mock.patch.object(
@@ -739,24 +812,32 @@ def test_microphone_helpers_cover_wait_loop_and_no_history_voice_send():
         audio_path = handle.name
     try:
         with mock.patch.object(modules.operators, "_transcribe_audio", return_value={"text": "Hello"}):
-            with mock.patch.object(modules.operators, "_conversation_context_block", return_value=""):
-                with mock.patch.object(modules.operators, "_build_markdown_input", return_value="BUILT"):
-                    with mock.patch.object(modules.operators, "_blender_only_prefix", side_effect=lambda text: text):
-                        with mock.patch.object(
-                            modules.operators,
-                            "_call_chatgpt",
-                            return_value={"output_text": "Hi"},
-                        ):
-                            with mock.patch.object(
-                                modules.operators,
-                                "_append_conversation_exchange",
-                            ) as append_exchange:
-                                ok, message = operator._send_to_chatgpt(context, audio_path)
+            with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("BUILT", 1)):
+                with mock.patch.object(
+                    modules.operators,
+                    "_call_chatgpt",
+                    return_value={"output_text": "Hi"},
+                ):
+                    with mock.patch.object(
+                        modules.operators,
+                        "_append_conversation_exchange",
+                    ) as append_exchange:
+                        ok, message = run_request_inline(
+                            modules,
+                            lambda: operator._send_to_chatgpt(context, audio_path),
+                        )
 
         assert ok is True
         assert message == ""
-        assert context.scene.suzanne_va_last_info_history == ""
-        append_exchange.assert_called_once_with(context.scene, "Hello", "Hi", source="voice")
+        assert modules.common._runtime_text(context.scene, "last_info_history") == ""
+        append_exchange.assert_called_once_with(
+            context.scene,
+            "Hello",
+            "Hi",
+            source="voice",
+            response_id="",
+            conversation_id="",
+        )
     finally:
         audio_file = pathlib.Path(audio_path)
         if audio_file.exists():
@@ -788,3 +869,473 @@ def test_test_transcription_execute_covers_generic_exception_and_cleanup_failure
     temp_file = pathlib.Path(removed_path["value"])
     if temp_file.exists():
         temp_file.unlink()
+
+
+def test_send_message_chains_previous_response_and_falls_back_when_chain_expired():
+    modules = load_suzanne_modules()
+    scene = make_scene(suzanne_va_prompt="And the width?")
+    prefs = make_preferences(use_response_chaining=True)
+    context = make_context(modules.common.ADDON_MODULE, scene=scene, prefs=prefs)
+    operator = modules.operators.SUZANNEVA_OT_send_message()
+
+    with mock.patch.object(modules.operators, "_conversation_chain_id", return_value="resp_prev"):
+        with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("TURN", 5)) as assemble_prompt:
+            with mock.patch.object(
+                modules.operators,
+                "_call_chatgpt",
+                return_value={"id": "resp_next", "output_text": "Use Width."},
+            ) as call_chatgpt:
+                with mock.patch.object(modules.operators, "_append_conversation_exchange") as append_exchange:
+                    with mock.patch.object(modules.operators, "_request_redraw"):
+                        assert run_request_inline(modules, lambda: operator.execute(context)) == {"FINISHED"}
+
+    assert assemble_prompt.call_args.kwargs["include_conversation"] is False
+    call_chatgpt.assert_called_once_with(
+        "sk-test",
+        "gpt-4o-mini",
+        "TURN",
+        previous_response_id="resp_prev",
+        instructions=modules.operators._system_instructions(),
+        base_url="https://api.openai.com/v1",
+        job=mock.ANY,
+    )
+    assert append_exchange.call_args.kwargs["response_id"] == "resp_next"
+
+    expired = modules.operators.HTTPError("https://api.openai.com/v1/responses", 404, "gone", None, None)
+    scene.suzanne_va_prompt = "Again?"
+    with mock.patch.object(modules.operators, "_conversation_chain_id", return_value="resp_old"):
+        with mock.patch.object(
+            modules.operators,
+            "_assemble_prompt",
+            side_effect=[("TURN", 5), ("FULL", 50)],
+        ) as assemble_prompt:
+            with mock.patch.object(
+                modules.operators,
+                "_call_chatgpt",
+                side_effect=[expired, {"id": "resp_new", "output_text": "Sure."}],
+            ) as call_chatgpt:
+                with mock.patch.object(modules.operators, "_append_conversation_exchange"):
+                    with mock.patch.object(modules.operators, "_request_redraw"):
+                        assert run_request_inline(modules, lambda: operator.execute(context)) == {"FINISHED"}
+
+    assert assemble_prompt.call_args_list[1].kwargs.get("include_conversation", True) is True
+    assert call_chatgpt.call_args_list[1] == mock.call(
+        "sk-test",
+        "gpt-4o-mini",
+        "FULL",
+        previous_response_id="",
+        instructions=modules.operators._system_instructions(),
+        base_url="https://api.openai.com/v1",
+        job=mock.ANY,
+    )
+    assert scene.suzanne_va_last_prompt_tokens == 50
+    assert modules.common._runtime_text(scene, "last_response") == "Sure."
+
+
+def test_search_operators_rank_hits_and_jump_to_conversation():
+    modules = load_suzanne_modules()
+    scene = make_scene(suzanne_va_search_query="bevel", suzanne_va_show_conversation=False)
+    context = make_context(modules.common.ADDON_MODULE, scene=scene)
+    hits = [{"conversation_id": "conv-2", "title": "Chair", "role": "You", "snippet": "bevel", "score": 1.0}]
+
+    search = modules.operators.SUZANNEVA_OT_search_conversations()
+    with mock.patch.object(modules.common, "_search_conversations", return_value=hits) as search_helper:
+        with mock.patch.object(modules.operators, "_request_redraw"):
+            assert search.execute(context) == {"FINISHED"}
+    search_helper.assert_called_once_with("bevel")
+    assert modules.operators._SEARCH_RESULTS["query"] == "bevel"
+    assert modules.operators._SEARCH_RESULTS["hits"] == hits
+    assert search._reports[-1][1].startswith("1 match(es) in ")
+
+    open_hit = modules.operators.SUZANNEVA_OT_open_search_hit()
+    open_hit.conversation_id = "conv-2"
+    store = {"conversations": [{"id": "conv-2"}]}
+    with mock.patch.object(modules.operators, "_load_conversation_store", return_value=store):
+        with mock.patch.object(modules.operators, "_request_redraw"):
+            assert open_hit.execute(context) == {"FINISHED"}
+    assert scene.suzanne_va_active_conversation == "conv-2"
+    assert scene.suzanne_va_show_conversation is True
+
+    open_hit.conversation_id = "gone"
+    with mock.patch.object(modules.operators, "_load_conversation_store", return_value=store):
+        assert open_hit.execute(context) == {"CANCELLED"}
+
+    scene.suzanne_va_search_query = "  "
+    with mock.patch.object(modules.operators, "_request_redraw"):
+        assert search.execute(context) == {"CANCELLED"}
+    assert modules.operators._SEARCH_RESULTS["hits"] == []
+
+
+def test_transcript_page_operator_clamps_and_loads_requested_page():
+    modules = load_suzanne_modules()
+    scene = make_scene(suzanne_va_active_conversation="conv-1")
+    context = make_context(modules.common.ADDON_MODULE, scene=scene)
+    operator = modules.operators.SUZANNEVA_OT_transcript_page()
+    pages = []
+
+    def transcript_view(_scene, page=None):
+        if page is not None:
+            pages.append(page)
+        return (1, 3, [])
+
+    with mock.patch.object(modules.operators, "_transcript_view", side_effect=transcript_view):
+        with mock.patch.object(modules.operators, "_request_redraw"):
+            for direction in ("FIRST", "PREVIOUS", "NEXT", "LAST"):
+                operator.direction = direction
+                assert operator.execute(context) == {"FINISHED"}
+
+    assert pages == [0, 0, 2, 2]
+
+
+def test_open_output_text_reuses_text_editor_or_opens_a_window():
+    modules = load_suzanne_modules()
+    operator = modules.operators.SUZANNEVA_OT_open_output_text()
+    context = make_context(modules.common.ADDON_MODULE)
+    text_block = object()
+
+    with mock.patch.object(modules.operators, "_output_text_block", return_value=None):
+        assert operator.execute(context) == {"CANCELLED"}
+
+    editor = SimpleNamespace(type="TEXT_EDITOR", spaces=SimpleNamespace(active=SimpleNamespace(text=None)))
+    editor.tag_redraw = mock.Mock()
+    viewport = SimpleNamespace(type="VIEW_3D")
+    context.window_manager.windows = [SimpleNamespace(screen=SimpleNamespace(areas=[viewport, editor]))]
+    with mock.patch.object(modules.operators, "_output_text_block", return_value=text_block):
+        assert operator.execute(context) == {"FINISHED"}
+    assert editor.spaces.active.text is text_block
+
+    new_area = SimpleNamespace(type="VIEW_3D", spaces=SimpleNamespace(active=SimpleNamespace(text=None)))
+    context.window_manager.windows = [SimpleNamespace(screen=SimpleNamespace(areas=[viewport]))]
+
+    def window_new():
+        context.window_manager.windows.append(SimpleNamespace(screen=SimpleNamespace(areas=[new_area])))
+
+    modules.bpy.ops.wm.window_new = window_new
+    with mock.patch.object(modules.operators, "_output_text_block", return_value=text_block):
+        assert operator.execute(context) == {"FINISHED"}
+    assert new_area.type == "TEXT_EDITOR"
+    assert new_area.spaces.active.text is text_block
+
+
+def test_undo_conversation_change_operator_reports_history_result():
+    modules = load_suzanne_modules()
+    context = make_context(modules.common.ADDON_MODULE)
+    operator = modules.operators.SUZANNEVA_OT_undo_conversation_change()
+
+    assert modules.operators.SUZANNEVA_OT_undo_conversation_change.poll(context) is False
+    modules.common._CONVERSATION_HISTORY.append({"kind": "created"})
+    assert modules.operators.SUZANNEVA_OT_undo_conversation_change.poll(context) is True
+
+    with mock.patch.object(modules.operators, "_undo_conversation_change", return_value=(True, "Undid: New")):
+        with mock.patch.object(modules.operators, "_request_redraw"):
+            assert operator.execute(context) == {"FINISHED"}
+    assert operator._reports[-1] == ({"INFO"}, "Undid: New")
+
+    with mock.patch.object(modules.operators, "_undo_conversation_change", return_value=(False, "Nothing to undo.")):
+        assert operator.execute(context) == {"CANCELLED"}
+    modules.common._CONVERSATION_HISTORY.clear()
+
+
+def test_cancel_request_operator_discards_the_late_reply():
+    modules = load_suzanne_modules()
+    scene = make_scene(suzanne_va_prompt="Slow question")
+    context = make_context(modules.common.ADDON_MODULE, scene=scene, prefs=make_preferences())
+    cancel_operator = modules.operators.SUZANNEVA_OT_cancel_request()
+    assert modules.operators.SUZANNEVA_OT_cancel_request.poll(context) is False
+    assert cancel_operator.execute(context) == {"CANCELLED"}
+
+    # The worker never runs here, so the job stays in flight until its result is queued by hand.
+    with mock.patch.object(modules.operators.threading, "Thread"):
+        with mock.patch.object(modules.operators, "_assemble_prompt", return_value=("BUILT", 2)):
+            with mock.patch.object(modules.operators, "_request_redraw"):
+                assert modules.operators.SUZANNEVA_OT_send_message().execute(context) == {"FINISHED"}
+                job = modules.operators._REQUEST_JOBS["jobs"][0]
+                connection = mock.Mock()
+                job["connection"] = connection
+                assert modules.operators.SUZANNEVA_OT_cancel_request.poll(context) is True
+                assert cancel_operator.execute(context) == {"FINISHED"}
+
+                # Cancel ends the turn at once; it does not wait for the worker.
+                assert job["cancel"].is_set()
+                connection.sock.shutdown.assert_called_once()
+                connection.close.assert_called_once_with()
+                assert scene.suzanne_va_status == "Idle (cancelled)"
+                assert modules.operators._REQUEST_JOBS["jobs"] == []
+                assert modules.common._TRACES[-1]["status"] == "cancelled"
+
+                modules.operators._REQUEST_JOBS["results"].put((job, "responded", {"output_text": "Too late"}))
+                with mock.patch.object(modules.operators, "_append_conversation_exchange") as append_exchange:
+                    assert modules.operators._apply_request_results() is None
+
+    append_exchange.assert_not_called()
+    assert scene.suzanne_va_status == "Idle (cancelled)"
+    assert modules.common._runtime_text(scene, "last_response") == ""
+
+
+def test_request_queue_runs_one_turn_per_conversation_and_saves_replies_in_order():
+    modules = load_suzanne_modules()
+    operators = modules.operators
+    scene = make_scene(suzanne_va_active_conversation="conv-a")
+    context = make_context(modules.common.ADDON_MODULE, scene=scene, prefs=make_preferences())
+    store = {"conversations": [{"id": name, "messages": []} for name in ("conv-a", "conv-b", "conv-c")]}
+    started = []
+
+    def send(prompt, conversation_id):
+        scene.suzanne_va_active_conversation = conversation_id
+        scene.suzanne_va_prompt = prompt
+        assert operators.SUZANNEVA_OT_send_message().execute(context) == {"FINISHED"}
+
+    with mock.patch.object(operators, "_start_request_worker", side_effect=lambda job, target: started.append(job)):
+        with mock.patch.object(operators, "_load_conversation_store", return_value=store):
+            with mock.patch.object(operators, "_assemble_prompt", return_value=("BUILT", 2)) as assemble:
+                with mock.patch.object(operators, "_append_conversation_exchange") as append_exchange:
+                    with mock.patch.object(operators, "_request_redraw"):
+                        send("First?", "conv-a")
+                        send("Second?", "conv-a")
+                        send("Third?", "conv-b")
+                        send("Fourth?", "conv-c")
+
+                        # Second waits for First (same conversation); Fourth for a free slot.
+                        assert [job["user_text"] for job in started] == ["First?", "Third?"]
+                        assert scene.suzanne_va_status == "Queued..."
+                        assert modules.common._request_queue_counts() == (2, 2)
+
+                        first, third = started
+                        operators._REQUEST_JOBS["results"].put((third, "responded", {"output_text": "Three"}))
+                        operators._apply_request_results()
+                        assert [job["user_text"] for job in started] == ["First?", "Third?", "Fourth?"]
+                        assert [call.args[1] for call in append_exchange.call_args_list] == ["Third?"]
+
+                        operators._REQUEST_JOBS["results"].put((first, "responded", {"output_text": "One"}))
+                        assert operators._apply_request_results() == modules.common._REQUEST_POLL_INTERVAL_S
+                        second = started[3]
+                        assert second["user_text"] == "Second?"
+                        # Launched while conv-c is active, it still gets the context of conv-a.
+                        assert assemble.call_args.kwargs["conversation"]["id"] == "conv-a"
+                        assert [call.kwargs["conversation_id"] for call in append_exchange.call_args_list] == [
+                            "conv-b",
+                            "conv-a",
+                        ]
+
+                        operators._REQUEST_JOBS["results"].put((second, "error", "Send failed: offline"))
+                        operators._apply_request_results()
+                        # Fourth is still running, so the card keeps showing it.
+                        assert scene.suzanne_va_status == "Sending... Previous turn error: Send failed: offline"
+
+                        operators._REQUEST_JOBS["results"].put((started[2], "responded", {"output_text": "Four"}))
+                        assert operators._apply_request_results() is None
+
+    assert append_exchange.call_count == 3
+    assert scene.suzanne_va_status == "Idle (sent)"
+    assert [trace["status"] for trace in modules.common._TRACES] == ["ok", "ok", "error", "ok"]
+
+
+def test_request_queue_drops_a_queued_turn_whose_scene_is_gone():
+    modules = load_suzanne_modules()
+    operators = modules.operators
+
+    class RemovedScene:
+        def __setattr__(self, name, value):
+            raise ReferenceError("StructRNA of type Scene has been removed")
+
+    job = operators._new_request_job(make_scene(), make_preferences(), "text", {})
+    job["scene"] = RemovedScene()
+    job["launch"] = mock.Mock()
+    operators._REQUEST_JOBS["jobs"].append(job)
+
+    operators._pump_request_queue()
+
+    job["launch"].assert_not_called()
+    assert operators._REQUEST_JOBS["jobs"] == []
+    assert job["cancel"].is_set()
+
+
+def test_voice_turn_prefetches_context_while_transcription_is_in_flight():
+    modules = load_suzanne_modules()
+    operators = modules.operators
+    scene = make_scene(suzanne_va_include_info_history=True, suzanne_va_active_conversation="conv-a")
+    prefs = make_preferences(use_response_chaining=True)
+    context = make_context(modules.common.ADDON_MODULE, scene=scene, prefs=prefs)
+    conversation = {"id": "conv-a", "messages": []}
+    events = []
+
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as handle:
+        audio_path = handle.name
+    try:
+        with mock.patch.object(
+            operators,
+            "_start_request_worker",
+            side_effect=lambda job, target: events.append(target.__name__),
+        ):
+            with mock.patch.object(
+                operators,
+                "_get_info_history_lines",
+                side_effect=lambda _limit: events.append("info_history") or "INFO LOG",
+            ):
+                with mock.patch.object(
+                    operators,
+                    "_load_conversation_store",
+                    side_effect=lambda: events.append("load_conversation") or {"conversations": [conversation]},
+                ) as load_store:
+                    with mock.patch.object(operators, "_conversation_chain_id", return_value="resp_prev") as chain_id:
+                        with mock.patch.object(operators, "_assemble_prompt", return_value=("BUILT", 3)) as assemble:
+                            with mock.patch.object(operators, "_request_redraw"):
+                                assert operators.SUZANNEVA_OT_microphone_press()._send_to_chatgpt(
+                                    context, audio_path
+                                ) == (True, "")
+                                # Upload first, then the context work overlaps it on the main thread.
+                                assert events == ["_run_transcription_job", "load_conversation", "info_history"]
+
+                                job = operators._REQUEST_JOBS["jobs"][0]
+                                operators._REQUEST_JOBS["results"].put((job, "transcribed", {"text": "Bevel?"}))
+                                operators._apply_request_results()
+    finally:
+        pathlib.Path(audio_path).unlink()
+
+    # The transcript only joins the prefetched context; nothing is captured or loaded again.
+    assert events == ["_run_transcription_job", "load_conversation", "info_history", "_run_chat_job"]
+    assert load_store.call_count == 1
+    chain_id.assert_called_once_with(scene, prefs, conversation=conversation)
+    assemble.assert_called_once_with(
+        scene,
+        "Bevel?",
+        "INFO LOG",
+        is_voice=True,
+        include_conversation=False,
+        conversation=conversation,
+    )
+    assert job["previous_response_id"] == "resp_prev"
+
+
+def _speculative_voice_turn(modules, partials, final_text):
+    # Streams `partials` to on_partial, then returns `final_text`; every request runs inline.
+    # A None in `partials` is a pause: the clock moves past the settle time and the timer ticks.
+    operators = modules.operators
+    prefs = make_preferences(api_key="sk-live", speculative_voice_replies=True)
+    context = make_context(modules.common.ADDON_MODULE, prefs=prefs)
+    clock = [100.0]
+
+    def transcribe(*_args, on_partial=None, **_kwargs):
+        for text in partials:
+            if text is None:
+                operators._apply_request_results()
+                clock[0] += operators._SPECULATION_SETTLE_S + 0.1
+                operators._apply_request_results()
+            else:
+                on_partial(text)
+        return {"text": final_text}
+
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as handle:
+        audio_path = handle.name
+    try:
+        with mock.patch.object(operators, "_transcribe_audio", side_effect=transcribe), mock.patch.object(
+            operators.time, "monotonic", side_effect=lambda: clock[0]
+        ):
+            with mock.patch.object(
+                operators,
+                "_assemble_prompt",
+                side_effect=lambda _scene, user_text, *_args, **_kwargs: (user_text, 1),
+            ):
+                with mock.patch.object(
+                    operators,
+                    "_call_chatgpt",
+                    side_effect=lambda _key, _model, prompt, **_kwargs: {"output_text": f"Re: {prompt}"},
+                ) as call_chatgpt:
+                    with mock.patch.object(operators, "_append_conversation_exchange") as append_exchange:
+                        with mock.patch.object(operators, "_request_redraw"):
+                            assert run_request_ticks(
+                                modules,
+                                lambda: operators.SUZANNEVA_OT_microphone_press()._send_to_chatgpt(context, audio_path),
+                            ) == (True, "")
+    finally:
+        pathlib.Path(audio_path).unlink()
+    return call_chatgpt, append_exchange
+
+
+def test_speculative_voice_reply_is_adopted_when_final_transcript_matches():
+    modules = load_suzanne_modules()
+
+    call_chatgpt, append_exchange = _speculative_voice_turn(
+        modules,
+        ["Add a", "Add a bevel modifier.", None, "Add a bevel modifier. Please"],
+        "Add a bevel modifier. Please.",
+    )
+
+    # One chat request, started from the paused partial transcript before the final one arrived.
+    assert [call.args[2] for call in call_chatgpt.call_args_list] == ["Add a bevel modifier."]
+    append_exchange.assert_called_once_with(
+        mock.ANY,
+        "Add a bevel modifier. Please.",
+        "Re: Add a bevel modifier.",
+        source="voice",
+        response_id="",
+        conversation_id="",
+    )
+    assert modules.operators._REQUEST_JOBS["jobs"] == []
+
+
+def test_speculative_voice_reply_is_discarded_when_final_transcript_differs():
+    modules = load_suzanne_modules()
+
+    call_chatgpt, append_exchange = _speculative_voice_turn(
+        modules,
+        ["Add a bevel modifier.", None, "Add a bevel modifier. Then apply it to all.", None],
+        "Add a bevel modifier. Then apply it to every selected object.",
+    )
+
+    # One speculation per turn: the second pause sends nothing, the final transcript replaces the first.
+    assert [call.args[2] for call in call_chatgpt.call_args_list] == [
+        "Add a bevel modifier.",
+        "Add a bevel modifier. Then apply it to every selected object.",
+    ]
+    append_exchange.assert_called_once_with(
+        mock.ANY,
+        "Add a bevel modifier. Then apply it to every selected object.",
+        "Re: Add a bevel modifier. Then apply it to every selected object.",
+        source="voice",
+        response_id="",
+        conversation_id="",
+    )
+    assert modules.operators._REQUEST_JOBS["jobs"] == []
+
+
+def test_speculation_waits_for_the_partial_transcript_to_pause():
+    modules = load_suzanne_modules()
+
+    call_chatgpt, append_exchange = _speculative_voice_turn(
+        modules,
+        ["Add a bevel modifier.", "Add a bevel modifier. Then apply it.", "Add a bevel modifier. Then apply it. "],
+        "Add a bevel modifier. Then apply it.",
+    )
+
+    # The transcript never paused, so only the final transcript was sent.
+    assert [call.args[2] for call in call_chatgpt.call_args_list] == ["Add a bevel modifier. Then apply it."]
+    append_exchange.assert_called_once()
+
+
+def test_failed_or_orphaned_speculation_is_traced_and_cancelled():
+    modules = load_suzanne_modules()
+    operators = modules.operators
+    scene = make_scene()
+    prefs = make_preferences(speculative_voice_replies=True)
+
+    operators._trace_begin("voice")
+    job = operators._new_request_job(scene, prefs, "voice", {})
+    job.update(state="running", prefetched={"info_context": "", "conversation": None, "previous_response_id": ""})
+    speculation = {"user_text": "Add a bevel modifier.", "failed": True, "cancel": modules.common.threading.Event()}
+    job["speculation"] = speculation
+    operators._REQUEST_JOBS["jobs"].append(job)
+
+    with mock.patch.object(operators, "_start_chat_request") as start_chat:
+        operators._REQUEST_JOBS["results"].put((job, "transcribed", {"text": "Add a bevel modifier."}))
+        operators._apply_request_results()
+    start_chat.assert_called_once()
+    assert job["trace"]["speculation"] == "failed"
+    assert speculation["cancel"].is_set()
+
+    # Dropping a turn whose scene is gone stops its speculative request too.
+    running = {"user_text": "Add a bevel modifier.", "failed": False, "cancel": modules.common.threading.Event()}
+    job["speculation"] = running
+    operators._drop_request_job(job)
+    assert running["cancel"].is_set()
+    assert "speculation" not in job
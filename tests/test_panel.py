@@ -3,6 +3,13 @@ from unittest import mock
 from tests.test_support import LayoutRecorder, load_suzanne_modules, make_context, make_scene
 
 
+def _make_output_scene(modules, transcript="", response="", **overrides):
+    scene = make_scene(**overrides)
+    modules.common._set_runtime_text(scene, "last_transcript", transcript)
+    modules.common._set_runtime_text(scene, "last_response", response)
+    return scene
+
+
 def test_panel_status_presentation_maps_common_states():
     modules = load_suzanne_modules()
     sidebar = modules.panel.SUZANNEVA_PT_sidebar()
@@ -32,9 +39,45 @@ def test_panel_status_presentation_maps_common_states():
     scene.suzanne_va_status = "Idle (sent)"
     assert sidebar._status_presentation(scene, False)[2] == "CHECKMARK"
 
+    scene.suzanne_va_status = "Transcribing..."
+    assert sidebar._status_presentation(scene, False)[0] == "Transcribing..."
+
+    scene.suzanne_va_status = "Sending... retry 2/4 in 3 s (HTTP 503)"
+    assert sidebar._status_presentation(scene, False)[:3] == (
+        "Retrying...",
+        "Sending... retry 2/4 in 3 s (HTTP 503)",
+        "FILE_REFRESH",
+    )
+
+    scene.suzanne_va_status = "Sending... waiting 4 s for rate limit"
+    assert sidebar._status_presentation(scene, False)[0] == "Waiting for rate limit..."
+
+    scene.suzanne_va_status = "Idle (cancelled)"
+    assert sidebar._status_presentation(scene, False)[2] == "CANCEL"
+
+    scene.suzanne_va_status = "Queued..."
+    assert sidebar._status_presentation(scene, False)[0] == "Queued..."
+
     assert sidebar._status_presentation(scene, True)[0] == "Recording..."
 
 
+def test_panel_status_card_offers_cancel_only_while_a_request_is_active():
+    modules = load_suzanne_modules()
+    sidebar = modules.panel.SUZANNEVA_PT_sidebar()
+    scene = make_scene(suzanne_va_status="Sending...")
+
+    idle_layout = LayoutRecorder()
+    sidebar._draw_status_card(idle_layout, scene, False)
+    assert "suzanne_va.cancel_request" not in idle_layout.operator_ids()
+
+    modules.common._REQUEST_JOBS["jobs"].extend([{"state": "running"}, {"state": "queued"}])
+    busy_layout = LayoutRecorder()
+    sidebar._draw_status_card(busy_layout, scene, False)
+    modules.common._REQUEST_JOBS["jobs"].clear()
+    assert "suzanne_va.cancel_request" in busy_layout.operator_ids()
+    assert "1 in flight, 1 queued" in busy_layout.label_texts()
+
+
 def test_panel_draw_delegates_to_all_section_renderers():
     modules = load_suzanne_modules()
     sidebar = modules.panel.SUZANNEVA_PT_sidebar()
@@ -143,9 +186,9 @@ def test_panel_draw_latest_output_card_handles_transcript_and_response_views():
     modules = load_suzanne_modules()
     sidebar = modules.panel.SUZANNEVA_PT_sidebar()
 
-    transcript_scene = make_scene(
-        suzanne_va_last_transcript="Transcript text",
-        suzanne_va_last_response="",
+    transcript_scene = _make_output_scene(
+        modules,
+        transcript="Transcript text",
         suzanne_va_output_view="response",
     )
     transcript_layout = LayoutRecorder()
@@ -159,9 +202,10 @@ def test_panel_draw_latest_output_card_handles_transcript_and_response_views():
     assert "Transcript" in transcript_layout.label_texts()
     draw_toggle.assert_called_once_with(mock.ANY, transcript_scene, "suzanne_va_expand_transcript")
 
-    response_scene = make_scene(
-        suzanne_va_last_transcript="Prompt text",
-        suzanne_va_last_response="Step 1\nDone",
+    response_scene = _make_output_scene(
+        modules,
+        transcript="Prompt text",
+        response="Step 1\nDone",
         suzanne_va_output_view="response",
     )
     response_layout = LayoutRecorder()
@@ -212,9 +256,9 @@ def test_panel_covers_collapsed_cards_and_remaining_status_fallbacks():
     sidebar._draw_latest_output_card(output_layout, make_scene())
     assert output_layout.label_texts() == ["Latest Output"]
 
-    switched_scene = make_scene(
-        suzanne_va_last_transcript="",
-        suzanne_va_last_response="Only response",
+    switched_scene = _make_output_scene(
+        modules,
+        response="Only response",
         suzanne_va_output_view="transcript",
     )
     switched_layout = LayoutRecorder()
@@ -225,3 +269,99 @@ def test_panel_covers_collapsed_cards_and_remaining_status_fallbacks():
     ):
         sidebar._draw_latest_output_card(switched_layout, switched_scene)
     assert "ChatGPT Response" in switched_layout.label_texts()
+
+
+def test_panel_context_card_reports_last_prompt_token_estimate():
+    modules = load_suzanne_modules()
+    sidebar = modules.panel.SUZANNEVA_PT_sidebar()
+
+    fresh_layout = LayoutRecorder()
+    sidebar._draw_context_card(fresh_layout, make_scene())
+    assert not any(label.startswith("Last prompt:") for label in fresh_layout.label_texts())
+
+    used_layout = LayoutRecorder()
+    sidebar._draw_context_card(
+        used_layout,
+        make_scene(suzanne_va_last_prompt_tokens=812, suzanne_va_prompt_token_budget=4000),
+    )
+    assert "Last prompt: ~812 / 4000 tokens" in used_layout.label_texts()
+
+    billed_layout = LayoutRecorder()
+    sidebar._draw_context_card(
+        billed_layout,
+        make_scene(suzanne_va_last_input_tokens=900, suzanne_va_last_cached_tokens=768),
+    )
+    assert "Billed: 900 input, 768 cached" in billed_layout.label_texts()
+
+
+def test_panel_conversation_card_lists_search_hits_for_the_current_query():
+    modules = load_suzanne_modules()
+    sidebar = modules.panel.SUZANNEVA_PT_sidebar()
+    modules.panel._SEARCH_RESULTS["query"] = "bevel"
+    modules.panel._SEARCH_RESULTS["hits"] = [
+        {"conversation_id": "conv-2", "title": "Chair", "role": "You", "snippet": "How do I bevel?", "score": 2.0},
+    ]
+
+    layout = LayoutRecorder()
+    with mock.patch.object(modules.panel, "_conversation_preview_lines", return_value=[]):
+        sidebar._draw_conversation_card(layout, make_scene(suzanne_va_search_query="bevel"))
+    assert modules.operators.SUZANNEVA_OT_open_search_hit.bl_idname in layout.operator_ids()
+    assert "You: How do I bevel?" in layout.label_texts()
+
+    stale_layout = LayoutRecorder()
+    with mock.patch.object(modules.panel, "_conversation_preview_lines", return_value=[]):
+        sidebar._draw_conversation_card(stale_layout, make_scene(suzanne_va_search_query="light"))
+    assert modules.operators.SUZANNEVA_OT_open_search_hit.bl_idname not in stale_layout.operator_ids()
+
+    modules.panel._SEARCH_RESULTS["hits"] = []
+    empty_layout = LayoutRecorder()
+    with mock.patch.object(modules.panel, "_conversation_preview_lines", return_value=[]):
+        sidebar._draw_conversation_card(empty_layout, make_scene(suzanne_va_search_query="bevel"))
+    assert "No matching messages." in empty_layout.label_texts()
+    modules.panel._SEARCH_RESULTS["query"] = ""
+
+
+def test_panel_conversation_card_draws_transcript_page_with_navigation():
+    modules = load_suzanne_modules()
+    sidebar = modules.panel.SUZANNEVA_PT_sidebar()
+    scene = make_scene(suzanne_va_active_conversation="conv-1")
+
+    layout = LayoutRecorder()
+    with mock.patch.object(modules.panel, "_transcript_view", return_value=(1, 3, [("user", "Hello", "")])):
+        with mock.patch.object(modules.panel, "_conversation_preview_lines") as preview_lines:
+            sidebar._draw_conversation_card(layout, scene)
+    preview_lines.assert_not_called()
+    assert "You: Hello" in layout.label_texts()
+    assert "Page 2 / 3" in layout.label_texts()
+    assert layout.operator_ids().count(modules.operators.SUZANNEVA_OT_transcript_page.bl_idname) == 4
+
+    empty_layout = LayoutRecorder()
+    with mock.patch.object(modules.panel, "_transcript_view", return_value=(0, 1, [])):
+        with mock.patch.object(modules.panel, "_conversation_preview_lines", return_value=[]):
+            sidebar._draw_conversation_card(empty_layout, scene)
+    assert "No saved messages yet. Start by asking a question." in empty_layout.label_texts()
+    assert modules.operators.SUZANNEVA_OT_transcript_page.bl_idname not in empty_layout.operator_ids()
+
+
+def test_panel_latest_output_card_shows_short_preview_when_writing_to_text_editor():
+    modules = load_suzanne_modules()
+    sidebar = modules.panel.SUZANNEVA_PT_sidebar()
+    scene = _make_output_scene(
+        modules,
+        response="Long answer",
+        suzanne_va_output_to_text=True,
+        suzanne_va_expand_response=True,
+    )
+
+    layout = LayoutRecorder()
+    with mock.patch.object(
+        modules.panel,
+        "_preview_response_lines",
+        return_value=(["Long answer"], True),
+    ) as preview_lines:
+        with mock.patch.object(modules.panel, "_draw_expand_toggle") as draw_toggle:
+            sidebar._draw_latest_output_card(layout, scene)
+
+    assert preview_lines.call_args.kwargs["expanded"] is False
+    draw_toggle.assert_not_called()
+    assert modules.operators.SUZANNEVA_OT_open_output_text.bl_idname in layout.operator_ids()
@@ -9,6 +9,8 @@ def test_preferences_draw_masks_api_key_and_renders_diagnostics_controls():
     prefs = modules.preferences.SUZANNEVA_Preferences()
     prefs.api_key = "sk-1234567890"
     prefs.show_api_key = False
+    prefs.chat_backend = "OPENAI"
+    prefs.transcription_backend = "OPENAI"
     prefs.diagnostics_last_message = "Models refreshed."
     prefs.diagnostics_last_error = "Network issue."
     prefs.layout = LayoutRecorder()
@@ -30,6 +32,7 @@ def test_preferences_draw_masks_api_key_and_renders_diagnostics_controls():
     operator_ids = prefs.layout.operator_ids()
 
     assert "Suzanne Version 1.0.0" in labels
+    assert "OpenAI-compatible Server" not in labels
     assert any(label.startswith("API Key: ") for label in labels)
     assert "Last Result" in labels
     assert "Last Error" in labels
@@ -42,6 +45,8 @@ def test_preferences_draw_shows_plain_api_key_when_reveal_is_enabled():
     prefs = modules.preferences.SUZANNEVA_Preferences()
     prefs.api_key = "sk-live"
     prefs.show_api_key = True
+    prefs.chat_backend = "OPENAI"
+    prefs.transcription_backend = "LOCAL"
     prefs.diagnostics_last_message = ""
     prefs.diagnostics_last_error = ""
     prefs.layout = LayoutRecorder()
@@ -59,7 +64,33 @@ def test_preferences_draw_shows_plain_api_key_when_reveal_is_enabled():
             ):
                 prefs.draw(None)
 
-    api_row = prefs.layout.children[0]
+    server_box = next(child for child in prefs.layout.children if "OpenAI-compatible Server" in child.label_texts())
+    assert ("prop", (prefs, "local_base_url"), {}) in server_box.calls
+    assert ("prop", (prefs, "local_api_key"), {}) in server_box.calls
+
+    api_row = next(child for child in prefs.layout.children if ("prop", (prefs, "api_key"), {"text": "API Key"}) in child.calls)
     assert ("prop", (prefs, "api_key"), {"text": "API Key"}) in api_row.calls
     assert ("prop", (prefs, "show_api_key"), {"text": "Hide"}) in api_row.calls
     assert not any(label.startswith("API Key: ") for label in prefs.layout.label_texts())
+
+
+def test_preferences_draw_lists_stage_timings_of_the_last_traced_turn():
+    modules = load_suzanne_modules()
+    prefs = modules.preferences.SUZANNEVA_Preferences()
+    layout = LayoutRecorder()
+
+    prefs._draw_latency_trace(layout)
+    assert "No assistant turns timed yet." in layout.label_texts()
+
+    modules.common._TRACES.append({
+        "kind": "voice",
+        "status": "ok",
+        "total_ms": 2310.4,
+        "spans": [["transcription", 812.0], ["responses_api", 1400.2]],
+    })
+    layout = LayoutRecorder()
+    prefs._draw_latency_trace(layout)
+    labels = layout.label_texts()
+    assert "Voice turn (ok): 2310 ms" in labels
+    assert labels[-4:] == ["transcription", "812 ms", "responses api", "1400 ms"]
+    modules.common._TRACES.clear()
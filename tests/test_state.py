@@ -1,3 +1,7 @@
+from types import SimpleNamespace
+
+import pytest
+
 from tests.test_support import load_suzanne_modules
 
 
@@ -27,3 +31,58 @@ def test_state_clear_props_removes_registered_scene_properties():
 
     for prop_name in modules.state._SCENE_PROP_NAMES:
         assert not hasattr(scene_type, prop_name)
+
+
+def test_state_keeps_large_text_in_runtime_store_keyed_by_scene():
+    modules = load_suzanne_modules()
+    common = modules.common
+    scene_type = modules.bpy.types.Scene
+    first = SimpleNamespace(name_full="Scene")
+    second = SimpleNamespace(name_full="Scene.001")
+
+    modules.state.ensure_props()
+    assert not hasattr(scene_type, "suzanne_va_last_response")
+
+    common._set_runtime_text(first, "last_response", "A long answer")
+    common._set_runtime_text(second, "last_transcript", "Question")
+    assert common._runtime_text(first, "last_response") == "A long answer"
+    assert common._runtime_text(second, "last_response") == ""
+    assert vars(first) == {"name_full": "Scene"}
+    # The scene reloaded by undo is a new object with the same name.
+    assert common._runtime_text(SimpleNamespace(name_full="Scene"), "last_response") == "A long answer"
+
+    with pytest.raises(KeyError):
+        common._set_runtime_text(first, "status", "Idle")
+
+    modules.state.clear_props()
+    assert common._runtime_text(first, "last_response") == ""
+
+
+def test_state_keymaps_bind_cancel_shortcut_and_remove_it_again():
+    modules = load_suzanne_modules()
+    window_manager = modules.bpy.context.window_manager
+
+    modules.state.register_keymaps()
+    assert modules.common._ADDON_KEYMAPS == []
+
+    items = []
+    keymap = SimpleNamespace(
+        keymap_items=SimpleNamespace(
+            new=lambda idname, **kwargs: items.append((idname, kwargs)) or items[-1],
+            remove=items.remove,
+        )
+    )
+    window_manager.keyconfigs = SimpleNamespace(
+        addon=SimpleNamespace(keymaps=SimpleNamespace(new=lambda **_kwargs: keymap))
+    )
+    try:
+        modules.state.register_keymaps()
+        assert items == [
+            ("suzanne_va.cancel_request", {"type": "PERIOD", "value": "PRESS", "ctrl": True, "alt": True})
+        ]
+        modules.state.unregister_keymaps()
+    finally:
+        del window_manager.keyconfigs
+
+    assert items == []
+    assert modules.common._ADDON_KEYMAPS == []
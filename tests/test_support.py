@@ -69,6 +69,13 @@ def _install_bpy_stub():
         register_class=lambda _cls: None,
         unregister_class=lambda _cls: None,
     )
+    bpy_module.app = SimpleNamespace(
+        timers=SimpleNamespace(
+            register=lambda _function, **_kwargs: None,
+            unregister=lambda _function: None,
+            is_registered=lambda _function: False,
+        ),
+    )
     bpy_module.ops = SimpleNamespace(
         wm=SimpleNamespace(path_open=lambda **_kwargs: None),
         info=SimpleNamespace(
@@ -193,12 +200,21 @@ class LayoutRecorder:
 def make_preferences(**overrides):
     values = {
         "api_key": "sk-test",
+        "api_base_url": "",
+        "chat_backend": "OPENAI",
+        "transcription_backend": "OPENAI",
+        "local_base_url": "http://127.0.0.1:8000/v1",
+        "local_api_key": "",
         "show_api_key": False,
         "response_model": "gpt-4o-mini",
         "transcription_model": "gpt-4o-mini-transcribe",
         "audio_input_device": "system_default",
         "file_prefix": "suzanne_va_",
         "auto_save_conversations": True,
+        "use_response_chaining": False,
+        "speculative_voice_replies": False,
+        "summarize_conversations": False,
+        "write_latency_traces": False,
         "diagnostics_last_message": "",
         "diagnostics_last_error": "",
     }
@@ -210,16 +226,21 @@ def make_scene(**overrides):
     values = {
         "suzanne_va_prompt": "",
         "suzanne_va_include_info_history": False,
-        "suzanne_va_last_info_history": "",
         "suzanne_va_status": "Idle",
-        "suzanne_va_last_transcript": "",
-        "suzanne_va_last_response": "",
         "suzanne_va_expand_transcript": False,
         "suzanne_va_expand_response": False,
         "suzanne_va_mic_active": False,
         "suzanne_va_context_turns": 4,
+        "suzanne_va_context_mode": "recent",
+        "suzanne_va_prompt_token_budget": 6000,
+        "suzanne_va_last_prompt_tokens": 0,
+        "suzanne_va_last_input_tokens": 0,
+        "suzanne_va_last_cached_tokens": 0,
         "suzanne_va_active_conversation": "",
+        "suzanne_va_search_query": "",
         "suzanne_va_output_view": "response",
+        "suzanne_va_output_to_text": False,
+        "suzanne_va_output_text_conversation": False,
         "suzanne_va_show_message": True,
         "suzanne_va_show_context": True,
         "suzanne_va_show_conversation": True,